@@ -1,24 +1,111 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Collection, Iterator
+from enum import Enum
 from uuid import UUID
 from datetime import datetime
-from agendia.core.domain import Profissional, Agendamento
+from pydantic import BaseModel, Field
+from agendia.core.domain import Profissional, ProfissionalResumo, Agendamento, AgendamentoStatus, Servico
 
 class IProfissionalRepositorio(ABC):
     """Contrato que define os métodos para persistir dados da entidade Profissional."""
 
     @abstractmethod
     def salvar(self, profissional: Profissional) -> None:
-        """Salva uma instância nova ou atualiza uma existente de um Profissional."""
+        """
+        Salva uma instância nova ou atualiza uma existente de um Profissional.
+        A gravação só acontece se o profissional ainda estiver na versão lida
+        ('profissional.versao'); caso contrário, levanta ConflitoConcorrenciaError.
+        """
         pass
 
     @abstractmethod
-    def buscar_por_id(self, id_profissional: UUID) -> Profissional | None:
-        """Busca um Profissional pelo seu ID único."""
+    def buscar_por_id(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        """
+        Busca um Profissional pelo seu ID único.
+        Se 'janela' (inicio, fim) for informada, carrega apenas os agendamentos
+        que se sobrepõem a ela, em vez de todo o histórico.
+        Com 'somente_ocupacao', os agendamentos confirmados chegam apenas como
+        ocupação compacta (Profissional.ocupacao) e 'agendamentos' vem vazio:
+        basta para consultar e reservar horários, sem materializar cada Agendamento.
+        """
         pass
 
     @abstractmethod
-    def buscar_por_telefone(self, telefone: str) -> Profissional | None:
-        """Busca um Profissional pelo seu número de WhatsApp."""
+    def buscar_por_telefone(
+        self, telefone: str, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        """Busca um Profissional pelo seu número de WhatsApp. 'janela' e 'somente_ocupacao' funcionam como em buscar_por_id."""
+        pass
+
+    @abstractmethod
+    def obter_versao(self, id_profissional: UUID) -> int | None:
+        """
+        Retorna a versão atual do profissional (incrementada a cada 'salvar'),
+        ou None se ele não existir. Consulta leve, sem carregar o agregado.
+        """
+        pass
+
+    @abstractmethod
+    def obter_atualizacao(self, id_profissional: UUID) -> tuple[int, datetime | None] | None:
+        """
+        Retorna (versão, instante UTC da última gravação) do profissional, ou None
+        se ele não existir. Base para ETag/Last-Modified de respostas derivadas da agenda.
+        """
+        pass
+
+    @abstractmethod
+    def iterar_agendamentos(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime], tamanho_lote: int = 1000
+    ) -> Iterator[Agendamento]:
+        """
+        Percorre, em ordem de início, os agendamentos do profissional (de qualquer
+        status, incluindo os arquivados) que se sobrepõem à janela. O cursor é
+        consumido em lotes: a memória não depende do tamanho da janela.
+        """
+        pass
+
+    @abstractmethod
+    def listar_agendamentos(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        """
+        Retorna, em ordem de início, os agendamentos do profissional que se
+        sobrepõem à janela, apenas dos 'status' informados (todos, se None).
+        Filtro e ordenação ficam no banco, em uma única consulta; retorna None
+        se o profissional não existir.
+        Lê apenas a tabela operacional: agendamentos arquivados não aparecem.
+        """
+        pass
+
+    @abstractmethod
+    def listar_historico(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        """
+        Como listar_agendamentos, incluindo os agendamentos já arquivados.
+        Único caminho de leitura do arquivo: os de agendamento e de agenda
+        ficam só com os dados recentes.
+        """
+        pass
+
+    @abstractmethod
+    def listar_por_servico(
+        self, nome_servico: str, janela: tuple[datetime, datetime], somente_ocupacao: bool = False
+    ) -> list[Profissional]:
+        """
+        Retorna os profissionais que oferecem o serviço, cada um com apenas os
+        agendamentos CONFIRMADOS que se sobrepõem à janela ('somente_ocupacao'
+        funciona como em buscar_por_id).
+        O número de consultas não depende do tamanho do cadastro.
+        """
         pass
 
     @abstractmethod
@@ -26,6 +113,91 @@ class IProfissionalRepositorio(ABC):
         """Retorna uma lista de todos os profissionais cadastrados."""
         pass
 
+    @abstractmethod
+    def listar_resumos(self, after_id: UUID | None = None, limit: int = 100) -> list[ProfissionalResumo]:
+        """
+        Retorna uma página de resumos (id, nome, telefone) ordenada por id.
+        Paginação por chave: a próxima página começa após 'after_id'.
+        """
+        pass
+
+    @abstractmethod
+    def iterar_resumos(self, tamanho_lote: int = 1000) -> Iterator[ProfissionalResumo]:
+        """Percorre os resumos de todos os profissionais em lotes, com memória limitada."""
+        pass
+
+class IProfissionalRepositorioAsync(ABC):
+    """
+    Variante assíncrona de IProfissionalRepositorio, para as rotas 'async' da API.
+    Os métodos têm a mesma semântica dos equivalentes síncronos.
+    """
+
+    @abstractmethod
+    async def salvar(self, profissional: Profissional) -> None:
+        pass
+
+    @abstractmethod
+    async def buscar_por_id(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        pass
+
+    @abstractmethod
+    async def buscar_por_telefone(
+        self, telefone: str, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        pass
+
+    @abstractmethod
+    async def obter_versao(self, id_profissional: UUID) -> int | None:
+        pass
+
+    @abstractmethod
+    async def obter_atualizacao(self, id_profissional: UUID) -> tuple[int, datetime | None] | None:
+        pass
+
+    @abstractmethod
+    def iterar_agendamentos(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime], tamanho_lote: int = 1000
+    ) -> AsyncIterator[Agendamento]:
+        pass
+
+    @abstractmethod
+    async def listar_agendamentos(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        pass
+
+    @abstractmethod
+    async def listar_historico(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        pass
+
+    @abstractmethod
+    async def listar_por_servico(
+        self, nome_servico: str, janela: tuple[datetime, datetime], somente_ocupacao: bool = False
+    ) -> list[Profissional]:
+        pass
+
+    @abstractmethod
+    async def listar_resumos(self, after_id: UUID | None = None, limit: int = 100) -> list[ProfissionalResumo]:
+        pass
+
+    @abstractmethod
+    def iterar_resumos(self, tamanho_lote: int = 1000) -> AsyncIterator[ProfissionalResumo]:
+        pass
+
+class ConflitoConcorrenciaError(Exception):
+    """O agregado foi gravado por outra requisição depois de ter sido lido."""
+    pass
+
 # ... resto do arquivo inalterado ...
 class IAgendamentoRepositorio(ABC):
     """Contrato que define os métodos para persistir dados da entidade Agendamento."""
@@ -36,5 +208,134 @@ class IWhatsAppAdapter(ABC):
     
     @abstractmethod
     def enviar_texto(self, numero_destino: str, texto: str) -> None:
-        """Envia uma mensagem de texto para um número de destino."""
-        pass
\ No newline at end of file
+        """
+        Envia uma mensagem de texto para um número de destino.
+        Deve levantar EnvioMensagemError se a mensagem não puder ser entregue.
+        """
+        pass
+
+    def enviar_lote(self, mensagens: list[tuple[str, str]]) -> list[Exception | None]:
+        """
+        Envia várias mensagens (numero_destino, texto) e retorna, na mesma ordem,
+        None para cada envio bem-sucedido ou a exceção correspondente à falha.
+        Implementações podem sobrescrever para enviar tudo em uma única chamada.
+        """
+        resultados: list[Exception | None] = []
+        for numero_destino, texto in mensagens:
+            try:
+                self.enviar_texto(numero_destino=numero_destino, texto=texto)
+                resultados.append(None)
+            except EnvioMensagemError as e:
+                resultados.append(e)
+        return resultados
+
+    def fechar(self) -> None:
+        """Libera recursos mantidos pelo adaptador (ex.: conexões). Por padrão, nada a fazer."""
+        pass
+
+class EnvioMensagemError(Exception):
+    """Falha ao entregar uma mensagem ao serviço de WhatsApp."""
+    pass
+
+class IFilaNotificacoes(ABC):
+    """
+    Contrato para a fila de saída (outbox) de notificações.
+    As mensagens enfileiradas são gravadas junto com a próxima gravação do
+    repositório (mesma transação) e entregues de forma assíncrona.
+    """
+
+    @abstractmethod
+    def enfileirar(self, numero_destino: str, texto: str) -> None:
+        """Registra uma mensagem para envio posterior."""
+        pass
+
+
+class EtapaConversa(str, Enum):
+    """Em que ponto do fluxo de agendamento a conversa está."""
+    ESCOLHENDO_SERVICO = "escolhendo_servico"
+    ESCOLHENDO_HORARIO = "escolhendo_horario"
+
+class EstadoConversa(BaseModel):
+    """
+    Estado de uma conversa do chatbot, guardado entre as mensagens.
+    Mantém os serviços do profissional e os últimos horários oferecidos, para
+    que cada nova mensagem não precise consultar tudo de novo.
+    """
+    profissional_id: UUID
+    profissional_nome: str
+    servicos: list[Servico]
+    etapa: EtapaConversa = EtapaConversa.ESCOLHENDO_SERVICO
+    servico_escolhido: str | None = None
+    horarios_ofertados: list[datetime] = Field(default_factory=list)
+
+class IArmazemConversas(ABC):
+    """
+    Contrato para o armazenamento do estado das conversas, indexado por
+    (número do profissional, número do cliente). Implementações podem ser
+    locais ao processo ou compartilhadas (ex.: Redis).
+    """
+
+    @abstractmethod
+    def obter(self, chave: tuple[str, str]) -> EstadoConversa | None:
+        """Retorna o estado da conversa, ou None se não existir ou tiver expirado."""
+        pass
+
+    @abstractmethod
+    def salvar(self, chave: tuple[str, str], estado: EstadoConversa) -> None:
+        """Grava (ou substitui) o estado da conversa, renovando seu prazo de validade."""
+        pass
+
+    @abstractmethod
+    def remover(self, chave: tuple[str, str]) -> None:
+        """Encerra a conversa."""
+        pass
+
+
+class LoteImportacao(BaseModel):
+    """
+    Um lote da importação em massa, já validado pelos modelos de domínio.
+    Os profissionais e os serviços são referenciados pelas chaves naturais
+    (telefone e nome), que podem ainda não existir no banco.
+    """
+    profissionais: list[Profissional] = Field(default_factory=list)
+    servicos: list[Servico] = Field(default_factory=list)
+    # (número da linha no arquivo, telefone do profissional, nome do serviço oferecido)
+    vinculos: list[tuple[int, str, str]] = Field(default_factory=list)
+    # (número da linha no arquivo, telefone do profissional, agendamento)
+    agendamentos: list[tuple[int, str, Agendamento]] = Field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.profissionais) + len(self.servicos) + len(self.vinculos) + len(self.agendamentos)
+
+class ResultadoLote(BaseModel):
+    """Contagens de um lote gravado; 'erros' traz (linha, mensagem) das linhas recusadas pelo banco."""
+    profissionais_inseridos: int = 0
+    profissionais_atualizados: int = 0
+    servicos_inseridos: int = 0
+    vinculos_inseridos: int = 0
+    agendamentos_inseridos: int = 0
+    agendamentos_ignorados: int = 0
+    erros: list[tuple[int, str]] = Field(default_factory=list)
+
+class IImportadorCadastro(ABC):
+    """
+    Contrato para a gravação em massa de cadastros (importação de redes inteiras).
+    Ao contrário do repositório, grava lotes sem montar os agregados.
+    """
+
+    @abstractmethod
+    def gravar_lote(self, lote: LoteImportacao, atualizar_existentes: bool = False) -> ResultadoLote:
+        """
+        Grava o lote em uma única transação.
+        - Profissional com telefone já cadastrado: atualizado se 'atualizar_existentes', senão mantido.
+        - Serviço com nome já cadastrado: mantido (a duração cadastrada prevalece).
+        - Agendamento com id já cadastrado: ignorado, o que torna a importação repetível.
+        - Agendamento confirmado que se sobrepõe a outro confirmado do mesmo profissional
+          (já gravado ou do próprio arquivo): recusado e relatado, como no agendamento normal.
+        """
+        pass
+
+    @abstractmethod
+    def buscar_servicos(self, nomes: set[str]) -> dict[str, Servico]:
+        """Retorna os serviços já cadastrados com esses nomes, indexados pelo nome."""
+        pass
@@ -1,9 +1,17 @@
-from datetime import datetime, date
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, date, time, timedelta
+from typing import Callable, Literal
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
-from agendia.core.domain import Agendamento, Profissional, Servico
-from agendia.application.ports import IProfissionalRepositorio, IWhatsAppAdapter # <--- Adicionada a nova interface
+from agendia.core.domain import (Agendamento, AgendamentoStatus, Profissional, ProfissionalResumo, Servico,
+                                 DURACAO_MAXIMA_AGENDAMENTO)
+from agendia.application.ports import (IProfissionalRepositorio, IProfissionalRepositorioAsync, IFilaNotificacoes,
+                                      IArmazemConversas, EstadoConversa, EtapaConversa, ConflitoConcorrenciaError,
+                                      IImportadorCadastro, LoteImportacao, ResultadoLote)
 
 # ... (DTOs e Exceções permanecem os mesmos) ...
 
@@ -17,63 +25,135 @@ class ConsultaAgendaInput(BaseModel):
     profissional_id: UUID
     data: date
 
+class ConsultaAgendaPeriodoInput(BaseModel):
+    profissional_id: UUID
+    data_inicio: date
+    data_fim: date
+    # Sem 'status', traz agendamentos de todos os status.
+    status: list[AgendamentoStatus] | None = None
+    # Inclui os agendamentos antigos já arquivados (consulta mais cara; só para o histórico).
+    incluir_arquivados: bool = False
+
+class ConsultaDisponibilidadeInput(BaseModel):
+    profissional_id: UUID
+    nome_servico: str
+    data_inicio: date
+    data_fim: date
+    granularidade_minutos: int = Field(default=15, gt=0)
+    limite: int | None = Field(default=None, gt=0)
+
+class BuscaProfissionaisDisponiveisInput(BaseModel):
+    nome_servico: str
+    inicio: datetime
+    # Sem 'fim', verifica apenas o horário exato 'inicio'.
+    fim: datetime | None = None
+    granularidade_minutos: int = Field(default=15, gt=0)
+    limite_por_profissional: int | None = Field(default=None, gt=0)
+
+class ProfissionalDisponivel(BaseModel):
+    profissional: ProfissionalResumo
+    horarios: list[datetime]
+
+class MensagemRecebidaInput(BaseModel):
+    """Mensagem encaminhada pelo whatsapp-adapter (ids no formato '5583999998888@c.us')."""
+    sender: str
+    recipient: str
+    text: str
+
 class ProfissionalNaoEncontradoError(Exception): pass
 class ServicoNaoEncontradoError(Exception): pass
 class AgendamentoNaoEncontradoError(Exception): pass
 
 
+def normalizar_numero_whatsapp(numero: str) -> str:
+    """Converte um id do whatsapp-web.js ('5583999998888@c.us') para o formato '+5583999998888'."""
+    digitos = "".join(c for c in numero.split("@")[0] if c.isdigit())
+    return f"+{digitos}"
+
+
+def janela_do_dia(data: date) -> tuple[datetime, datetime]:
+    """Retorna o intervalo [00:00 do dia, 00:00 do dia seguinte)."""
+    inicio = datetime.combine(data, time.min)
+    return inicio, inicio + timedelta(days=1)
+
+
 # --- Caso de Uso Modificado ---
 
 class RealizarAgendamentoUseCase:
     """Caso de uso para realizar um novo agendamento."""
 
-    # CORREÇÃO: Agora ele recebe também o adaptador de WhatsApp
-    def __init__(self, repositorio: IProfissionalRepositorio, whatsapp_adapter: IWhatsAppAdapter):
+    MAX_TENTATIVAS = 5
+
+    # A confirmação vai para a fila de saída (outbox); o envio pelo WhatsApp acontece
+    # em segundo plano, sem segurar a requisição.
+    def __init__(
+        self,
+        repositorio: IProfissionalRepositorio,
+        fila_notificacoes: IFilaNotificacoes,
+        max_tentativas: int = MAX_TENTATIVAS,
+    ):
         self.repositorio = repositorio
-        self.whatsapp_adapter = whatsapp_adapter
+        self.fila_notificacoes = fila_notificacoes
+        self.max_tentativas = max_tentativas
 
     def executar(self, input_data: AgendamentoInput) -> Agendamento:
-        profissional = self.repositorio.buscar_por_id(input_data.profissional_id)
-        if not profissional:
-            raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
+        # Concorrência otimista: se a agenda do profissional for gravada por outra
+        # requisição entre a leitura e a gravação, a disponibilidade é verificada
+        # de novo sobre os dados atuais, até 'max_tentativas' vezes.
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                return self._tentar_agendar(input_data)
+            except ConflitoConcorrenciaError:
+                if tentativa == self.max_tentativas:
+                    raise
 
-        servico_encontrado = next(
-            (s for s in profissional.servicos_oferecidos if s.nome == input_data.nome_servico), 
-            None
+    def _tentar_agendar(self, input_data: AgendamentoInput) -> Agendamento:
+        profissional = self.repositorio.buscar_por_id(
+            input_data.profissional_id, janela=_janela_agendamento(input_data), somente_ocupacao=True
         )
-        if not servico_encontrado:
-            raise ServicoNaoEncontradoError(f"O serviço '{input_data.nome_servico}' não é oferecido.")
+        novo_agendamento = _registrar_agendamento(profissional, input_data, self.fila_notificacoes)
+        self.repositorio.salvar(profissional)
+        return novo_agendamento
 
-        novo_agendamento = Agendamento(
-            servico=servico_encontrado,
-            data_hora_inicio=input_data.data_hora_inicio,
-            cliente_contato=input_data.cliente_contato
-        )
 
-        try:
-            profissional.adicionar_novo_agendamento(novo_agendamento)
-        except ValueError as e:
-            raise e
+def _janela_agendamento(input_data: AgendamentoInput) -> tuple[datetime, datetime]:
+    # Só a ocupação (início e fim) do dia do novo horário é carregada: reservar não altera
+    # os existentes. A janela é a mesma de /disponibilidade para esse dia, então a
+    # reserva feita depois da consulta reaproveita a entrada do cache.
+    inicio, fim = janela_do_dia(input_data.data_hora_inicio.date())
+    return inicio, fim + DURACAO_MAXIMA_AGENDAMENTO
 
-        self.repositorio.salvar(profissional)
-        
-        # --- NOVA ETAPA: Enviar notificação de confirmação ---
-        try:
-            texto_confirmacao = (
-                f"Olá! ✅ Seu agendamento para o serviço '{servico_encontrado.nome}' "
-                f"com {profissional.nome} foi confirmado para o dia "
-                f"{novo_agendamento.data_hora_inicio.strftime('%d/%m/%Y às %H:%M')}."
-            )
-            self.whatsapp_adapter.enviar_texto(
-                numero_destino=input_data.cliente_contato,
-                texto=texto_confirmacao
-            )
-        except Exception as e:
-            # Mesmo que a notificação falhe, o agendamento foi salvo.
-            # Apenas registramos o erro.
-            print(f"AVISO: O agendamento foi salvo, mas a notificação via WhatsApp falhou: {e}")
 
-        return novo_agendamento
+def _servico_oferecido(profissional: Profissional, nome_servico: str) -> Servico:
+    servico = next((s for s in profissional.servicos_oferecidos if s.nome == nome_servico), None)
+    if not servico:
+        raise ServicoNaoEncontradoError(f"O serviço '{nome_servico}' não é oferecido.")
+    return servico
+
+
+def _registrar_agendamento(
+    profissional: Profissional | None, input_data: AgendamentoInput, fila_notificacoes: IFilaNotificacoes
+) -> Agendamento:
+    """Adiciona o agendamento ao agregado e enfileira a confirmação; a gravação fica com quem chama."""
+    if not profissional:
+        raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
+    servico_encontrado = _servico_oferecido(profissional, input_data.nome_servico)
+
+    novo_agendamento = Agendamento(
+        servico=servico_encontrado,
+        data_hora_inicio=input_data.data_hora_inicio,
+        cliente_contato=input_data.cliente_contato
+    )
+    profissional.adicionar_novo_agendamento(novo_agendamento)
+
+    # A mensagem de confirmação é gravada na mesma transação do agendamento.
+    texto_confirmacao = (
+        f"Olá! ✅ Seu agendamento para o serviço '{servico_encontrado.nome}' "
+        f"com {profissional.nome} foi confirmado para o dia "
+        f"{novo_agendamento.data_hora_inicio.strftime('%d/%m/%Y às %H:%M')}."
+    )
+    fila_notificacoes.enfileirar(numero_destino=input_data.cliente_contato, texto=texto_confirmacao)
+    return novo_agendamento
 
 # ... (ConsultarAgendaUseCase permanece o mesmo) ...
 
@@ -83,7 +163,9 @@ class ConsultarAgendaUseCase:
 
     def executar(self, input_data: ConsultaAgendaInput) -> list[Agendamento]:
         # ... (código inalterado) ...
-        profissional = self.repositorio.buscar_por_id(input_data.profissional_id)
+        profissional = self.repositorio.buscar_por_id(
+            input_data.profissional_id, janela=janela_do_dia(input_data.data)
+        )
         if not profissional:
             raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
         agenda_do_dia = [
@@ -91,4 +173,704 @@ class ConsultarAgendaUseCase:
             if ag.data_hora_inicio.date() == input_data.data
         ]
         agenda_do_dia.sort(key=lambda ag: ag.data_hora_inicio)
-        return agenda_do_dia
\ No newline at end of file
+        return agenda_do_dia
+
+
+class ConsultarAgendaPeriodoUseCase:
+    """
+    Agenda de um profissional entre duas datas (inclusive), como nas visões de
+    semana e mês. O filtro por período e status e a ordenação ficam no banco.
+    """
+
+    MAXIMO_DIAS = 366
+
+    def __init__(self, repositorio: IProfissionalRepositorio):
+        self.repositorio = repositorio
+
+    def executar(self, input_data: ConsultaAgendaPeriodoInput) -> list[Agendamento]:
+        listar = (
+            self.repositorio.listar_historico if input_data.incluir_arquivados
+            else self.repositorio.listar_agendamentos
+        )
+        agendamentos = listar(input_data.profissional_id, self._periodo(input_data), status=input_data.status)
+        return self._agenda(agendamentos)
+
+    @classmethod
+    def _periodo(cls, input_data: ConsultaAgendaPeriodoInput) -> tuple[datetime, datetime]:
+        if input_data.data_fim < input_data.data_inicio:
+            raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+        if (input_data.data_fim - input_data.data_inicio).days >= cls.MAXIMO_DIAS:
+            raise ValueError(f"O período consultado não pode passar de {cls.MAXIMO_DIAS} dias.")
+        return janela_do_dia(input_data.data_inicio)[0], janela_do_dia(input_data.data_fim)[1]
+
+    @staticmethod
+    def _agenda(agendamentos: list[Agendamento] | None) -> list[Agendamento]:
+        if agendamentos is None:
+            raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
+        return agendamentos
+
+
+class ConsultarDisponibilidadeUseCase:
+    """Caso de uso para listar os próximos horários livres de um serviço em um período."""
+
+    # Limite do período pesquisado, para manter a consulta barata.
+    MAXIMO_DIAS = 62
+
+    def __init__(self, repositorio: IProfissionalRepositorio):
+        self.repositorio = repositorio
+
+    def executar(self, input_data: ConsultaDisponibilidadeInput) -> list[datetime]:
+        inicio, fim = self._periodo(input_data)
+        profissional = self.repositorio.buscar_por_id(
+            input_data.profissional_id, janela=(inicio, fim + DURACAO_MAXIMA_AGENDAMENTO), somente_ocupacao=True
+        )
+        return self._horarios_livres(profissional, input_data, inicio, fim)
+
+    @classmethod
+    def _periodo(cls, input_data: ConsultaDisponibilidadeInput) -> tuple[datetime, datetime]:
+        if input_data.data_fim < input_data.data_inicio:
+            raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+        if (input_data.data_fim - input_data.data_inicio).days >= cls.MAXIMO_DIAS:
+            raise ValueError(f"O período consultado não pode passar de {cls.MAXIMO_DIAS} dias.")
+        return janela_do_dia(input_data.data_inicio)[0], janela_do_dia(input_data.data_fim)[1]
+
+    @staticmethod
+    def _horarios_livres(
+        profissional: Profissional | None, input_data: ConsultaDisponibilidadeInput, inicio: datetime, fim: datetime
+    ) -> list[datetime]:
+        if not profissional:
+            raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
+        servico = _servico_oferecido(profissional, input_data.nome_servico)
+        return profissional.horarios_livres(
+            servico, inicio, fim,
+            granularidade_minutos=input_data.granularidade_minutos,
+            limite=input_data.limite
+        )
+
+
+class BuscarProfissionaisDisponiveisUseCase:
+    """
+    Caso de uso para descobrir quais profissionais podem atender um serviço
+    em um horário (ou período), em uma única passada pelo cadastro.
+    """
+
+    MAXIMO_DIAS = ConsultarDisponibilidadeUseCase.MAXIMO_DIAS
+
+    def __init__(self, repositorio: IProfissionalRepositorio):
+        self.repositorio = repositorio
+
+    def executar(self, input_data: BuscaProfissionaisDisponiveisInput) -> list[ProfissionalDisponivel]:
+        profissionais = self.repositorio.listar_por_servico(
+            input_data.nome_servico, self._janela(input_data), somente_ocupacao=True
+        )
+        return self._disponiveis(profissionais, input_data)
+
+    @classmethod
+    def _janela(cls, input_data: BuscaProfissionaisDisponiveisInput) -> tuple[datetime, datetime]:
+        inicio = input_data.inicio
+        fim = input_data.fim
+        if fim is not None and fim <= inicio:
+            raise ValueError("O fim do período deve ser posterior ao início.")
+        if fim is not None and (fim - inicio).days >= cls.MAXIMO_DIAS:
+            raise ValueError(f"O período consultado não pode passar de {cls.MAXIMO_DIAS} dias.")
+        return inicio, (fim or inicio) + DURACAO_MAXIMA_AGENDAMENTO
+
+    @staticmethod
+    def _disponiveis(
+        profissionais: list[Profissional], input_data: BuscaProfissionaisDisponiveisInput
+    ) -> list[ProfissionalDisponivel]:
+        inicio = input_data.inicio
+        fim = input_data.fim
+        disponiveis = []
+        for profissional in profissionais:
+            servico = next(s for s in profissional.servicos_oferecidos if s.nome == input_data.nome_servico)
+            if fim is None:
+                horarios = [inicio] if profissional.esta_disponivel(inicio, servico.duracao_minutos) else []
+            else:
+                horarios = profissional.horarios_livres(
+                    servico, inicio, fim,
+                    granularidade_minutos=input_data.granularidade_minutos,
+                    limite=input_data.limite_por_profissional
+                )
+            if horarios:
+                resumo = ProfissionalResumo(
+                    id=profissional.id, nome=profissional.nome, telefone_whatsapp=profissional.telefone_whatsapp
+                )
+                disponiveis.append(ProfissionalDisponivel(profissional=resumo, horarios=horarios))
+        return disponiveis
+
+
+# --- Variantes assíncronas (rotas 'async' da API) ---
+# Mesmas regras dos casos de uso acima; só o acesso ao repositório é aguardado.
+
+class RealizarAgendamentoAsyncUseCase:
+    """Versão assíncrona de RealizarAgendamentoUseCase."""
+
+    MAX_TENTATIVAS = RealizarAgendamentoUseCase.MAX_TENTATIVAS
+
+    def __init__(
+        self,
+        repositorio: IProfissionalRepositorioAsync,
+        fila_notificacoes: IFilaNotificacoes,
+        max_tentativas: int = MAX_TENTATIVAS,
+    ):
+        self.repositorio = repositorio
+        self.fila_notificacoes = fila_notificacoes
+        self.max_tentativas = max_tentativas
+
+    async def executar(self, input_data: AgendamentoInput) -> Agendamento:
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                profissional = await self.repositorio.buscar_por_id(
+                    input_data.profissional_id, janela=_janela_agendamento(input_data), somente_ocupacao=True
+                )
+                novo_agendamento = _registrar_agendamento(profissional, input_data, self.fila_notificacoes)
+                await self.repositorio.salvar(profissional)
+                return novo_agendamento
+            except ConflitoConcorrenciaError:
+                if tentativa == self.max_tentativas:
+                    raise
+
+
+class ConsultarDisponibilidadeAsyncUseCase:
+    """Versão assíncrona de ConsultarDisponibilidadeUseCase."""
+
+    def __init__(self, repositorio: IProfissionalRepositorioAsync):
+        self.repositorio = repositorio
+
+    async def executar(self, input_data: ConsultaDisponibilidadeInput) -> list[datetime]:
+        inicio, fim = ConsultarDisponibilidadeUseCase._periodo(input_data)
+        profissional = await self.repositorio.buscar_por_id(
+            input_data.profissional_id, janela=(inicio, fim + DURACAO_MAXIMA_AGENDAMENTO), somente_ocupacao=True
+        )
+        return ConsultarDisponibilidadeUseCase._horarios_livres(profissional, input_data, inicio, fim)
+
+
+class ConsultarAgendaPeriodoAsyncUseCase:
+    """Versão assíncrona de ConsultarAgendaPeriodoUseCase."""
+
+    def __init__(self, repositorio: IProfissionalRepositorioAsync):
+        self.repositorio = repositorio
+
+    async def executar(self, input_data: ConsultaAgendaPeriodoInput) -> list[Agendamento]:
+        listar = (
+            self.repositorio.listar_historico if input_data.incluir_arquivados
+            else self.repositorio.listar_agendamentos
+        )
+        agendamentos = await listar(
+            input_data.profissional_id, ConsultarAgendaPeriodoUseCase._periodo(input_data), status=input_data.status
+        )
+        return ConsultarAgendaPeriodoUseCase._agenda(agendamentos)
+
+
+class BuscarProfissionaisDisponiveisAsyncUseCase:
+    """Versão assíncrona de BuscarProfissionaisDisponiveisUseCase."""
+
+    def __init__(self, repositorio: IProfissionalRepositorioAsync):
+        self.repositorio = repositorio
+
+    async def executar(self, input_data: BuscaProfissionaisDisponiveisInput) -> list[ProfissionalDisponivel]:
+        profissionais = await self.repositorio.listar_por_servico(
+            input_data.nome_servico, BuscarProfissionaisDisponiveisUseCase._janela(input_data), somente_ocupacao=True
+        )
+        return BuscarProfissionaisDisponiveisUseCase._disponiveis(profissionais, input_data)
+
+
+class ResponderMensagemUseCase:
+    """
+    Caso de uso do chatbot de agendamento pelo WhatsApp.
+    Conduz a conversa em etapas (escolher o serviço → escolher o horário) e
+    guarda o estado entre as mensagens no armazém de conversas, com os serviços
+    do profissional e os últimos horários oferecidos.
+    """
+
+    DIAS_BUSCA = 7
+    HORARIOS_OFERECIDOS = 5
+    PALAVRAS_REINICIO = {"0", "menu", "voltar", "cancelar"}
+
+    def __init__(
+        self,
+        repositorio: IProfissionalRepositorio,
+        armazem_conversas: IArmazemConversas,
+        fila_notificacoes: IFilaNotificacoes,
+        agora: Callable[[], datetime] = datetime.now,
+    ):
+        self.repositorio = repositorio
+        self.armazem_conversas = armazem_conversas
+        self.fila_notificacoes = fila_notificacoes
+        self.agora = agora
+
+    def executar(self, input_data: MensagemRecebidaInput) -> str:
+        chave = (normalizar_numero_whatsapp(input_data.recipient), normalizar_numero_whatsapp(input_data.sender))
+        texto = input_data.text.strip()
+        estado = self.armazem_conversas.obter(chave)
+        if estado is None or texto.casefold() in self.PALAVRAS_REINICIO:
+            return self._iniciar(chave, texto)
+        if estado.etapa == EtapaConversa.ESCOLHENDO_HORARIO:
+            return self._escolher_horario(chave, estado, texto)
+        return self._escolher_servico(chave, estado, texto)
+
+    # --- Etapas da conversa ---
+
+    def _iniciar(self, chave: tuple[str, str], texto: str) -> str:
+        # Janela vazia: só os dados do profissional e seus serviços, sem agendamentos.
+        # Fica no início do dia para que as mensagens do dia repitam a chave do cache.
+        dia = janela_do_dia(self.agora().date())[0]
+        profissional = self.repositorio.buscar_por_telefone(chave[0], janela=(dia, dia))
+        if not profissional:
+            self.armazem_conversas.remover(chave)
+            return "Desculpe, este número não está vinculado a nenhum profissional do AgendIA."
+
+        estado = EstadoConversa(
+            profissional_id=profissional.id,
+            profissional_nome=profissional.nome,
+            servicos=profissional.servicos_oferecidos,
+        )
+        servico = self._identificar_servico(estado, texto)
+        if servico:
+            return self._oferecer_horarios(chave, estado, servico)
+        self.armazem_conversas.salvar(chave, estado)
+        return self._apresentar_servicos(estado)
+
+    def _escolher_servico(self, chave: tuple[str, str], estado: EstadoConversa, texto: str) -> str:
+        servico = self._identificar_servico(estado, texto)
+        if not servico:
+            self.armazem_conversas.salvar(chave, estado)
+            return "Não entendi. " + self._listar_servicos(estado)
+        return self._oferecer_horarios(chave, estado, servico)
+
+    def _oferecer_horarios(self, chave: tuple[str, str], estado: EstadoConversa, servico: Servico, aviso: str = "") -> str:
+        inicio = self.agora()
+        fim = inicio + timedelta(days=self.DIAS_BUSCA)
+        # Carrega dias inteiros, como em /disponibilidade: a janela (e a chave do cache)
+        # é a mesma para todas as mensagens do dia, e os horários continuam a partir de 'inicio'.
+        janela = janela_do_dia(inicio.date())[0], janela_do_dia(fim.date())[1] + DURACAO_MAXIMA_AGENDAMENTO
+        profissional = self.repositorio.buscar_por_id(estado.profissional_id, janela=janela, somente_ocupacao=True)
+        if not profissional:
+            self.armazem_conversas.remover(chave)
+            return "Desculpe, este número não está vinculado a nenhum profissional do AgendIA."
+
+        horarios = profissional.horarios_livres(servico, inicio, fim, limite=self.HORARIOS_OFERECIDOS)
+        if not horarios:
+            estado.etapa = EtapaConversa.ESCOLHENDO_SERVICO
+            self.armazem_conversas.salvar(chave, estado)
+            return (
+                f"{aviso}Não há horários livres para '{servico.nome}' nos próximos {self.DIAS_BUSCA} dias. "
+                + self._listar_servicos(estado)
+            )
+
+        estado.etapa = EtapaConversa.ESCOLHENDO_HORARIO
+        estado.servico_escolhido = servico.nome
+        estado.horarios_ofertados = horarios
+        self.armazem_conversas.salvar(chave, estado)
+        opcoes = "\n".join(f"{i}. {h.strftime('%d/%m às %H:%M')}" for i, h in enumerate(horarios, start=1))
+        return (
+            f"{aviso}Próximos horários para '{servico.nome}':\n{opcoes}\n"
+            "Responda com o número do horário desejado (ou 0 para voltar)."
+        )
+
+    def _escolher_horario(self, chave: tuple[str, str], estado: EstadoConversa, texto: str) -> str:
+        if not (texto.isdigit() and 1 <= int(texto) <= len(estado.horarios_ofertados)):
+            self.armazem_conversas.salvar(chave, estado)
+            return "Responda com o número de um dos horários oferecidos (ou 0 para voltar)."
+
+        horario = estado.horarios_ofertados[int(texto) - 1]
+        servico = next(s for s in estado.servicos if s.nome == estado.servico_escolhido)
+        try:
+            RealizarAgendamentoUseCase(self.repositorio, self.fila_notificacoes).executar(AgendamentoInput(
+                profissional_id=estado.profissional_id,
+                cliente_contato=chave[1],
+                nome_servico=servico.nome,
+                data_hora_inicio=horario,
+            ))
+        except ProfissionalNaoEncontradoError:
+            self.armazem_conversas.remover(chave)
+            return "Desculpe, este número não está vinculado a nenhum profissional do AgendIA."
+        except (ValueError, ServicoNaoEncontradoError, ConflitoConcorrenciaError):
+            # O horário foi ocupado desde que foi oferecido: oferece os atuais.
+            return self._oferecer_horarios(chave, estado, servico, aviso="Esse horário acabou de ser ocupado. ")
+
+        self.armazem_conversas.remover(chave)
+        return (
+            f"Pronto! ✅ Seu agendamento de '{servico.nome}' com {estado.profissional_nome} "
+            f"está confirmado para {horario.strftime('%d/%m às %H:%M')}."
+        )
+
+    # --- Auxiliares ---
+
+    @staticmethod
+    def _identificar_servico(estado: EstadoConversa, texto: str) -> Servico | None:
+        """Aceita o número da opção ('2') ou o nome do serviço, sem diferenciar maiúsculas."""
+        escolha = texto.casefold()
+        if escolha.isdigit() and 1 <= int(escolha) <= len(estado.servicos):
+            return estado.servicos[int(escolha) - 1]
+        return next((s for s in estado.servicos if s.nome.casefold() == escolha), None)
+
+    @staticmethod
+    def _listar_servicos(estado: EstadoConversa) -> str:
+        opcoes = "\n".join(f"{i}. {s.nome} ({s.duracao_minutos} min)" for i, s in enumerate(estado.servicos, start=1))
+        return f"Qual serviço você deseja agendar?\n{opcoes}"
+
+    def _apresentar_servicos(self, estado: EstadoConversa) -> str:
+        if not estado.servicos:
+            return f"Olá! Aqui é {estado.profissional_nome}. No momento não há serviços disponíveis para agendamento."
+        return f"Olá! Aqui é {estado.profissional_nome}. " + self._listar_servicos(estado)
+
+
+# --- Importação em massa ---
+
+FORMATOS_IMPORTACAO = ("ndjson", "csv")
+
+class LinhaImportacao(BaseModel):
+    """
+    Uma linha do arquivo de importação. NDJSON e CSV usam as mesmas colunas;
+    'tipo' diz o que a linha descreve:
+    - profissional: telefone_whatsapp, nome, horario_trabalho;
+    - servico: telefone_whatsapp, servico, duracao_minutos (o serviço passa a ser oferecido pelo profissional);
+    - agendamento: telefone_whatsapp, servico, data_hora_inicio, cliente_contato e, opcionais,
+      status, id e duracao_minutos (dispensável se o serviço já for conhecido).
+    Um serviço já conhecido (cadastrado ou visto antes no arquivo) mantém a sua duração:
+    linhas que informam outra são recusadas.
+    No CSV, 'horario_trabalho' é escrito como '0=09:00-18:00;1=09:00-18:00' (dia da semana=início-fim).
+    """
+    tipo: Literal["profissional", "servico", "agendamento"]
+    telefone_whatsapp: str
+    nome: str | None = None
+    horario_trabalho: dict[int, tuple[time, time]] = Field(default_factory=dict)
+    servico: str | None = None
+    duracao_minutos: int | None = None
+    id: UUID | None = None
+    data_hora_inicio: datetime | None = None
+    cliente_contato: str | None = None
+    status: AgendamentoStatus | None = None
+
+    @field_validator("horario_trabalho", mode="before")
+    @classmethod
+    def ler_horario_texto(cls, valor):
+        if not isinstance(valor, str):
+            return valor
+        horario = {}
+        for trecho in filter(None, (t.strip() for t in valor.split(";"))):
+            dia, _, periodo = trecho.partition("=")
+            inicio, _, fim = periodo.partition("-")
+            horario[dia] = (inicio, fim)
+        return horario
+
+class ErroImportacao(BaseModel):
+    linha: int
+    mensagem: str
+
+class ResultadoImportacao(BaseModel):
+    linhas_lidas: int = 0
+    profissionais_inseridos: int = 0
+    profissionais_atualizados: int = 0
+    servicos_inseridos: int = 0
+    vinculos_inseridos: int = 0
+    agendamentos_inseridos: int = 0
+    agendamentos_ignorados: int = 0
+    linhas_com_erro: int = 0
+    # Apenas os primeiros erros são relatados; 'linhas_com_erro' tem o total.
+    erros: list[ErroImportacao] = Field(default_factory=list)
+
+
+class ImportarCadastroUseCase:
+    """
+    Importa profissionais, serviços e agendamentos históricos de um arquivo
+    NDJSON ou CSV (ver LinhaImportacao).
+    Cada linha é validada pelos modelos de domínio, sem as regras de
+    expediente (o histórico já aconteceu). Agendamentos concluídos ou
+    cancelados precisam já ter terminado; os confirmados ocupam a agenda e são
+    recusados pelo importador se coincidirem com outro. As linhas válidas são gravadas
+    em lotes de 'tamanho_lote', uma transação por lote. Linhas inválidas são
+    relatadas e não impedem as demais.
+    Um profissional precisa aparecer no arquivo antes dos seus serviços e
+    agendamentos, ou já estar cadastrado.
+    """
+
+    TAMANHO_LOTE = 5000
+    MAX_ERROS_RELATADOS = 100
+
+    def __init__(self, importador: IImportadorCadastro, tamanho_lote: int = TAMANHO_LOTE):
+        self.importador = importador
+        self.tamanho_lote = tamanho_lote
+
+    def executar(
+        self, linhas: Iterable[str], formato: str = "ndjson", atualizar_existentes: bool = False
+    ) -> ResultadoImportacao:
+        if formato not in FORMATOS_IMPORTACAO:
+            raise ValueError(f"Formato '{formato}' não suportado. Use um destes: {', '.join(FORMATOS_IMPORTACAO)}.")
+        resultado = ResultadoImportacao()
+        # Serviços já vistos no arquivo ou no banco (None = não cadastrado), para completar a duração.
+        servicos: dict[str, Servico | None] = {}
+        lote = LoteImportacao()
+        for numero, registro in self._registros(linhas, formato):
+            resultado.linhas_lidas += 1
+            try:
+                linha = (LinhaImportacao.model_validate_json(registro) if isinstance(registro, str)
+                         else LinhaImportacao.model_validate(registro))
+                self._adicionar(lote, numero, linha, servicos)
+            except ValueError as e:  # inclui ValidationError
+                self._registrar_erro(resultado, numero, e)
+            if len(lote) >= self.tamanho_lote:
+                self._gravar(lote, atualizar_existentes, resultado)
+                lote = LoteImportacao()
+        if len(lote):
+            self._gravar(lote, atualizar_existentes, resultado)
+        return resultado
+
+    @staticmethod
+    def _registros(linhas: Iterable[str], formato: str) -> Iterator[tuple[int, str | dict]]:
+        """Retorna (número da linha, registro): o texto JSON no NDJSON, o dicionário de colunas no CSV."""
+        if formato == "ndjson":
+            for numero, linha in enumerate(linhas, start=1):
+                if linha.strip():
+                    yield numero, linha
+            return
+        leitor = csv.DictReader(linhas)
+        for registro in leitor:
+            # Células vazias valem como colunas ausentes.
+            yield leitor.line_num, {coluna: valor for coluna, valor in registro.items() if valor not in ("", None)}
+
+    def _adicionar(
+        self, lote: LoteImportacao, numero: int, linha: LinhaImportacao, servicos: dict[str, Servico | None]
+    ) -> None:
+        if linha.tipo == "profissional":
+            if not linha.nome:
+                raise ValueError("'nome' é obrigatório para profissionais.")
+            lote.profissionais.append(Profissional(
+                nome=linha.nome, telefone_whatsapp=linha.telefone_whatsapp, horario_trabalho=linha.horario_trabalho
+            ))
+        elif linha.tipo == "servico":
+            servico = self._servico(lote, linha, servicos)
+            lote.vinculos.append((numero, linha.telefone_whatsapp, servico.nome))
+        else:
+            if linha.data_hora_inicio is None or not linha.cliente_contato:
+                raise ValueError("'data_hora_inicio' e 'cliente_contato' são obrigatórios para agendamentos.")
+            dados = {
+                "servico": self._servico(lote, linha, servicos),
+                "data_hora_inicio": linha.data_hora_inicio,
+                "cliente_contato": linha.cliente_contato,
+            }
+            if linha.id is not None:
+                dados["id"] = linha.id
+            if linha.status is not None:
+                dados["status"] = linha.status
+            agendamento = Agendamento(**dados)
+            if agendamento.status != AgendamentoStatus.CONFIRMADO and agendamento.data_hora_fim > datetime.now():
+                raise ValueError("Agendamentos concluídos ou cancelados só podem ser importados depois de terminarem.")
+            lote.agendamentos.append((numero, linha.telefone_whatsapp, agendamento))
+
+    def _servico(self, lote: LoteImportacao, linha: LinhaImportacao, servicos: dict[str, Servico | None]) -> Servico:
+        """O serviço da linha: o já conhecido ou, se for novo, com a duração informada."""
+        if not linha.servico:
+            raise ValueError("'servico' é obrigatório.")
+        if linha.servico not in servicos:
+            servicos[linha.servico] = self.importador.buscar_servicos({linha.servico}).get(linha.servico)
+        conhecido = servicos[linha.servico]
+        if conhecido is not None:
+            # A duração gravada é a do serviço: é com ela que os agendamentos são lidos de volta.
+            if linha.duracao_minutos not in (None, conhecido.duracao_minutos):
+                raise ValueError(
+                    f"Serviço '{conhecido.nome}' já cadastrado com {conhecido.duracao_minutos} minutos; "
+                    f"a linha informa {linha.duracao_minutos}."
+                )
+            return conhecido
+        if linha.duracao_minutos is None:
+            raise ValueError(f"Serviço '{linha.servico}' não cadastrado: informe 'duracao_minutos'.")
+        servico = Servico(nome=linha.servico, duracao_minutos=linha.duracao_minutos)
+        servicos[servico.nome] = servico
+        lote.servicos.append(servico)
+        return servico
+
+    def _gravar(self, lote: LoteImportacao, atualizar_existentes: bool, resultado: ResultadoImportacao) -> None:
+        parcial = self.importador.gravar_lote(lote, atualizar_existentes=atualizar_existentes)
+        for campo in ResultadoLote.model_fields:
+            if campo != "erros":
+                setattr(resultado, campo, getattr(resultado, campo) + getattr(parcial, campo))
+        for numero, mensagem in parcial.erros:
+            self._registrar_erro(resultado, numero, mensagem)
+
+    def _registrar_erro(self, resultado: ResultadoImportacao, numero: int, erro: Exception | str) -> None:
+        resultado.linhas_com_erro += 1
+        if len(resultado.erros) >= self.MAX_ERROS_RELATADOS:
+            return
+        if isinstance(erro, ValidationError):
+            mensagem = "; ".join(
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+                for e in erro.errors(include_url=False)
+            )
+        else:
+            mensagem = str(erro)
+        resultado.erros.append(ErroImportacao(linha=numero, mensagem=mensagem))
+
+
+# --- Exportação da agenda ---
+
+# Tipo de conteúdo de cada formato de exportação.
+FORMATOS_EXPORTACAO = {"ndjson": "application/x-ndjson", "csv": "text/csv", "ics": "text/calendar"}
+
+class ExportacaoAgendaInput(BaseModel):
+    profissional_id: UUID
+    data_inicio: date
+    data_fim: date
+    formato: Literal["ndjson", "csv", "ics"] = "ndjson"
+
+@dataclass
+class AgendaExportada:
+    """
+    Agenda pronta para envio. 'versao' e 'atualizado_em' identificam o estado
+    exportado (ETag/Last-Modified); 'conteudo' só consulta o banco quando é percorrido.
+    """
+    versao: int
+    atualizado_em: datetime | None
+    conteudo: Iterator[str] | AsyncIterator[str]
+
+
+class _SerializadorAgenda:
+    """Converte agendamentos em texto: cabeçalho, uma entrada por agendamento e rodapé."""
+
+    COLUNAS_CSV = ("id", "servico", "duracao_minutos", "data_hora_inicio", "data_hora_fim", "cliente_contato", "status")
+    STATUS_ICS = {
+        AgendamentoStatus.CONFIRMADO: "CONFIRMED",
+        AgendamentoStatus.CONCLUIDO: "CONFIRMED",
+        AgendamentoStatus.CANCELADO: "CANCELLED",
+    }
+
+    def __init__(self, formato: str, atualizado_em: datetime | None):
+        self.formato = formato
+        self.carimbo = (atualizado_em or datetime(1970, 1, 1)).strftime("%Y%m%dT%H%M%SZ")
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+
+    def cabecalho(self) -> str:
+        if self.formato == "csv":
+            return self._linha_csv(self.COLUNAS_CSV)
+        if self.formato == "ics":
+            return "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//AgendIA//Agenda//PT-BR\r\nCALSCALE:GREGORIAN\r\n"
+        return ""
+
+    def entrada(self, agendamento: Agendamento) -> str:
+        if self.formato == "csv":
+            return self._linha_csv((
+                agendamento.id, agendamento.servico.nome, agendamento.servico.duracao_minutos,
+                agendamento.data_hora_inicio.isoformat(), agendamento.data_hora_fim.isoformat(),
+                agendamento.cliente_contato, agendamento.status.value,
+            ))
+        if self.formato == "ics":
+            # Horários "flutuantes" (sem fuso), como são guardados: valem no fuso local do profissional.
+            return "".join(self._dobrar(linha) for linha in (
+                "BEGIN:VEVENT",
+                f"UID:{agendamento.id}@agendia",
+                f"DTSTAMP:{self.carimbo}",
+                f"DTSTART:{agendamento.data_hora_inicio.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND:{agendamento.data_hora_fim.strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:{self._texto_ics(agendamento.servico.nome)} - {self._texto_ics(agendamento.cliente_contato)}",
+                f"STATUS:{self.STATUS_ICS[agendamento.status]}",
+                "END:VEVENT",
+            ))
+        return agendamento.model_dump_json() + "\n"
+
+    def rodape(self) -> str:
+        return "END:VCALENDAR\r\n" if self.formato == "ics" else ""
+
+    def _linha_csv(self, valores) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._csv.writerow(valores)
+        return self._buffer.getvalue()
+
+    @staticmethod
+    def _texto_ics(texto: str) -> str:
+        return (texto.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+                .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+    @staticmethod
+    def _dobrar(linha: str) -> str:
+        """Quebra linhas com mais de 75 octetos, como exige o iCalendar (RFC 5545, 3.1)."""
+        dados = linha.encode()
+        if len(dados) <= 75:
+            return linha + "\r\n"
+        partes, atual = [], b""
+        for caractere in linha:
+            codificado = caractere.encode()
+            if len(atual) + len(codificado) > (75 if not partes else 74):
+                partes.append(atual.decode())
+                atual = b""
+            atual += codificado
+        partes.append(atual.decode())
+        return "\r\n ".join(partes) + "\r\n"
+
+
+class ExportarAgendaUseCase:
+    """
+    Exporta os agendamentos de um profissional em um período (NDJSON, CSV ou
+    iCalendar), incluindo os arquivados, de forma incremental: os agendamentos são
+    lidos do banco em lotes e enviados em blocos, com memória constante qualquer
+    que seja o período.
+    """
+
+    TAMANHO_LOTE = 1000
+
+    def __init__(self, repositorio: IProfissionalRepositorio):
+        self.repositorio = repositorio
+
+    def executar(self, input_data: ExportacaoAgendaInput) -> AgendaExportada:
+        versao, atualizado_em = self._atualizacao(self.repositorio.obter_atualizacao(input_data.profissional_id))
+        # Validada aqui, e não no gerador: um período inválido falha antes de a resposta começar.
+        janela = self._janela(input_data)
+        serializador = _SerializadorAgenda(input_data.formato, atualizado_em)
+
+        def conteudo() -> Iterator[str]:
+            yield serializador.cabecalho()
+            bloco = []
+            for agendamento in self.repositorio.iterar_agendamentos(
+                input_data.profissional_id, janela, tamanho_lote=self.TAMANHO_LOTE
+            ):
+                bloco.append(serializador.entrada(agendamento))
+                if len(bloco) >= self.TAMANHO_LOTE:
+                    yield "".join(bloco)
+                    bloco.clear()
+            yield "".join(bloco) + serializador.rodape()
+
+        return AgendaExportada(versao=versao, atualizado_em=atualizado_em, conteudo=conteudo())
+
+    @staticmethod
+    def _atualizacao(atualizacao: tuple[int, datetime | None] | None) -> tuple[int, datetime | None]:
+        if atualizacao is None:
+            raise ProfissionalNaoEncontradoError("Profissional não encontrado.")
+        return atualizacao
+
+    @staticmethod
+    def _janela(input_data: ExportacaoAgendaInput) -> tuple[datetime, datetime]:
+        if input_data.data_fim < input_data.data_inicio:
+            raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+        return janela_do_dia(input_data.data_inicio)[0], janela_do_dia(input_data.data_fim)[1]
+
+
+class ExportarAgendaAsyncUseCase:
+    """Variante assíncrona de ExportarAgendaUseCase, para as rotas 'async' da API."""
+
+    def __init__(self, repositorio: IProfissionalRepositorioAsync):
+        self.repositorio = repositorio
+
+    async def executar(self, input_data: ExportacaoAgendaInput) -> AgendaExportada:
+        versao, atualizado_em = ExportarAgendaUseCase._atualizacao(
+            await self.repositorio.obter_atualizacao(input_data.profissional_id)
+        )
+        janela = ExportarAgendaUseCase._janela(input_data)
+        serializador = _SerializadorAgenda(input_data.formato, atualizado_em)
+        tamanho_lote = ExportarAgendaUseCase.TAMANHO_LOTE
+
+        async def conteudo() -> AsyncIterator[str]:
+            yield serializador.cabecalho()
+            bloco = []
+            async for agendamento in self.repositorio.iterar_agendamentos(
+                input_data.profissional_id, janela, tamanho_lote=tamanho_lote
+            ):
+                bloco.append(serializador.entrada(agendamento))
+                if len(bloco) >= tamanho_lote:
+                    yield "".join(bloco)
+                    bloco.clear()
+            yield "".join(bloco) + serializador.rodape()
+
+        return AgendaExportada(versao=versao, atualizado_em=atualizado_em, conteudo=conteudo())
@@ -1,8 +1,18 @@
 import uuid
-from datetime import datetime, time, timedelta
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, time, timedelta
 from enum import Enum
 
-from pydantic import BaseModel, Field, model_validator
+import numpy as np
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+
+
+# Duração máxima de um serviço. Permite limitar as buscas por sobreposição de
+# horários a uma janela finita (ver repositórios e casos de uso).
+DURACAO_MAXIMA_AGENDAMENTO = timedelta(days=1)
 
 
 class AgendamentoStatus(str, Enum):
@@ -18,7 +28,10 @@ class Servico(BaseModel):
     É um objeto de valor simples, definido por seu nome e duração.
     """
     nome: str = Field(..., min_length=3, description="Nome do serviço. Ex: Corte de Cabelo")
-    duracao_minutos: int = Field(..., gt=0, description="Duração do serviço em minutos.")
+    duracao_minutos: int = Field(
+        ..., gt=0, le=DURACAO_MAXIMA_AGENDAMENTO // timedelta(minutes=1),
+        description="Duração do serviço em minutos."
+    )
 
 
 class Agendamento(BaseModel):
@@ -50,6 +63,289 @@ class Agendamento(BaseModel):
         self.status = AgendamentoStatus.CONCLUIDO
 
 
+class ProfissionalResumo(BaseModel):
+    """
+    Projeção leve de um Profissional, usada em listagens.
+    Não carrega serviços nem agendamentos.
+    """
+    id: uuid.UUID
+    nome: str
+    telefone_whatsapp: str
+
+
+class IndiceAgenda:
+    """
+    Índice ordenado dos agendamentos CONFIRMADOS de um profissional.
+    Mantém os intervalos ordenados por data_hora_inicio, de modo que a checagem
+    de conflito é feita por busca binária em vez de varrer todo o histórico.
+    """
+    __slots__ = ("_inicios", "_agendamentos", "_duracao_maxima")
+
+    def __init__(self, agendamentos: list[Agendamento] | None = None):
+        self._inicios: list[datetime] = []
+        self._agendamentos: list[Agendamento] = []
+        self._duracao_maxima = timedelta(0)
+        confirmados = sorted(
+            (ag for ag in agendamentos or [] if ag.status == AgendamentoStatus.CONFIRMADO),
+            key=lambda ag: ag.data_hora_inicio
+        )
+        for agendamento in confirmados:
+            self._inicios.append(agendamento.data_hora_inicio)
+            self._agendamentos.append(agendamento)
+            self._atualizar_duracao_maxima(agendamento)
+
+    def __len__(self) -> int:
+        return len(self._agendamentos)
+
+    def _atualizar_duracao_maxima(self, agendamento: Agendamento):
+        duracao = agendamento.data_hora_fim - agendamento.data_hora_inicio
+        if duracao > self._duracao_maxima:
+            self._duracao_maxima = duracao
+
+    def adicionar(self, agendamento: Agendamento):
+        posicao = bisect_right(self._inicios, agendamento.data_hora_inicio)
+        self._inicios.insert(posicao, agendamento.data_hora_inicio)
+        self._agendamentos.insert(posicao, agendamento)
+        self._atualizar_duracao_maxima(agendamento)
+
+    def remover(self, agendamento: Agendamento):
+        posicao = bisect_left(self._inicios, agendamento.data_hora_inicio)
+        while posicao < len(self._inicios) and self._inicios[posicao] == agendamento.data_hora_inicio:
+            if self._agendamentos[posicao] is agendamento:
+                del self._inicios[posicao]
+                del self._agendamentos[posicao]
+                return
+            posicao += 1
+
+    def conflitos(self, inicio: datetime, fim: datetime) -> list[Agendamento]:
+        """
+        Retorna os agendamentos confirmados que se sobrepõem a [inicio, fim).
+        Só precisam ser examinados os que começam em (inicio - duracao_maxima, fim).
+        """
+        primeiro = bisect_right(self._inicios, inicio - self._duracao_maxima)
+        ultimo = bisect_left(self._inicios, fim)
+        encontrados, obsoletos = [], []
+        for agendamento in self._agendamentos[primeiro:ultimo]:
+            # Agendamentos cancelados/concluídos diretamente pela entidade saem do índice aqui.
+            if agendamento.status != AgendamentoStatus.CONFIRMADO:
+                obsoletos.append(agendamento)
+            elif agendamento.data_hora_fim > inicio:
+                encontrados.append(agendamento)
+        for agendamento in obsoletos:
+            self.remover(agendamento)
+        return encontrados
+
+
+_EPOCA = datetime(1970, 1, 1)
+_UM_SEGUNDO = timedelta(seconds=1)
+_SEGUNDOS_POR_DIA = 86_400
+_ORDINAL_EPOCA = _EPOCA.toordinal()
+
+
+def _em_segundos(instantes: Iterable[datetime] | np.ndarray) -> np.ndarray:
+    """Segundos desde 1970 (int64) de datetimes sem fuso ou de um array datetime64."""
+    if isinstance(instantes, np.ndarray):
+        return instantes.astype("datetime64[s]", copy=False).view(np.int64)
+    # Aritmética de inteiros sobre os campos: bem mais rápida que dividir timedeltas.
+    return np.fromiter(
+        (
+            (i.toordinal() - _ORDINAL_EPOCA) * _SEGUNDOS_POR_DIA + i.hour * 3600 + i.minute * 60 + i.second
+            for i in instantes
+        ),
+        dtype=np.int64,
+    )
+
+
+class AgendaCompacta:
+    """
+    Ocupação de um profissional em forma colunar: início e fim dos agendamentos
+    confirmados, em segundos desde 1970 (sem fuso, como os datetimes do domínio),
+    em dois arrays de inteiros ordenados pelo início.
+
+    É a representação das leituras de agenda (consultar e reservar horários):
+    ocupa ~16 bytes por horário, em vez de um Agendamento com seu Servico, e
+    responde às mesmas buscas que o IndiceAgenda. Imutável depois de criada.
+    """
+    __slots__ = ("_inicios", "_fins", "_duracao_maxima")
+
+    def __init__(self, intervalos: Iterable[tuple[datetime, datetime]] = ()):
+        pares = sorted(((inicio - _EPOCA) // _UM_SEGUNDO, (fim - _EPOCA) // _UM_SEGUNDO) for inicio, fim in intervalos)
+        self._inicios = array("q", [inicio for inicio, _ in pares])
+        self._fins = array("q", [fim for _, fim in pares])
+        self._duracao_maxima = max((fim - inicio for inicio, fim in pares), default=0)
+
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+    def __deepcopy__(self, memo) -> 'AgendaCompacta':
+        # Imutável: cópias do agregado (ex.: as entregues pelo cache) podem compartilhá-la.
+        return self
+
+    def intervalos(self, inicio: datetime, fim: datetime) -> list[tuple[datetime, datetime]]:
+        """Retorna, em ordem de início, os intervalos ocupados que se sobrepõem a [inicio, fim)."""
+        a, b = (inicio - _EPOCA) // _UM_SEGUNDO, (fim - _EPOCA) // _UM_SEGUNDO
+        primeiro = bisect_right(self._inicios, a - self._duracao_maxima)
+        ultimo = bisect_left(self._inicios, b)
+        return [
+            (_EPOCA + timedelta(seconds=i), _EPOCA + timedelta(seconds=f))
+            for i, f in zip(self._inicios[primeiro:ultimo], self._fins[primeiro:ultimo])
+            if f > a
+        ]
+
+    def em_segundos(self, a: int, b: int) -> tuple[np.ndarray, np.ndarray]:
+        """Como 'intervalos', com os limites e o resultado em segundos: arrays (inícios, fins) NumPy."""
+        inicios = np.frombuffer(self._inicios, dtype=np.int64)
+        fins = np.frombuffer(self._fins, dtype=np.int64)
+        primeiro = np.searchsorted(inicios, a - self._duracao_maxima, side="right")
+        ultimo = np.searchsorted(inicios, b, side="left")
+        inicios, fins = inicios[primeiro:ultimo], fins[primeiro:ultimo]
+        sobrepostos = fins > a
+        return inicios[sobrepostos], fins[sobrepostos]
+
+
+Turno = tuple[time, time]
+
+
+class CalendarioTrabalho(BaseModel):
+    """
+    Ajustes ao horário semanal de um profissional ('horario_trabalho'):
+    - pausas: intervalos sem atendimento em um dia da semana (ex.: almoço),
+      que dividem o expediente em turnos;
+    - feriados: datas sem expediente;
+    - excecoes: turnos de uma data específica, no lugar dos da semana
+      (ex.: véspera de feriado só pela manhã).
+    Imutável: para alterar, crie outro (ex.: com 'model_copy(update=...)').
+    """
+    model_config = ConfigDict(frozen=True)
+
+    pausas: dict[int, list[Turno]] = Field(default_factory=dict)
+    feriados: frozenset[date] = frozenset()
+    excecoes: dict[date, list[Turno]] = Field(default_factory=dict)
+
+    @model_validator(mode='after')
+    def validar_intervalos(self) -> 'CalendarioTrabalho':
+        for turnos in (*self.pausas.values(), *self.excecoes.values()):
+            if any(inicio >= fim for inicio, fim in turnos):
+                raise ValueError("Cada intervalo do calendário deve terminar depois de começar.")
+        return self
+
+    def __deepcopy__(self, memo) -> 'CalendarioTrabalho':
+        return self
+
+
+def _segundos_do_dia(horario: time) -> int:
+    return horario.hour * 3600 + horario.minute * 60 + horario.second
+
+
+def _horario_do_dia(segundos: int) -> time:
+    return time(segundos // 3600, segundos // 60 % 60, segundos % 60)
+
+
+def _turnos_em_segundos(turnos: Iterable[Turno]) -> list[tuple[int, int]]:
+    return [(_segundos_do_dia(abertura), _segundos_do_dia(fechamento)) for abertura, fechamento in turnos]
+
+
+def _normalizar_turnos(turnos: Iterable[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    """Ordena os turnos, descarta os vazios e une os que se sobrepõem."""
+    unidos: list[tuple[int, int]] = []
+    for abertura, fechamento in sorted(t for t in turnos if t[0] < t[1]):
+        if unidos and abertura <= unidos[-1][1]:
+            unidos[-1] = (unidos[-1][0], max(unidos[-1][1], fechamento))
+        else:
+            unidos.append((abertura, fechamento))
+    return tuple(unidos)
+
+
+def _descontar_pausas(turnos: tuple[tuple[int, int], ...], pausas: Iterable[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    for pausa_inicio, pausa_fim in pausas:
+        turnos = tuple(
+            parte
+            for abertura, fechamento in turnos
+            for parte in ((abertura, min(fechamento, pausa_inicio)), (max(abertura, pausa_fim), fechamento))
+            if parte[0] < parte[1]
+        )
+    return turnos
+
+
+# Limite de término dos turnos que acabam no fechamento do horário semanal: como sempre
+# foi, o atendimento pode começar até o fechamento, mesmo que termine depois dele.
+SEM_LIMITE = 10**12
+
+
+def _com_limites(turnos: tuple[tuple[int, int], ...], fechamentos_livres: Iterable[int] = ()) -> tuple[tuple[int, int, int], ...]:
+    """(abertura, fechamento, limite): o atendimento precisa terminar até 'limite' (pausa, fim de exceção)."""
+    livres = set(fechamentos_livres)
+    return tuple(
+        (abertura, fechamento, SEM_LIMITE if fechamento in livres else fechamento) for abertura, fechamento in turnos
+    )
+
+
+class CalendarioCompilado:
+    """
+    Expedientes de um profissional já resolvidos por dia: para cada dia da
+    semana e para cada data com exceção (feriados são exceções sem turnos),
+    uma tupla ordenada de turnos (abertura, fechamento, limite) em segundos
+    desde a meia-noite, com as pausas já descontadas. Os turnos de qualquer
+    data saem de uma busca em dicionário, sem converter horários.
+
+    Um atendimento começa em [abertura, fechamento) e termina até 'limite':
+    o início da pausa que corta o turno ou o fim do turno de uma exceção.
+    No fechamento do horário semanal não há limite (SEM_LIMITE).
+
+    Guarda a origem (horário semanal e calendário) para o Profissional saber
+    se continua válido. Imutável depois de criado.
+    """
+    __slots__ = ("_semana", "_excecoes", "_horario_trabalho", "_calendario", "_como_horarios")
+
+    def __init__(self, horario_trabalho: dict[int, Turno], calendario: CalendarioTrabalho):
+        self._horario_trabalho = dict(horario_trabalho)
+        self._calendario = calendario
+        semana = []
+        for dia in range(7):
+            expediente = _normalizar_turnos(_turnos_em_segundos([horario_trabalho[dia]] if dia in horario_trabalho else []))
+            turnos = _descontar_pausas(expediente, _turnos_em_segundos(calendario.pausas.get(dia, [])))
+            semana.append(_com_limites(turnos, (fechamento for _, fechamento in expediente)))
+        self._semana = tuple(semana)
+        self._excecoes = {
+            dia: _com_limites(_normalizar_turnos(_turnos_em_segundos(turnos)))
+            for dia, turnos in calendario.excecoes.items()
+        }
+        self._excecoes.update(dict.fromkeys(calendario.feriados, ()))
+        # Os mesmos turnos como 'time', para montar datetimes com 'datetime.combine' (limite None = sem limite).
+        self._como_horarios = {
+            turnos: tuple(
+                (_horario_do_dia(a), _horario_do_dia(f), None if limite == SEM_LIMITE else _horario_do_dia(limite))
+                for a, f, limite in turnos
+            )
+            for turnos in {*self._semana, *self._excecoes.values()}
+        }
+
+    def __deepcopy__(self, memo) -> 'CalendarioCompilado':
+        return self
+
+    def compilado_de(self, horario_trabalho: dict[int, Turno], calendario: CalendarioTrabalho) -> bool:
+        return (calendario is self._calendario or calendario == self._calendario) \
+            and horario_trabalho == self._horario_trabalho
+
+    def turnos(self, dia: date) -> tuple[tuple[int, int, int], ...]:
+        """Turnos (abertura, fechamento, limite) do dia, em segundos desde a meia-noite e em ordem."""
+        if self._excecoes:
+            turnos = self._excecoes.get(dia)
+            if turnos is not None:
+                return turnos
+        return self._semana[dia.weekday()]
+
+    def janelas(self, dia: date) -> list[tuple[datetime, datetime, datetime | None]]:
+        """Turnos do dia como datetimes (abertura, fechamento, limite), em ordem; limite None = sem limite."""
+        return [
+            (
+                datetime.combine(dia, abertura), datetime.combine(dia, fechamento),
+                None if limite is None else datetime.combine(dia, limite),
+            )
+            for abertura, fechamento, limite in self._como_horarios[self.turnos(dia)]
+        ]
+
+
 class Profissional(BaseModel):
     """
     Representa o profissional, que é a raiz de agregação principal.
@@ -60,29 +356,232 @@ class Profissional(BaseModel):
     telefone_whatsapp: str  # <-- CAMPO CORRIGIDO/ADICIONADO
     servicos_oferecidos: list[Servico] = Field(default_factory=list)
     agendamentos: list[Agendamento] = Field(default_factory=list)
-    horario_trabalho: dict[int, tuple[time, time]] = Field(default_factory=dict)
+    horario_trabalho: dict[int, Turno] = Field(default_factory=dict)
+    # Pausas, feriados e exceções ao horário semanal.
+    calendario: CalendarioTrabalho = Field(default_factory=CalendarioTrabalho)
+    # Versão persistida do agregado, mantida pelo repositório (0 = ainda não salvo).
+    versao: int = 0
 
-    def esta_disponivel(self, data_hora_desejada: datetime, duracao_servico: int) -> bool:
-        dia_da_semana = data_hora_desejada.weekday()
-        horario_desejado = data_hora_desejada.time()
+    _indice: IndiceAgenda | None = PrivateAttr(default=None)
+    _total_indexado: int = PrivateAttr(default=0)
+    # Agendamentos confirmados já persistidos que não estão em 'agendamentos' (ver carregar_ocupacao).
+    _ocupacao: AgendaCompacta | None = PrivateAttr(default=None)
+    _calendario_compilado: CalendarioCompilado | None = PrivateAttr(default=None)
 
-        if dia_da_semana not in self.horario_trabalho:
-            return False
+    def carregar_ocupacao(self, ocupacao: AgendaCompacta) -> None:
+        """
+        Registra horários ocupados sem materializá-los como Agendamento.
+        Usado pelos repositórios nas leituras que só consultam ou reservam
+        horários: a disponibilidade considera a ocupação e os 'agendamentos';
+        cancelar ou concluir exige o agendamento carregado em 'agendamentos'.
+        """
+        self._ocupacao = ocupacao
+
+    @property
+    def ocupacao(self) -> AgendaCompacta | None:
+        return self._ocupacao
+
+    def carregar_calendario(self, compilado: CalendarioCompilado) -> None:
+        """
+        Reaproveita um calendário já compilado (ex.: pelo repositório, para a
+        mesma versão do profissional). Se não corresponder mais ao horário e
+        ao calendário do agregado, é compilado de novo no próximo uso.
+        """
+        self._calendario_compilado = compilado
+
+    def calendario_compilado(self) -> CalendarioCompilado:
+        # Lido direto de '__pydantic_private__': o acesso normal a atributos privados passa pelo
+        # __getattr__ do pydantic e custaria mais que a própria checagem de disponibilidade.
+        compilado = self.__pydantic_private__["_calendario_compilado"]
+        # Recompila se o horário ou o calendário tiverem sido trocados ou alterados por fora.
+        if compilado is None or not compilado.compilado_de(self.horario_trabalho, self.calendario):
+            compilado = self._calendario_compilado = CalendarioCompilado(self.horario_trabalho, self.calendario)
+        return compilado
+
+    def _indice_agenda(self) -> IndiceAgenda:
+        # O índice é construído sob demanda e reconstruído se a lista de
+        # agendamentos for alterada por fora dos métodos do agregado.
+        if self._indice is None or self._total_indexado != len(self.agendamentos):
+            self._indice = IndiceAgenda(self.agendamentos)
+            self._total_indexado = len(self.agendamentos)
+        return self._indice
 
-        inicio_trabalho, fim_trabalho = self.horario_trabalho[dia_da_semana]
-        if not (inicio_trabalho <= horario_desejado < fim_trabalho):
+    def _janelas_trabalho(self, dia: date) -> list[tuple[datetime, datetime, datetime | None]]:
+        """
+        Retorna, em ordem, as janelas (abertura, fechamento, limite) do dia: um atendimento começa
+        em [abertura, fechamento) e termina até 'limite' (início da pausa ou fim da exceção; None
+        no fechamento do horário semanal, até o qual o atendimento pode começar).
+        """
+        return self.calendario_compilado().janelas(dia)
+
+    def _intervalos_ocupados(self, inicio: datetime, fim: datetime) -> list[tuple[datetime, datetime]]:
+        """Intervalos confirmados (da ocupação compacta e de 'agendamentos') que se sobrepõem a [inicio, fim), em ordem."""
+        ocupacao = self._ocupacao
+        if ocupacao is not None and not self.agendamentos:
+            return ocupacao.intervalos(inicio, fim)
+        intervalos = [(ag.data_hora_inicio, ag.data_hora_fim) for ag in self._indice_agenda().conflitos(inicio, fim)]
+        if ocupacao is None:
+            return intervalos
+        compactos = ocupacao.intervalos(inicio, fim)
+        return sorted(intervalos + compactos) if intervalos else compactos
+
+    def _blocos_ocupados(self, inicio: datetime, fim: datetime) -> list[tuple[datetime, datetime]]:
+        """Une os agendamentos confirmados que tocam [inicio, fim) em blocos disjuntos e ordenados."""
+        blocos: list[tuple[datetime, datetime]] = []
+        for comeco, termino in self._intervalos_ocupados(inicio, fim):
+            if blocos and comeco <= blocos[-1][1]:
+                blocos[-1] = (blocos[-1][0], max(blocos[-1][1], termino))
+            else:
+                blocos.append((comeco, termino))
+        return blocos
+
+    def esta_disponivel(self, data_hora_desejada: datetime, duracao_servico: int) -> bool:
+        turnos = self.calendario_compilado().turnos(data_hora_desejada.date())
+        # Segundos inteiros bastam: aberturas e fechamentos também são inteiros.
+        segundo = _segundos_do_dia(data_hora_desejada)
+        termino = segundo + duracao_servico * 60
+        if not any(abertura <= segundo < fechamento and termino <= limite for abertura, fechamento, limite in turnos):
             return False
 
         fim_horario_desejado = (data_hora_desejada + timedelta(minutes=duracao_servico))
 
-        for agendamento in self.agendamentos:
-            if agendamento.status == AgendamentoStatus.CONFIRMADO:
-                if (max(agendamento.data_hora_inicio, data_hora_desejada) <
-                        min(agendamento.data_hora_fim, fim_horario_desejado)):
-                    return False
-        return True
+        return not self._intervalos_ocupados(data_hora_desejada, fim_horario_desejado)
+
+    def disponibilidade_em_lote(self, inicios: Sequence[datetime] | np.ndarray, duracao_servico: int) -> np.ndarray:
+        """
+        Versão vetorizada de 'esta_disponivel', para testar muitos horários de
+        uma vez (grades de horários, buscas entre profissionais). Retorna uma
+        máscara booleana com o resultado de cada início, na mesma ordem.
+
+        Expedientes e intervalos ocupados viram arrays int64 de segundos e cada
+        candidato é resolvido por busca binária (np.searchsorted), sem laço em
+        Python por candidato. Aceita datetimes ou, mais barato de converter, um
+        array datetime64 (ex.: np.arange(inicio, fim, passo)).
+        """
+        segundos = _em_segundos(inicios)
+        if segundos.size == 0:
+            return np.zeros(0, dtype=bool)
+        duracao = duracao_servico * 60
+
+        # O candidato precisa começar dentro de um expediente do seu dia.
+        primeiro_dia, ultimo_dia = int(segundos.min()) // _SEGUNDOS_POR_DIA, int(segundos.max()) // _SEGUNDOS_POR_DIA
+        if ultimo_dia - primeiro_dia < segundos.size:
+            dias = np.arange(primeiro_dia, ultimo_dia + 1)
+        else:
+            dias = np.unique(segundos // _SEGUNDOS_POR_DIA)  # Poucos candidatos espalhados em muitos dias
+        aberturas, fechamentos, limites = self._expedientes_em_segundos(dias)
+        if aberturas.size == 0:
+            return np.zeros(segundos.size, dtype=bool)
+        expediente = np.searchsorted(aberturas, segundos, side="right") - 1
+        turno = np.maximum(expediente, 0)
+        disponivel = (expediente >= 0) & (segundos < fechamentos[turno]) & (segundos + duracao <= limites[turno])
+
+        # E nenhum intervalo que começa antes do fim do candidato pode terminar depois do seu início.
+        comecos, terminos = self._ocupados_em_segundos(int(segundos.min()), int(segundos.max()) + duracao)
+        if comecos.size:
+            anteriores = np.searchsorted(comecos, segundos + duracao, side="left")
+            maior_termino = np.maximum.accumulate(terminos)
+            disponivel &= (anteriores == 0) | (maior_termino[np.maximum(anteriores - 1, 0)] <= segundos)
+        return disponivel
+
+    def _expedientes_em_segundos(self, dias: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aberturas, fechamentos e limites, em ordem, das janelas de trabalho dos dias (contados desde 1970)."""
+        calendario = self.calendario_compilado()
+        aberturas, fechamentos, limites = [], [], []
+        for dia in dias.tolist():
+            meia_noite = dia * _SEGUNDOS_POR_DIA
+            for abertura, fechamento, limite in calendario.turnos(date.fromordinal(_ORDINAL_EPOCA + dia)):
+                aberturas.append(meia_noite + abertura)
+                fechamentos.append(meia_noite + fechamento)
+                limites.append(meia_noite + limite)
+        return (
+            np.array(aberturas, dtype=np.int64), np.array(fechamentos, dtype=np.int64), np.array(limites, dtype=np.int64)
+        )
+
+    def _ocupados_em_segundos(self, a: int, b: int) -> tuple[np.ndarray, np.ndarray]:
+        """Como '_intervalos_ocupados', em segundos: arrays (inícios, fins) ordenados pelo início."""
+        partes = []
+        if self.agendamentos:
+            conflitos = self._indice_agenda().conflitos(_EPOCA + timedelta(seconds=a), _EPOCA + timedelta(seconds=b))
+            partes.append((
+                _em_segundos(ag.data_hora_inicio for ag in conflitos), _em_segundos(ag.data_hora_fim for ag in conflitos)
+            ))
+        if self._ocupacao is not None:
+            partes.append(self._ocupacao.em_segundos(a, b))
+        if len(partes) == 1:
+            return partes[0]
+        if not partes:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        comecos = np.concatenate([comecos for comecos, _ in partes])
+        ordem = np.argsort(comecos, kind="stable")
+        return comecos[ordem], np.concatenate([terminos for _, terminos in partes])[ordem]
+
+    def horarios_livres(
+        self, servico: Servico, inicio: datetime, fim: datetime,
+        granularidade_minutos: int = 15, limite: int | None = None
+    ) -> list[datetime]:
+        """
+        Retorna os horários em [inicio, fim) nos quais 'servico' pode ser agendado,
+        na grade de 'granularidade_minutos' contada a partir da abertura de cada expediente.
+        Um horário é livre exatamente quando 'esta_disponivel' o aceitaria.
+
+        Faz uma única varredura do expediente contra os blocos ocupados (já
+        ordenados pelo índice), saltando direto para o fim de cada bloco.
+        """
+        passo = timedelta(minutes=granularidade_minutos)
+        duracao = timedelta(minutes=servico.duracao_minutos)
+        ocupados = self._blocos_ocupados(inicio, fim + duracao)
+
+        def primeiro_da_grade(abertura: datetime, minimo: datetime) -> datetime:
+            if minimo <= abertura:
+                return abertura
+            return abertura + -((abertura - minimo) // passo) * passo
+
+        livres: list[datetime] = []
+        bloco = 0
+        dia = inicio.date()
+        while dia <= fim.date():
+            for abertura, fechamento, termino_maximo in self._janelas_trabalho(dia):
+                candidato = primeiro_da_grade(abertura, inicio)
+                ultimo_inicio = min(fechamento, fim)
+                while candidato < ultimo_inicio and (termino_maximo is None or candidato + duracao <= termino_maximo):
+                    while bloco < len(ocupados) and ocupados[bloco][1] <= candidato:
+                        bloco += 1
+                    if bloco < len(ocupados) and ocupados[bloco][0] < candidato + duracao:
+                        candidato = primeiro_da_grade(abertura, ocupados[bloco][1])
+                        continue
+                    livres.append(candidato)
+                    if limite is not None and len(livres) >= limite:
+                        return livres
+                    candidato += passo
+            dia += timedelta(days=1)
+        return livres
 
     def adicionar_novo_agendamento(self, agendamento: Agendamento):
         if not self.esta_disponivel(agendamento.data_hora_inicio, agendamento.servico.duracao_minutos):
             raise ValueError("Horário indisponível para este serviço.")
-        self.agendamentos.append(agendamento)
\ No newline at end of file
+        indice = self._indice_agenda()
+        self.agendamentos.append(agendamento)
+        if agendamento.status == AgendamentoStatus.CONFIRMADO:
+            indice.adicionar(agendamento)
+        self._total_indexado = len(self.agendamentos)
+
+    def _buscar_agendamento(self, id_agendamento: uuid.UUID) -> Agendamento:
+        agendamento = next((ag for ag in self.agendamentos if ag.id == id_agendamento), None)
+        if agendamento is None:
+            raise ValueError("Agendamento não encontrado na agenda deste profissional.")
+        return agendamento
+
+    def cancelar_agendamento(self, id_agendamento: uuid.UUID) -> Agendamento:
+        """Cancela um agendamento da agenda e libera o horário no índice."""
+        agendamento = self._buscar_agendamento(id_agendamento)
+        agendamento.cancelar()
+        self._indice_agenda().remover(agendamento)
+        return agendamento
+
+    def concluir_agendamento(self, id_agendamento: uuid.UUID) -> Agendamento:
+        """Conclui um agendamento da agenda e o retira do índice de horários ocupados."""
+        agendamento = self._buscar_agendamento(id_agendamento)
+        agendamento.concluir()
+        self._indice_agenda().remover(agendamento)
+        return agendamento
@@ -0,0 +1,134 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from agendia.core.domain import AgendamentoStatus
+from . import metricas
+from .importacao import CHAVES_POR_CONSULTA
+from .models import AgendamentoArquivadoDB, AgendamentoDB, ProfissionalDB, agora_utc
+
+logger = logging.getLogger(__name__)
+
+# Só agendamentos encerrados saem da tabela operacional.
+STATUS_ARQUIVAVEIS = (AgendamentoStatus.CONCLUIDO, AgendamentoStatus.CANCELADO)
+
+_COLUNAS = ("id", "cliente_contato", "data_hora_inicio", "data_hora_fim", "status", "atualizado_em",
+            "servico_id", "profissional_id")
+
+
+class ArquivadorAgendamentos:
+    """
+    Move os agendamentos concluídos e cancelados que começaram antes do
+    horizonte (por padrão, 180 dias atrás) para a tabela 'agendamentos_arquivados'.
+    A tabela operacional fica do tamanho da agenda recente: carregar um
+    agregado, reservar horários e consultar a agenda não passam pelo histórico.
+
+    - Cada lote é uma transação curta (copia, remove e commita): no SQLite, o
+      lock de escrita é liberado entre um lote e outro e as gravações da API
+      entram nos intervalos.
+    - O lote é selecionado pelo índice (status, data_hora_inicio); a cópia e a
+      remoção repetem o filtro, então uma linha alterada nesse meio-tempo não sai.
+    - A versão dos profissionais afetados é incrementada no mesmo lote: caches
+      são invalidados e um agregado lido antes do arquivamento não regrava, no
+      'salvar', os agendamentos que já saíram (ConflitoConcorrenciaError).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        horizonte_dias: float = 180,
+        tamanho_lote: int = CHAVES_POR_CONSULTA,
+        intervalo_segundos: float = 3600.0,
+        pausa_entre_lotes_segundos: float = 0.05,
+    ):
+        self.session_factory = session_factory
+        self.horizonte = timedelta(days=horizonte_dias)
+        self.tamanho_lote = min(tamanho_lote, CHAVES_POR_CONSULTA)
+        self.intervalo_segundos = intervalo_segundos
+        self.pausa_entre_lotes_segundos = pausa_entre_lotes_segundos
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="arquivador-agendamentos", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float | None = 10.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executar(self) -> None:
+        # O primeiro ciclo espera um intervalo: a inicialização da API não disputa o banco com o arquivamento.
+        while not self._parar.wait(self.intervalo_segundos):
+            try:
+                self.processar()
+            except Exception:
+                logger.exception("Erro inesperado ao arquivar agendamentos.")
+
+    # --- Processamento ---
+
+    def _arquivaveis(self, corte: datetime):
+        return (
+            AgendamentoDB.status.in_(STATUS_ARQUIVAVEIS),
+            AgendamentoDB.data_hora_inicio < corte,
+        )
+
+    def processar(self, agora: datetime | None = None) -> int:
+        """Arquiva, lote a lote, tudo o que passou do horizonte e retorna quantos agendamentos foram movidos."""
+        corte = (agora or datetime.now()) - self.horizonte
+        total = 0
+        while not self._parar.is_set():
+            movidos = self._arquivar_lote(corte)
+            total += movidos
+            if movidos < self.tamanho_lote:
+                break
+            if self.pausa_entre_lotes_segundos:
+                self._parar.wait(self.pausa_entre_lotes_segundos)
+        return total
+
+    def _arquivar_lote(self, corte: datetime) -> int:
+        session = self.session_factory()
+        try:
+            lote = session.execute(
+                select(AgendamentoDB.id, AgendamentoDB.profissional_id)
+                .where(*self._arquivaveis(corte))
+                .limit(self.tamanho_lote)
+            ).all()
+            if not lote:
+                return 0
+            ids = [id_ for id_, _ in lote]
+            condicoes = (AgendamentoDB.id.in_(ids), *self._arquivaveis(corte))
+            colunas = [getattr(AgendamentoDB, nome) for nome in _COLUNAS]
+            copiados = session.execute(insert(AgendamentoArquivadoDB).from_select(
+                [*_COLUNAS, "arquivado_em"], select(*colunas, literal(agora_utc())).where(*condicoes)
+            )).rowcount
+            removidos = session.execute(
+                delete(AgendamentoDB).where(*condicoes).execution_options(synchronize_session=False)
+            ).rowcount
+            if copiados != removidos:
+                raise RuntimeError(f"Arquivamento inconsistente: {copiados} copiados, {removidos} removidos.")
+            session.execute(
+                update(ProfissionalDB)
+                .where(ProfissionalDB.id.in_(list({id_profissional for _, id_profissional in lote})))
+                .values(versao=ProfissionalDB.versao + 1)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        metricas.agendamentos_arquivados.incrementar(valor=removidos)
+        return removidos
@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Collection, Iterator
+from datetime import datetime
+from typing import Callable
+from uuid import UUID
+
+from agendia.application.ports import IProfissionalRepositorio
+from agendia.core.domain import Agendamento, AgendamentoStatus, Profissional, ProfissionalResumo
+
+Janela = tuple[datetime, datetime] | None
+# (id do profissional, janela carregada, somente a ocupação compacta)
+Chave = tuple[UUID, Janela, bool]
+
+
+class CacheProfissionais:
+    """
+    Cache de agregados Profissional, compartilhado pelas requisições do processo.
+
+    - As entradas são indexadas por (id, janela carregada, forma da agenda) e expiram
+      'ttl_segundos' após serem guardadas.
+    - No máximo 'max_itens' ficam guardados; ao passar disso, o usado há mais
+      tempo é descartado (LRU).
+    - Cada leitura compara a versão guardada com a atual do banco, o que mantém
+      o cache correto mesmo com outros processos gravando no mesmo arquivo.
+    - Quem lê recebe uma cópia: alterar o agregado não altera o cache.
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 1000,
+        ttl_segundos: float = 30.0,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self.relogio = relogio
+        self._itens: OrderedDict[Chave, tuple[float, Profissional]] = OrderedDict()
+        self._chaves_por_id: dict[UUID, set[Chave]] = {}
+        self._ids_por_telefone: dict[str, UUID] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.invalidados = 0
+        self.descartados_lru = 0
+
+    def id_por_telefone(self, telefone: str) -> UUID | None:
+        with self._lock:
+            return self._ids_por_telefone.get(telefone)
+
+    def obter(self, chave: Chave, versao_atual: Callable[[], int | None]) -> Profissional | None:
+        """
+        Retorna uma cópia do agregado guardado, ou None se não houver entrada
+        válida. 'versao_atual' é consultada fora do lock para validar a entrada.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.faltas += 1
+                return None
+            expira_em, profissional = item
+            if expira_em <= self.relogio():
+                self._descartar(chave)
+                self.expirados += 1
+                self.faltas += 1
+                return None
+
+        if versao_atual() != profissional.versao:
+            with self._lock:
+                self._invalidar(chave[0])
+                self.faltas += 1
+            return None
+
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+            self.acertos += 1
+        return profissional.model_copy(deep=True)
+
+    def guardar(self, chave: Chave, profissional: Profissional) -> None:
+        copia = profissional.model_copy(deep=True)
+        with self._lock:
+            self._itens[chave] = (self.relogio() + self.ttl_segundos, copia)
+            self._itens.move_to_end(chave)
+            self._chaves_por_id.setdefault(profissional.id, set()).add(chave)
+            self._ids_por_telefone[profissional.telefone_whatsapp] = profissional.id
+            while len(self._itens) > self.max_itens:
+                self._descartar(next(iter(self._itens)))
+                self.descartados_lru += 1
+
+    def invalidar(self, id_profissional: UUID) -> None:
+        """Descarta todas as entradas do profissional (ex.: após uma gravação)."""
+        with self._lock:
+            self._invalidar(id_profissional)
+
+    def _invalidar(self, id_profissional: UUID) -> None:
+        for chave in list(self._chaves_por_id.get(id_profissional, ())):
+            self._descartar(chave)
+            self.invalidados += 1
+
+    def _descartar(self, chave: Chave) -> None:
+        _, profissional = self._itens.pop(chave)
+        chaves = self._chaves_por_id[profissional.id]
+        chaves.discard(chave)
+        if not chaves:
+            del self._chaves_por_id[profissional.id]
+            if self._ids_por_telefone.get(profissional.telefone_whatsapp) == profissional.id:
+                del self._ids_por_telefone[profissional.telefone_whatsapp]
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def estatisticas(self) -> dict[str, float]:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "itens": len(self._itens),
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "expirados": self.expirados,
+                "invalidados": self.invalidados,
+                "descartados_lru": self.descartados_lru,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
+
+
+class CacheProfissionalRepositorio(IProfissionalRepositorio):
+    """
+    Decorador de leitura (read-through) para um IProfissionalRepositorio.
+    'buscar_por_id' e 'buscar_por_telefone' passam pelo cache; 'salvar'
+    invalida as entradas do profissional. As listagens vão direto ao repositório.
+    """
+
+    def __init__(self, repositorio: IProfissionalRepositorio, cache: CacheProfissionais):
+        self.repositorio = repositorio
+        self.cache = cache
+
+    def salvar(self, profissional: Profissional) -> None:
+        try:
+            self.repositorio.salvar(profissional)
+        finally:
+            self.cache.invalidar(profissional.id)
+
+    def _do_cache(self, id_profissional: UUID, janela: Janela, somente_ocupacao: bool) -> Profissional | None:
+        return self.cache.obter(
+            (id_profissional, janela, somente_ocupacao),
+            versao_atual=lambda: self.repositorio.obter_versao(id_profissional),
+        )
+
+    def _guardar(self, profissional: Profissional | None, janela: Janela, somente_ocupacao: bool) -> Profissional | None:
+        if profissional is not None:
+            self.cache.guardar((profissional.id, janela, somente_ocupacao), profissional)
+        return profissional
+
+    def buscar_por_id(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        profissional = self._do_cache(id_profissional, janela, somente_ocupacao)
+        if profissional is not None:
+            return profissional
+        return self._guardar(
+            self.repositorio.buscar_por_id(id_profissional, janela=janela, somente_ocupacao=somente_ocupacao),
+            janela, somente_ocupacao,
+        )
+
+    def buscar_por_telefone(
+        self, telefone: str, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        id_profissional = self.cache.id_por_telefone(telefone)
+        if id_profissional is not None:
+            profissional = self._do_cache(id_profissional, janela, somente_ocupacao)
+            # O telefone pode ter mudado desde que a entrada foi guardada.
+            if profissional is not None and profissional.telefone_whatsapp == telefone:
+                return profissional
+        return self._guardar(
+            self.repositorio.buscar_por_telefone(telefone, janela=janela, somente_ocupacao=somente_ocupacao),
+            janela, somente_ocupacao,
+        )
+
+    def obter_versao(self, id_profissional: UUID) -> int | None:
+        return self.repositorio.obter_versao(id_profissional)
+
+    def obter_atualizacao(self, id_profissional: UUID) -> tuple[int, datetime | None] | None:
+        return self.repositorio.obter_atualizacao(id_profissional)
+
+    def iterar_agendamentos(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime], tamanho_lote: int = 1000
+    ) -> Iterator[Agendamento]:
+        return self.repositorio.iterar_agendamentos(id_profissional, janela, tamanho_lote=tamanho_lote)
+
+    def listar_agendamentos(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        return self.repositorio.listar_agendamentos(id_profissional, janela, status=status)
+
+    def listar_historico(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        return self.repositorio.listar_historico(id_profissional, janela, status=status)
+
+    def listar_por_servico(
+        self, nome_servico: str, janela: tuple[datetime, datetime], somente_ocupacao: bool = False
+    ) -> list[Profissional]:
+        return self.repositorio.listar_por_servico(nome_servico, janela, somente_ocupacao=somente_ocupacao)
+
+    def listar_todos(self) -> list[Profissional]:
+        return self.repositorio.listar_todos()
+
+    def listar_resumos(self, after_id: UUID | None = None, limit: int = 100) -> list[ProfissionalResumo]:
+        return self.repositorio.listar_resumos(after_id=after_id, limit=limit)
+
+    def iterar_resumos(self, tamanho_lote: int = 1000) -> Iterator[ProfissionalResumo]:
+        return self.repositorio.iterar_resumos(tamanho_lote=tamanho_lote)
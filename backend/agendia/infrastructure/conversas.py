@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from agendia.application.ports import IArmazemConversas, EstadoConversa
+
+
+class MemoriaArmazemConversas(IArmazemConversas):
+    """
+    Armazém de conversas em memória, local ao processo.
+
+    - Cada conversa expira 'ttl_segundos' após a última gravação.
+    - No máximo 'max_conversas' ficam guardadas; ao passar disso, a usada há
+      mais tempo é descartada (LRU), o que limita o uso de memória.
+    - Contadores de acertos, faltas e descartes ficam em 'estatisticas()'.
+    """
+
+    def __init__(
+        self,
+        max_conversas: int = 10_000,
+        ttl_segundos: float = 1800.0,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.max_conversas = max_conversas
+        self.ttl_segundos = ttl_segundos
+        self.relogio = relogio
+        self._conversas: OrderedDict[tuple[str, str], tuple[float, EstadoConversa]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.expiradas = 0
+        self.descartadas_lru = 0
+
+    def obter(self, chave: tuple[str, str]) -> EstadoConversa | None:
+        with self._lock:
+            item = self._conversas.get(chave)
+            if item is None:
+                self.faltas += 1
+                return None
+            expira_em, estado = item
+            if expira_em <= self.relogio():
+                del self._conversas[chave]
+                self.expiradas += 1
+                self.faltas += 1
+                return None
+            self._conversas.move_to_end(chave)
+            self.acertos += 1
+            return estado
+
+    def salvar(self, chave: tuple[str, str], estado: EstadoConversa) -> None:
+        with self._lock:
+            self._conversas[chave] = (self.relogio() + self.ttl_segundos, estado)
+            self._conversas.move_to_end(chave)
+            while len(self._conversas) > self.max_conversas:
+                self._conversas.popitem(last=False)
+                self.descartadas_lru += 1
+
+    def remover(self, chave: tuple[str, str]) -> None:
+        with self._lock:
+            self._conversas.pop(chave, None)
+
+    def __len__(self) -> int:
+        return len(self._conversas)
+
+    def estatisticas(self) -> dict[str, float]:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "conversas": len(self._conversas),
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "expiradas": self.expiradas,
+                "descartadas_lru": self.descartadas_lru,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
@@ -1,19 +1,101 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# URL de conexão para o banco de dados SQLite.
-# O arquivo 'agendia.db' será criado na raiz da pasta 'backend/'
-DATABASE_URL = "sqlite:///./agendia.db"
+from agendia.config import settings
+from .metricas import instrumentar_engine
+
+# URL de conexão com o banco de dados, definida em Settings ('DATABASE_URL' no .env).
+# Por padrão, o arquivo 'agendia.db' é criado na raiz da pasta 'backend/'.
+DATABASE_URL = settings.database_url
+
+# Driver assíncrono de cada banco suportado: o mesmo banco, acessado sem bloquear o event loop.
+DRIVERS_ASSINCRONOS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def url_assincrona(url: str) -> str:
+    """Troca o driver da URL pelo seu equivalente assíncrono (ex.: 'sqlite://' → 'sqlite+aiosqlite://')."""
+    dialeto, resto = url.split("://", 1)
+    return f"{DRIVERS_ASSINCRONOS.get(dialeto.split('+')[0], dialeto)}://{resto}"
+
+
+def pragmas_sqlite() -> dict[str, object]:
+    """PRAGMAs aplicados a cada nova conexão SQLite, conforme o perfil em Settings."""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+    }
+
+
+def _opcoes_engine(url: str, pool_size: int, max_overflow: int) -> dict:
+    url_ = make_url(url)
+    opcoes: dict = {}
+    if url_.get_backend_name() == "sqlite":
+        # Necessário apenas para SQLite: a conexão é usada por threads diferentes da que a abriu.
+        opcoes["connect_args"] = {"check_same_thread": False}
+        if url_.database in (None, "", ":memory:"):
+            return opcoes  # Banco em memória: o pool padrão já mantém uma única conexão.
+    else:
+        # Servidores de banco podem derrubar conexões ociosas; valida antes de reutilizar.
+        opcoes["pool_pre_ping"] = True
+    opcoes.update(pool_size=pool_size, max_overflow=max_overflow)
+    return opcoes
+
+
+def _registrar_pragmas(engine: Engine, pragmas: dict[str, object]) -> None:
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+
+def criar_engine(
+    url: str,
+    pool_size: int = settings.database_pool_size,
+    max_overflow: int = settings.database_max_overflow,
+    pragmas: dict[str, object] | None = None,
+) -> Engine:
+    """
+    Cria o engine síncrono com o pool e, no SQLite, os PRAGMAs do perfil (ou os informados).
+    Os comandos emitidos entram nas métricas de SQL (ver metricas.instrumentar_engine).
+    """
+    engine = create_engine(url, **_opcoes_engine(url, pool_size, max_overflow))
+    _registrar_pragmas(engine, pragmas_sqlite() if pragmas is None else pragmas)
+    instrumentar_engine(engine)
+    return engine
+
+
+def criar_async_engine(
+    url: str,
+    pool_size: int = settings.database_pool_size,
+    max_overflow: int = settings.database_max_overflow,
+    pragmas: dict[str, object] | None = None,
+) -> AsyncEngine:
+    """Equivalente assíncrono de 'criar_engine', para a mesma URL com o driver assíncrono."""
+    url = url_assincrona(url)
+    async_engine = create_async_engine(url, **_opcoes_engine(url, pool_size, max_overflow))
+    _registrar_pragmas(async_engine.sync_engine, pragmas_sqlite() if pragmas is None else pragmas)
+    instrumentar_engine(async_engine.sync_engine)
+    return async_engine
+
 
 # O 'engine' é o ponto de entrada principal para o SQLAlchemy
-engine = create_engine(
-    DATABASE_URL, 
-    # 'connect_args' é necessário apenas para SQLite para permitir o uso em múltiplos threads
-    connect_args={"check_same_thread": False}
-)
+engine = criar_engine(DATABASE_URL)
 
 # 'SessionLocal' é uma fábrica de sessões. Cada instância dela será uma sessão de banco de dados.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine e fábrica de sessões assíncronas, usadas pelas rotas 'async' da API.
+async_engine = criar_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 # 'Base' é uma classe base da qual todos os nossos modelos ORM (tabelas) irão herdar.
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
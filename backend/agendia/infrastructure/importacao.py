@@ -0,0 +1,262 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from agendia.application.ports import IImportadorCadastro, LoteImportacao, ResultadoLote
+from agendia.core.domain import AgendamentoStatus, DURACAO_MAXIMA_AGENDAMENTO, Servico
+from .models import AgendamentoDB, ProfissionalDB, ServicoDB, profissional_servico_association, agora_utc
+
+# INSERT com ON CONFLICT de cada banco suportado.
+INSERTS_COM_CONFLITO = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Chaves por consulta 'IN (...)', abaixo do limite de parâmetros de versões antigas do SQLite.
+CHAVES_POR_CONSULTA = 500
+
+profissionais = ProfissionalDB.__table__
+servicos = ServicoDB.__table__
+agendamentos = AgendamentoDB.__table__
+
+
+class SQLiteImportadorCadastro(IImportadorCadastro):
+    """
+    Importador em massa sobre o SQLAlchemy Core: cada tabela do lote é gravada
+    com um único INSERT de várias linhas (executemany), e os conflitos nas
+    chaves naturais ('telefone_whatsapp', 'servicos.nome', id do agendamento)
+    são resolvidos pelo próprio banco com ON CONFLICT.
+    Os ids de profissionais e serviços já resolvidos ficam guardados entre os
+    lotes de uma mesma importação.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._insert = INSERTS_COM_CONFLITO[session.get_bind().dialect.name]
+        self._ids_profissionais: dict[str, UUID] = {}
+        self._ids_servicos: dict[str, UUID] = {}
+
+    def buscar_servicos(self, nomes: set[str]) -> dict[str, Servico]:
+        encontrados = {}
+        for parte in _em_partes(sorted(nomes)):
+            for servico_db in self.session.execute(select(servicos).where(servicos.c.nome.in_(parte))):
+                encontrados[servico_db.nome] = Servico(nome=servico_db.nome, duracao_minutos=servico_db.duracao_minutos)
+        return encontrados
+
+    def gravar_lote(self, lote: LoteImportacao, atualizar_existentes: bool = False) -> ResultadoLote:
+        resultado = ResultadoLote()
+        try:
+            self._gravar_profissionais(lote, atualizar_existentes, resultado)
+            self._gravar_servicos(lote, resultado)
+            alterados = self._gravar_vinculos(lote, resultado) | self._gravar_agendamentos(lote, resultado)
+            if alterados:
+                # Agregados alterados mudam de versão, como em 'salvar': caches e leituras concorrentes percebem.
+                self.session.execute(
+                    update(profissionais)
+                    .where(profissionais.c.id.in_(alterados))
+                    .values(versao=profissionais.c.versao + 1)
+                )
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            # Ids resolvidos dentro da transação desfeita podem não existir mais.
+            self._ids_profissionais.clear()
+            self._ids_servicos.clear()
+            raise
+        return resultado
+
+    def _gravar_profissionais(self, lote: LoteImportacao, atualizar_existentes: bool, resultado: ResultadoLote) -> None:
+        # Telefone repetido no lote: vale a última linha.
+        por_telefone = {p.telefone_whatsapp: p for p in lote.profissionais}
+        if not por_telefone:
+            return
+        existentes = self._resolver(profissionais.c.telefone_whatsapp, por_telefone, self._ids_profissionais)
+        linhas = [
+            {
+                "id": p.id,
+                "nome": p.nome,
+                "telefone_whatsapp": p.telefone_whatsapp,
+                "horario_trabalho": {
+                    str(dia): [inicio.isoformat(), fim.isoformat()] for dia, (inicio, fim) in p.horario_trabalho.items()
+                },
+                "versao": 1,
+            }
+            for telefone, p in por_telefone.items()
+            if atualizar_existentes or telefone not in existentes
+        ]
+        if not linhas:
+            return
+        insert = self._insert(profissionais)
+        if atualizar_existentes:
+            insert = insert.on_conflict_do_update(
+                index_elements=[profissionais.c.telefone_whatsapp],
+                set_={
+                    "nome": insert.excluded.nome,
+                    "horario_trabalho": insert.excluded.horario_trabalho,
+                    "versao": profissionais.c.versao + 1,
+                    "atualizado_em": agora_utc(),
+                },
+            )
+        else:
+            insert = insert.on_conflict_do_nothing(index_elements=[profissionais.c.telefone_whatsapp])
+        self.session.execute(insert, linhas)
+        resultado.profissionais_inseridos += len(por_telefone) - len(existentes)
+        if atualizar_existentes:
+            resultado.profissionais_atualizados += len(existentes)
+
+    def _gravar_servicos(self, lote: LoteImportacao, resultado: ResultadoLote) -> None:
+        por_nome = {s.nome: s for s in lote.servicos}
+        existentes = self._resolver(servicos.c.nome, por_nome, self._ids_servicos)
+        novos = [{"nome": s.nome, "duracao_minutos": s.duracao_minutos}
+                 for nome, s in por_nome.items() if nome not in existentes]
+        if novos:
+            insert = self._insert(servicos).on_conflict_do_nothing(index_elements=[servicos.c.nome])
+            self.session.execute(insert, novos)
+            resultado.servicos_inseridos += len(novos)
+
+    def _gravar_vinculos(self, lote: LoteImportacao, resultado: ResultadoLote) -> set[UUID]:
+        ids_profissionais = self._resolver(
+            profissionais.c.telefone_whatsapp, {t for _, t, _ in lote.vinculos}, self._ids_profissionais
+        )
+        ids_servicos = self._resolver(servicos.c.nome, {n for _, _, n in lote.vinculos}, self._ids_servicos)
+        pares = {}
+        for numero, telefone, nome in lote.vinculos:
+            erro = _referencia_ausente(telefone, nome, ids_profissionais, ids_servicos)
+            if erro:
+                resultado.erros.append((numero, erro))
+                continue
+            pares.setdefault((ids_profissionais[telefone], ids_servicos[nome]), numero)
+
+        # A tabela de associação não tem restrição de unicidade: os pares existentes são filtrados aqui.
+        assoc = profissional_servico_association
+        for parte in _em_partes(sorted({p for p, _ in pares})):
+            consulta = select(assoc.c.profissional_id, assoc.c.servico_id).where(assoc.c.profissional_id.in_(parte))
+            for par in self.session.execute(consulta):
+                pares.pop(tuple(par), None)
+        if pares:
+            self.session.execute(
+                assoc.insert(), [{"profissional_id": p, "servico_id": s} for p, s in pares]
+            )
+            resultado.vinculos_inseridos += len(pares)
+        return {p for p, _ in pares}
+
+    def _gravar_agendamentos(self, lote: LoteImportacao, resultado: ResultadoLote) -> set[UUID]:
+        ids_profissionais = self._resolver(
+            profissionais.c.telefone_whatsapp, {t for _, t, _ in lote.agendamentos}, self._ids_profissionais
+        )
+        ids_servicos = self._resolver(
+            servicos.c.nome, {a.servico.nome for _, _, a in lote.agendamentos}, self._ids_servicos
+        )
+        linhas, numeros = [], []
+        for numero, telefone, agendamento in lote.agendamentos:
+            erro = _referencia_ausente(telefone, agendamento.servico.nome, ids_profissionais, ids_servicos)
+            if erro:
+                resultado.erros.append((numero, erro))
+                continue
+            numeros.append(numero)
+            linhas.append({
+                "id": agendamento.id,
+                "cliente_contato": agendamento.cliente_contato,
+                "data_hora_inicio": agendamento.data_hora_inicio,
+                "data_hora_fim": agendamento.data_hora_fim,
+                "status": agendamento.status,
+                "servico_id": ids_servicos[agendamento.servico.nome],
+                "profissional_id": ids_profissionais[telefone],
+            })
+        linhas, versao_incrementada = self._recusar_horarios_ocupados(linhas, numeros, resultado)
+        if not linhas:
+            return set()
+        insert = self._insert(agendamentos).on_conflict_do_nothing(index_elements=[agendamentos.c.id])
+        inseridos = self.session.execute(insert, linhas).rowcount
+        resultado.agendamentos_inseridos += inseridos
+        resultado.agendamentos_ignorados += len(linhas) - inseridos
+        return {linha["profissional_id"] for linha in linhas} - versao_incrementada
+
+    def _recusar_horarios_ocupados(
+        self, linhas: list[dict], numeros: list[int], resultado: ResultadoLote
+    ) -> tuple[list[dict], set[UUID]]:
+        """
+        Agendamentos confirmados ocupam a agenda: como no agendamento pela API, não podem
+        se sobrepor a outro confirmado do mesmo profissional, já gravado ou do próprio arquivo.
+        Retorna as linhas aceitas e os profissionais cuja versão já foi incrementada.
+        """
+        confirmadas: dict[UUID, list[tuple[dict, int]]] = defaultdict(list)
+        for linha, numero in zip(linhas, numeros):
+            if linha["status"] == AgendamentoStatus.CONFIRMADO:
+                confirmadas[linha["profissional_id"]].append((linha, numero))
+        if not confirmadas:
+            return linhas, set()
+
+        # Primeira escrita da verificação: toma o lock de escrita no SQLite (as linhas, no Postgres)
+        # antes de ler a agenda. Um agendamento concorrente lido antes disso falha no
+        # compare-and-swap do 'salvar' e é refeito sobre a agenda com as linhas importadas.
+        ids_profissionais = sorted(confirmadas)
+        for parte in _em_partes(ids_profissionais):
+            self.session.execute(
+                update(profissionais).where(profissionais.c.id.in_(parte)).values(versao=profissionais.c.versao + 1)
+            )
+
+        recusadas = set()
+        for id_profissional, novas in confirmadas.items():
+            novas.sort(key=lambda par: par[0]["data_hora_inicio"])
+            inicio = novas[0][0]["data_hora_inicio"]
+            fim = max(linha["data_hora_fim"] for linha, _ in novas)
+            ids_novos = {linha["id"] for linha, _ in novas}
+            # Mesmo filtro de '_sobrepoe_janela' no repositório: varredura de intervalo no índice.
+            gravados = self.session.execute(
+                select(agendamentos.c.id, agendamentos.c.data_hora_inicio, agendamentos.c.data_hora_fim).where(
+                    agendamentos.c.profissional_id == id_profissional,
+                    agendamentos.c.status == AgendamentoStatus.CONFIRMADO,
+                    agendamentos.c.data_hora_inicio > inicio - DURACAO_MAXIMA_AGENDAMENTO,
+                    agendamentos.c.data_hora_inicio < fim,
+                    agendamentos.c.data_hora_fim > inicio,
+                )
+            )
+            # Um id já gravado é ignorado pelo ON CONFLICT: não conta como sobreposição a si mesmo.
+            ocupados = sorted((comeco, termino) for id_, comeco, termino in gravados if id_ not in ids_novos)
+            for linha, numero in novas:
+                intervalo = (linha["data_hora_inicio"], linha["data_hora_fim"])
+                if _sobrepoe(ocupados, *intervalo):
+                    recusadas.add(linha["id"])
+                    resultado.erros.append((numero, "Horário já ocupado por outro agendamento confirmado do profissional."))
+                else:
+                    insort(ocupados, intervalo)
+        aceitas = [linha for linha in linhas if linha["id"] not in recusadas] if recusadas else linhas
+        return aceitas, set(ids_profissionais)
+
+    def _resolver(self, coluna: Column, chaves: Iterable[str], cache: dict[str, UUID]) -> dict[str, UUID]:
+        """Ids das chaves naturais já cadastradas ('telefone_whatsapp' ou 'nome'), consultando só as desconhecidas."""
+        chaves = set(chaves)
+        faltando = sorted(chaves - cache.keys())
+        for parte in _em_partes(faltando):
+            for chave, id_ in self.session.execute(select(coluna, coluna.table.c.id).where(coluna.in_(parte))):
+                cache[chave] = id_
+        return {chave: cache[chave] for chave in chaves if chave in cache}
+
+
+def _em_partes(valores: list, tamanho: int = CHAVES_POR_CONSULTA) -> Iterable[list]:
+    for inicio in range(0, len(valores), tamanho):
+        yield valores[inicio:inicio + tamanho]
+
+
+def _sobrepoe(ocupados: list[tuple[datetime, datetime]], inicio: datetime, fim: datetime) -> bool:
+    """Se [inicio, fim) se sobrepõe a algum intervalo de 'ocupados' (ordenados; nenhum maior que a duração máxima)."""
+    i = bisect_left(ocupados, (fim,))  # Todos antes de 'i' começam antes de 'fim'
+    while i > 0 and ocupados[i - 1][0] > inicio - DURACAO_MAXIMA_AGENDAMENTO:
+        i -= 1
+        if ocupados[i][1] > inicio:
+            return True
+    return False
+
+
+def _referencia_ausente(
+    telefone: str, nome_servico: str, ids_profissionais: dict[str, UUID], ids_servicos: dict[str, UUID]
+) -> str | None:
+    if telefone not in ids_profissionais:
+        return f"Profissional com telefone '{telefone}' não encontrado."
+    if nome_servico not in ids_servicos:
+        return f"Serviço '{nome_servico}' não encontrado."
+    return None
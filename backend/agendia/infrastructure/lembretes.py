@@ -0,0 +1,236 @@
+import heapq
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from agendia.core.domain import AgendamentoStatus
+from . import metricas
+from .importacao import INSERTS_COM_CONFLITO
+from .models import AgendamentoDB, NotificacaoDB, NotificacaoStatus, ProfissionalDB, ServicoDB, agora_utc
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _AgendamentoLembrado:
+    inicio: datetime
+    cliente_contato: str
+    servico: str
+    profissional: str
+
+
+class AgendadorLembretes:
+    """
+    Enfileira na fila de saída os lembretes dos agendamentos confirmados
+    (por padrão, 24h e 2h antes do início). O envio fica com o
+    DespachanteNotificacoes: em lotes, com o pool de workers limitando a
+    concorrência e com novas tentativas em caso de falha.
+
+    - Só os agendamentos que começam dentro do horizonte (a maior antecedência,
+      com uma margem) ficam em memória, em um heap ordenado pelo horário de
+      disparo. A cada ciclo o horizonte avança lendo apenas a faixa nova, pelo
+      índice (status, data_hora_inicio).
+    - Agendamentos criados, cancelados ou remarcados são percebidos pela coluna
+      'atualizado_em', também indexada: cada ciclo lê só as linhas alteradas
+      desde o anterior. Entradas do heap que deixaram de valer são descartadas
+      quando chegam ao topo.
+    - Quando um lembrete mais próximo do início também já venceu (ex.: o
+      agendamento foi feito a 1h do horário), só ele é enviado.
+    - O id da notificação é derivado do agendamento, do início e da
+      antecedência: depois de um reinício, lembretes já enfileirados não se repetem.
+    """
+
+    # Alterações gravadas pouco antes da última leitura podem ter sido confirmadas só depois dela.
+    FOLGA_ALTERACOES = timedelta(seconds=5)
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        antecedencias_horas: Iterable[float] = (24, 2),
+        intervalo_segundos: float = 30.0,
+        tamanho_lote: int = 500,
+    ):
+        self.session_factory = session_factory
+        # Da maior para a menor antecedência.
+        self.antecedencias = sorted({timedelta(hours=h) for h in antecedencias_horas}, reverse=True)
+        self.intervalo_segundos = intervalo_segundos
+        self.tamanho_lote = tamanho_lote
+        self.horizonte = self.antecedencias[0] + 2 * timedelta(seconds=intervalo_segundos)
+        # (disparo, id do agendamento, índice da antecedência); o índice len(antecedencias) remove o agendamento.
+        self._heap: list[tuple[datetime, uuid.UUID, int]] = []
+        self._agendamentos: dict[uuid.UUID, _AgendamentoLembrado] = {}
+        self._carregado_ate: datetime | None = None
+        self._alterados_desde: datetime | None = None
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="agendador-lembretes", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float | None = 10.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                self.processar()
+            except Exception:
+                logger.exception("Erro inesperado ao agendar lembretes.")
+            self._parar.wait(self._espera(datetime.now()))
+
+    def _espera(self, agora: datetime) -> float:
+        """Segundos até o próximo ciclo: o intervalo, ou menos se um lembrete vencer antes."""
+        if not self._heap:
+            return self.intervalo_segundos
+        return min(self.intervalo_segundos, max((self._heap[0][0] - agora).total_seconds(), 0.0))
+
+    # --- Processamento ---
+
+    def processar(self, agora: datetime | None = None) -> int:
+        """Executa um ciclo e retorna quantos lembretes foram enfileirados."""
+        agora = agora or datetime.now()
+        session = self.session_factory()
+        try:
+            self._atualizar(session, agora)
+            vencidos = self._vencidos(agora)
+            for inicio in range(0, len(vencidos), self.tamanho_lote):
+                self._enfileirar(session, vencidos[inicio:inicio + self.tamanho_lote], agora)
+                session.commit()
+            for antecedencia, _, _ in vencidos:
+                metricas.lembretes.incrementar(_rotulo(antecedencia))
+            return len(vencidos)
+        except Exception:
+            # O heap pode ter perdido lembretes já retirados: o próximo ciclo recarrega tudo
+            # (os ids determinísticos evitam repetir os que chegaram a ser gravados).
+            session.rollback()
+            self._heap.clear()
+            self._agendamentos.clear()
+            self._carregado_ate = self._alterados_desde = None
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _consulta():
+        return (
+            select(
+                AgendamentoDB.id, AgendamentoDB.status, AgendamentoDB.data_hora_inicio, AgendamentoDB.cliente_contato,
+                AgendamentoDB.atualizado_em, ServicoDB.nome, ProfissionalDB.nome,
+            )
+            .join(ServicoDB, AgendamentoDB.servico_id == ServicoDB.id)
+            .join(ProfissionalDB, AgendamentoDB.profissional_id == ProfissionalDB.id)
+        )
+
+    def _confirmados_entre(self, session: Session, inicio: datetime, fim: datetime):
+        return session.execute(self._consulta().where(
+            AgendamentoDB.status == AgendamentoStatus.CONFIRMADO,
+            AgendamentoDB.data_hora_inicio > inicio,
+            AgendamentoDB.data_hora_inicio <= fim,
+        ))
+
+    def _atualizar(self, session: Session, agora: datetime) -> None:
+        """Traz para o heap a faixa nova do horizonte e as alterações desde o último ciclo."""
+        horizonte = agora + self.horizonte
+        if self._carregado_ate is None:
+            # Marca tirada antes da carga: o que for gravado durante ela aparece nas alterações.
+            self._alterados_desde = agora_utc()
+            for linha in self._confirmados_entre(session, agora, horizonte):
+                self._registrar(linha, agora, atrasados=True)
+            self._carregado_ate = horizonte
+            return
+
+        if horizonte > self._carregado_ate:
+            for linha in self._confirmados_entre(session, self._carregado_ate, horizonte):
+                self._registrar(linha, agora, atrasados=True)
+            self._carregado_ate = horizonte
+
+        alteracoes = session.execute(
+            self._consulta().where(AgendamentoDB.atualizado_em > self._alterados_desde - self.FOLGA_ALTERACOES)
+        )
+        for linha in alteracoes:
+            self._alterados_desde = max(self._alterados_desde, linha.atualizado_em)
+            if (
+                linha.status == AgendamentoStatus.CONFIRMADO
+                and agora < linha.data_hora_inicio <= self._carregado_ate
+            ):
+                # Agendamento novo (ou remarcado): lembretes que já venceram não são mandados
+                # logo depois da confirmação.
+                self._registrar(linha, agora, atrasados=False)
+            else:
+                self._agendamentos.pop(linha.id, None)
+
+    def _registrar(self, linha, agora: datetime, atrasados: bool) -> None:
+        id_agendamento, _, inicio, cliente_contato, _, servico, profissional = linha
+        anterior = self._agendamentos.get(id_agendamento)
+        self._agendamentos[id_agendamento] = _AgendamentoLembrado(inicio, cliente_contato, servico, profissional)
+        if anterior is not None and anterior.inicio == inicio:
+            return  # Mesmo horário: os lembretes já estão no heap
+        for indice, antecedencia in enumerate(self.antecedencias):
+            if atrasados or inicio - antecedencia > agora:
+                heapq.heappush(self._heap, (inicio - antecedencia, id_agendamento, indice))
+        heapq.heappush(self._heap, (inicio, id_agendamento, len(self.antecedencias)))
+
+    def _vencidos(self, agora: datetime) -> list[tuple[timedelta, uuid.UUID, _AgendamentoLembrado]]:
+        """Retira do heap os lembretes vencidos que ainda valem: (antecedência, id do agendamento, agendamento)."""
+        vencidos = []
+        while self._heap and self._heap[0][0] <= agora:
+            disparo, id_agendamento, indice = heapq.heappop(self._heap)
+            agendamento = self._agendamentos.get(id_agendamento)
+            if indice == len(self.antecedencias):
+                if agendamento is not None and agendamento.inicio == disparo:
+                    del self._agendamentos[id_agendamento]  # O horário chegou: não há mais lembretes
+                continue
+            antecedencia = self.antecedencias[indice]
+            # Cancelado ou remarcado depois que a entrada foi criada.
+            if agendamento is None or agendamento.inicio - antecedencia != disparo:
+                continue
+            # Um lembrete mais próximo do início também venceu: só ele é enviado.
+            if indice + 1 < len(self.antecedencias) and agendamento.inicio - self.antecedencias[indice + 1] <= agora:
+                continue
+            vencidos.append((antecedencia, id_agendamento, agendamento))
+        return vencidos
+
+    def _enfileirar(self, session: Session, lembretes: list, agora: datetime) -> None:
+        linhas = [
+            {
+                "id": uuid.uuid5(id_agendamento, f"lembrete-{_rotulo(antecedencia)}-{agendamento.inicio.isoformat()}"),
+                "numero_destino": agendamento.cliente_contato,
+                "texto": texto_lembrete(agendamento.servico, agendamento.profissional, agendamento.inicio, agora),
+                "status": NotificacaoStatus.PENDENTE,
+                "tentativas": 0,
+                "criado_em": agora,
+                "proxima_tentativa_em": agora,
+            }
+            for antecedencia, id_agendamento, agendamento in lembretes
+        ]
+        tabela = NotificacaoDB.__table__
+        insert = INSERTS_COM_CONFLITO[session.get_bind().dialect.name](tabela)
+        session.execute(insert.on_conflict_do_nothing(index_elements=[tabela.c.id]), linhas)
+
+
+def texto_lembrete(servico: str, profissional: str, inicio: datetime, agora: datetime) -> str:
+    dias = (inicio.date() - agora.date()).days
+    quando = {0: "hoje", 1: "amanhã"}.get(dias, f"no dia {inicio.strftime('%d/%m/%Y')}")
+    return (
+        f"Olá! ⏰ Lembrete: seu horário para o serviço '{servico}' com {profissional} "
+        f"é {quando} às {inicio.strftime('%H:%M')}."
+    )
+
+
+def _rotulo(antecedencia: timedelta) -> str:
+    return f"{antecedencia.total_seconds() / 3600:g}h"
@@ -0,0 +1,304 @@
+"""
+Métricas do processo no formato de texto do Prometheus (exposto em GET /metrics).
+
+Contadores e histogramas simples, protegidos por lock: registrar uma
+observação custa uma busca binária e poucas somas. Os valores que já são
+mantidos por outros componentes (cache, conversas) são lidos só na exportação.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+Rotulos = tuple[str, ...]
+
+# Limites (em segundos) dos histogramas de latência: de 1 ms a 10 s.
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_SQL = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+LIMITES_COMANDOS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_rotulos(nomes: Rotulos, valores: Rotulos, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+class Contador:
+    """Valor que só cresce, por combinação de rótulos."""
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Rotulos = ()):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, rotulos
+        self._valores: dict[Rotulos, float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos: str, valor: float = 1.0) -> None:
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0.0) + valor
+
+    def valor(self, *valores_rotulos: str) -> float:
+        with self._lock:
+            return self._valores.get(valores_rotulos, 0.0)
+
+    def amostras(self) -> Iterable[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for rotulos, valor in valores:
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(valor)}"
+
+
+class Histograma:
+    """Distribuição de observações em faixas cumulativas ('le'), com soma e contagem."""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Rotulos = (), limites: tuple[float, ...] = LIMITES_LATENCIA):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, rotulos
+        self.limites = tuple(sorted(limites))
+        # Por combinação de rótulos: contagem por faixa (não cumulativa; a última é +Inf) e soma.
+        self._series: dict[Rotulos, tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores_rotulos: str) -> None:
+        faixa = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = ([0] * (len(self.limites) + 1), [0.0])
+            serie[0][faixa] += 1
+            serie[1][0] += valor
+
+    def contagem(self, *valores_rotulos: str) -> int:
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            return sum(serie[0]) if serie else 0
+
+    def amostras(self) -> Iterable[str]:
+        with self._lock:
+            series = sorted((rotulos, (list(contagens), soma[0])) for rotulos, (contagens, soma) in self._series.items())
+        for rotulos, (contagens, soma) in series:
+            acumulado = 0
+            for limite, contagem in zip((*self.limites, float("inf")), contagens):
+                acumulado += contagem
+                le = f'le="{_formatar_numero(limite)}"'
+                yield f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, rotulos, le)} {acumulado}"
+            yield f"{self.nome}_sum{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(soma)}"
+            yield f"{self.nome}_count{_formatar_rotulos(self.rotulos, rotulos)} {acumulado}"
+
+
+class Coletada:
+    """Métrica lida de outro componente no momento da exportação (ex.: estatísticas do cache)."""
+
+    def __init__(self, nome: str, ajuda: str, tipo: str, rotulos: Rotulos, ler: Callable[[], dict[Rotulos, float]]):
+        self.nome, self.ajuda, self.tipo, self.rotulos = nome, ajuda, tipo, rotulos
+        self.ler = ler
+
+    def amostras(self) -> Iterable[str]:
+        for rotulos, valor in sorted(self.ler().items()):
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(valor)}"
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: dict[str, Contador | Histograma | Coletada] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            # Registrar de novo o mesmo nome (ex.: ao recriar a aplicação) substitui a anterior.
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Rotulos = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(
+        self, nome: str, ajuda: str, rotulos: Rotulos = (), limites: tuple[float, ...] = LIMITES_LATENCIA
+    ) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def coletada(
+        self, nome: str, ajuda: str, ler: Callable[[], dict[Rotulos, float]], tipo: str = "gauge", rotulos: Rotulos = ()
+    ) -> Coletada:
+        return self._registrar(Coletada(nome, ajuda, tipo, rotulos, ler))
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.amostras())
+        return "\n".join(linhas) + "\n"
+
+
+# Registro único do processo, como o REGISTRY padrão do prometheus_client.
+registro = RegistroMetricas()
+
+requisicoes = registro.contador(
+    "agendia_http_requisicoes_total", "Requisições HTTP atendidas.", ("metodo", "rota", "status")
+)
+duracao_requisicoes = registro.histograma(
+    "agendia_http_requisicao_segundos", "Latência das requisições HTTP, por rota.", ("metodo", "rota")
+)
+comandos_sql_por_requisicao = registro.histograma(
+    "agendia_http_requisicao_sql_comandos", "Comandos SQL emitidos por requisição.", ("rota",), LIMITES_COMANDOS
+)
+tempo_sql_por_requisicao = registro.histograma(
+    "agendia_http_requisicao_sql_segundos", "Tempo gasto no banco por requisição.", ("rota",)
+)
+comandos_sql = registro.contador("agendia_sql_comandos_total", "Comandos SQL executados, por tipo.", ("tipo",))
+duracao_sql = registro.histograma(
+    "agendia_sql_comando_segundos", "Duração de cada comando SQL, por tipo.", ("tipo",), LIMITES_SQL
+)
+duracao_repositorio = registro.histograma(
+    "agendia_repositorio_segundos", "Duração dos métodos do repositório de profissionais.", ("metodo",)
+)
+notificacoes = registro.contador(
+    "agendia_notificacoes_total",
+    "Resultados das tentativas de envio de notificações (enviada, reagendada, falhou).",
+    ("resultado",),
+)
+lembretes = registro.contador(
+    "agendia_lembretes_total", "Lembretes de agendamento enfileirados, por antecedência.", ("antecedencia",)
+)
+agendamentos_arquivados = registro.contador(
+    "agendia_agendamentos_arquivados_total", "Agendamentos encerrados movidos para a tabela de arquivo."
+)
+
+
+# --- SQL ---
+
+class _SQLDaRequisicao:
+    __slots__ = ("comandos", "segundos")
+
+    def __init__(self):
+        self.comandos = 0
+        self.segundos = 0.0
+
+
+# Acumulador da requisição em andamento (definido pelo middleware; vale também nas threads e greenlets dela).
+_sql_da_requisicao: ContextVar[_SQLDaRequisicao | None] = ContextVar("sql_da_requisicao", default=None)
+
+_TIPOS_SQL = frozenset({"select", "insert", "update", "delete", "pragma", "with"})
+
+
+def _tipo_comando(statement: str) -> str:
+    tipo = statement.lstrip()[:6].lower()
+    return tipo if tipo in _TIPOS_SQL else "outro"
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Conta e cronometra os comandos do engine (no assíncrono, passe 'async_engine.sync_engine')."""
+    if event.contains(engine, "before_cursor_execute", _antes_do_comando):
+        return
+    event.listen(engine, "before_cursor_execute", _antes_do_comando)
+    event.listen(engine, "after_cursor_execute", _depois_do_comando)
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany) -> None:
+    inicios = conn.info.get("metricas_inicio")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    tipo = _tipo_comando(statement)
+    comandos_sql.incrementar(tipo)
+    duracao_sql.observar(duracao, tipo)
+    da_requisicao = _sql_da_requisicao.get()
+    if da_requisicao is not None:
+        da_requisicao.comandos += 1
+        da_requisicao.segundos += duracao
+
+
+# --- HTTP ---
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mede cada requisição HTTP: latência, status e os
+    comandos SQL emitidos enquanto ela era atendida. As rotas são rotuladas
+    pelo padrão (ex.: '/profissionais/{profissional_id}/agenda'), não pela URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        sql = _SQLDaRequisicao()
+        token = _sql_da_requisicao.set(sql)
+        comeco = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - comeco
+            _sql_da_requisicao.reset(token)
+            route = scope.get("route")
+            # Sem rota (ex.: 404): um rótulo só, para URLs arbitrárias não criarem séries novas.
+            rota = getattr(route, "path", None) or "(sem rota)"
+            metodo = scope["method"]
+            requisicoes.incrementar(metodo, rota, str(status))
+            duracao_requisicoes.observar(duracao, metodo, rota)
+            comandos_sql_por_requisicao.observar(sql.comandos, rota)
+            tempo_sql_por_requisicao.observar(sql.segundos, rota)
+
+
+# --- Repositório ---
+
+class RepositorioMedido:
+    """
+    Envolve um repositório e cronometra cada chamada de método em
+    'agendia_repositorio_segundos'. Os demais atributos são repassados.
+    Em métodos que devolvem iteradores, mede só a criação do iterador.
+    """
+
+    def __init__(self, repositorio):
+        self._repositorio = repositorio
+
+    def __getattr__(self, nome: str):
+        atributo = getattr(self._repositorio, nome)
+        if nome.startswith("_") or not callable(atributo):
+            return atributo
+
+        @wraps(atributo)
+        def medido(*args, **kwargs):
+            comeco = time.perf_counter()
+            try:
+                return atributo(*args, **kwargs)
+            finally:
+                duracao_repositorio.observar(time.perf_counter() - comeco, nome)
+
+        # Guarda o método medido na instância: as próximas chamadas não passam por __getattr__.
+        setattr(self, nome, medido)
+        return medido
@@ -0,0 +1,137 @@
+"""
+Migrações versionadas do esquema do banco.
+
+'create_all' só cria tabelas que faltam: nunca altera uma tabela existente. Um
+banco criado por uma versão anterior da API precisa, portanto, destes passos,
+aplicados em ordem; a versão aplicada fica gravada na tabela 'versao_esquema'.
+
+- Banco vazio: as tabelas são criadas já no formato atual e a versão é marcada
+  como a última.
+- Banco existente sem 'versao_esquema' (anterior às migrações): parte da versão 0.
+- Cada passo confere o que já existe antes de criar, então também serve para
+  bancos criados por 'create_all' em versões intermediárias.
+
+Para mudar o esquema, altere o modelo em models.py e acrescente um passo ao fim
+de MIGRACOES; passos já publicados não mudam.
+"""
+import logging
+from typing import Callable
+
+from sqlalchemy import Column, Connection, Integer, MetaData, Table, inspect, text, update
+
+from .database import Base
+from .models import AgendamentoArquivadoDB, AgendamentoDB, NotificacaoDB, ProfissionalDB, agora_utc
+
+logger = logging.getLogger(__name__)
+
+# Fora de Base.metadata: não é criada nem removida junto com as tabelas do modelo.
+versao_esquema = Table("versao_esquema", MetaData(), Column("versao", Integer, nullable=False))
+
+
+def _adicionar_coluna(conexao: Connection, coluna: Column, padrao: str | None = None) -> bool:
+    """
+    ALTER TABLE ... ADD COLUMN com o tipo da coluna do modelo. Com 'padrao', a
+    coluna é NOT NULL e as linhas existentes recebem esse valor.
+    Retorna False se a coluna já existia.
+    """
+    tabela = coluna.table.name
+    if coluna.name in {c["name"] for c in inspect(conexao).get_columns(tabela)}:
+        return False
+    ddl = f"ALTER TABLE {tabela} ADD COLUMN {coluna.name} {coluna.type.compile(dialect=conexao.dialect)}"
+    if padrao is not None:
+        ddl += f" NOT NULL DEFAULT {padrao}"
+    conexao.execute(text(ddl))
+    return True
+
+
+def _criar_indices(conexao: Connection, tabela: Table, *nomes: str) -> None:
+    indices = {indice.name: indice for indice in tabela.indexes}
+    for nome in nomes:
+        indices[nome].create(conexao, checkfirst=True)
+
+
+# --- Passos (um por alteração do esquema, na ordem em que entraram) ---
+
+def _indice_agenda_profissional(conexao: Connection) -> None:
+    _criar_indices(conexao, AgendamentoDB.__table__, "ix_agendamentos_profissional_inicio")
+
+
+def _fila_notificacoes(conexao: Connection) -> None:
+    NotificacaoDB.__table__.create(conexao, checkfirst=True)
+
+
+def _versao_profissionais(conexao: Connection) -> None:
+    _adicionar_coluna(conexao, ProfissionalDB.__table__.c.versao, padrao="1")
+
+
+def _atualizacao_profissionais(conexao: Connection) -> None:
+    coluna = ProfissionalDB.__table__.c.atualizado_em
+    if _adicionar_coluna(conexao, coluna):
+        conexao.execute(update(ProfissionalDB.__table__).values({coluna: agora_utc()}))
+
+
+def _atualizacao_agendamentos(conexao: Connection) -> None:
+    coluna = AgendamentoDB.__table__.c.atualizado_em
+    if _adicionar_coluna(conexao, coluna):
+        conexao.execute(update(AgendamentoDB.__table__).values({coluna: agora_utc()}))
+    _criar_indices(conexao, AgendamentoDB.__table__, "ix_agendamentos_status_inicio", "ix_agendamentos_atualizado_em")
+
+
+def _calendario_profissionais(conexao: Connection) -> None:
+    _adicionar_coluna(conexao, ProfissionalDB.__table__.c.calendario)
+
+
+def _agendamentos_arquivados(conexao: Connection) -> None:
+    AgendamentoArquivadoDB.__table__.create(conexao, checkfirst=True)
+
+
+# A posição na lista é a versão: o passo i leva o esquema da versão i-1 para i.
+MIGRACOES: list[tuple[str, Callable[[Connection], None]]] = [
+    ("índice (profissional_id, data_hora_inicio) dos agendamentos", _indice_agenda_profissional),
+    ("fila de saída de notificações", _fila_notificacoes),
+    ("versão dos profissionais", _versao_profissionais),
+    ("instante da última gravação dos profissionais", _atualizacao_profissionais),
+    ("instante da última gravação dos agendamentos e índices dos lembretes", _atualizacao_agendamentos),
+    ("calendário de trabalho dos profissionais", _calendario_profissionais),
+    ("tabela de agendamentos arquivados", _agendamentos_arquivados),
+]
+VERSAO_ATUAL = len(MIGRACOES)
+
+
+def _versao_gravada(conexao: Connection) -> int | None:
+    """Versão registrada no banco; None se o banco ainda não tem nenhuma tabela."""
+    tabelas = set(inspect(conexao).get_table_names())
+    if versao_esquema.name in tabelas:
+        return conexao.scalar(versao_esquema.select()) or 0
+    versao_esquema.create(conexao)
+    conexao.execute(versao_esquema.insert().values(versao=0))
+    return 0 if tabelas & set(Base.metadata.tables) else None
+
+
+def migrar(conexao: Connection) -> int:
+    """
+    Leva o esquema do banco até VERSAO_ATUAL e retorna quantos passos foram aplicados.
+    Use dentro de uma transação (ex.: 'with engine.begin() as conexao').
+    """
+    versao = _versao_gravada(conexao)
+    if versao is None:
+        Base.metadata.create_all(conexao)
+        conexao.execute(update(versao_esquema).values(versao=VERSAO_ATUAL))
+        return 0
+    if versao > VERSAO_ATUAL:
+        raise RuntimeError(f"O banco está na versão {versao} do esquema, mais nova que a desta API ({VERSAO_ATUAL}).")
+    for numero, (descricao, passo) in enumerate(MIGRACOES[versao:], start=versao + 1):
+        logger.info("Aplicando a migração %d: %s.", numero, descricao)
+        passo(conexao)
+        conexao.execute(update(versao_esquema).values(versao=numero))
+    return VERSAO_ATUAL - versao
+
+
+if __name__ == "__main__":
+    # Aplica as migrações ao banco de Settings (ex.: no deploy, com DATABASE_MIGRAR=false na API).
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as conexao:
+        aplicadas = migrar(conexao)
+    print(f"Esquema na versão {VERSAO_ATUAL} ({aplicadas} migrações aplicadas).")
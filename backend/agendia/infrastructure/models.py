@@ -1,12 +1,18 @@
 import uuid
+from datetime import datetime, timezone
+from enum import Enum
 from sqlalchemy import (Column, String, Integer, DateTime, Enum as EnumSQL, 
-                        ForeignKey, JSON, Table)
+                        ForeignKey, JSON, Table, Index, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from .database import Base
 from agendia.core.domain import AgendamentoStatus
 
+def agora_utc() -> datetime:
+    """Instante atual em UTC, sem fuso (como as demais colunas DateTime)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 # Tabela de associação para a relação de serviços de um profissional
 profissional_servico_association = Table('profissional_servico', Base.metadata,
     Column('profissional_id', UUID(as_uuid=True), ForeignKey('profissionais.id')),
@@ -19,6 +25,12 @@ class ProfissionalDB(Base):
     nome = Column(String, index=True)
     telefone_whatsapp = Column(String, unique=True, index=True)
     horario_trabalho = Column(JSON)
+    # Pausas, feriados e exceções (CalendarioTrabalho); nulo quando não há ajustes ao horário semanal.
+    calendario = Column(JSON, nullable=True)
+    # Incrementada a cada gravação do agregado; serve de etag para caches.
+    versao = Column(Integer, nullable=False, default=1)
+    # Instante (UTC) da última gravação, preenchido junto com a versão; vira o Last-Modified das exportações.
+    atualizado_em = Column(DateTime, default=agora_utc, onupdate=agora_utc)
 
     # --- RELACIONAMENTOS CORRIGIDOS ---
     servicos_oferecidos = relationship("ServicoDB", secondary=profissional_servico_association)
@@ -37,9 +49,72 @@ class AgendamentoDB(Base):
     data_hora_inicio = Column(DateTime)
     data_hora_fim = Column(DateTime)
     status = Column(EnumSQL(AgendamentoStatus))
+    # Instante (UTC) da última gravação da linha; o agendador de lembretes lê por ele só o que mudou.
+    atualizado_em = Column(DateTime, default=agora_utc, onupdate=agora_utc)
     
     servico_id = Column(UUID(as_uuid=True), ForeignKey("servicos.id"))
     profissional_id = Column(UUID(as_uuid=True), ForeignKey("profissionais.id"))
     
     profissional = relationship("ProfissionalDB", back_populates="agendamentos")
-    servico = relationship("ServicoDB")
\ No newline at end of file
+    servico = relationship("ServicoDB")
+
+    # Índice composto usado pelas buscas de agendamentos por janela de tempo
+    __table_args__ = (
+        Index("ix_agendamentos_profissional_inicio", "profissional_id", "data_hora_inicio"),
+        # Agendamentos de um status em uma faixa de horários (ex.: confirmados das próximas 24h)
+        Index("ix_agendamentos_status_inicio", "status", "data_hora_inicio"),
+        Index("ix_agendamentos_atualizado_em", "atualizado_em"),
+    )
+
+
+class AgendamentoArquivadoDB(Base):
+    """
+    Agendamentos antigos já encerrados (concluídos ou cancelados), movidos da
+    tabela 'agendamentos' pelo ArquivadorAgendamentos. Ficam fora dos
+    agregados e das consultas de agenda; são lidos só pelo histórico
+    (IProfissionalRepositorio.listar_historico).
+    """
+    __tablename__ = "agendamentos_arquivados"
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    cliente_contato = Column(String)
+    data_hora_inicio = Column(DateTime)
+    data_hora_fim = Column(DateTime)
+    status = Column(EnumSQL(AgendamentoStatus))
+    atualizado_em = Column(DateTime)
+    arquivado_em = Column(DateTime)
+
+    servico_id = Column(UUID(as_uuid=True), ForeignKey("servicos.id"))
+    profissional_id = Column(UUID(as_uuid=True), ForeignKey("profissionais.id"))
+
+    __table_args__ = (
+        Index("ix_agendamentos_arquivados_profissional_inicio", "profissional_id", "data_hora_inicio"),
+    )
+
+
+class NotificacaoStatus(str, Enum):
+    """Estados de uma mensagem na fila de saída (outbox)."""
+    PENDENTE = "Pendente"
+    EM_ENVIO = "Em envio"
+    ENVIADA = "Enviada"
+    FALHOU = "Falhou"
+
+class NotificacaoDB(Base):
+    """
+    Fila de saída (outbox) de mensagens do WhatsApp.
+    As linhas são gravadas na mesma transação do agendamento e enviadas
+    depois pelo DespachanteNotificacoes.
+    """
+    __tablename__ = "notificacoes_outbox"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    numero_destino = Column(String, index=True)
+    texto = Column(Text)
+    status = Column(EnumSQL(NotificacaoStatus), default=NotificacaoStatus.PENDENTE)
+    tentativas = Column(Integer, default=0)
+    criado_em = Column(DateTime)
+    proxima_tentativa_em = Column(DateTime)
+    enviado_em = Column(DateTime, nullable=True)
+    ultimo_erro = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notificacoes_status_criado", "status", "criado_em"),
+    )
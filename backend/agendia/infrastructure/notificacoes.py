@@ -0,0 +1,250 @@
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from agendia.application.ports import IFilaNotificacoes, IWhatsAppAdapter
+from . import metricas
+from .models import NotificacaoDB, NotificacaoStatus
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteFilaNotificacoes(IFilaNotificacoes):
+    """
+    Outbox gravado na tabela 'notificacoes_outbox'.
+    Apenas adiciona a linha à sessão: o commit feito pelo repositório na mesma
+    sessão grava a mensagem na mesma transação do agendamento.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enfileirar(self, numero_destino: str, texto: str) -> None:
+        agora = datetime.now()
+        self.session.add(NotificacaoDB(
+            id=uuid.uuid4(), numero_destino=numero_destino, texto=texto,
+            status=NotificacaoStatus.PENDENTE, tentativas=0,
+            criado_em=agora, proxima_tentativa_em=agora,
+        ))
+
+
+class DespachanteNotificacoes:
+    """
+    Esvazia a fila de saída em segundo plano, entregando as mensagens pelo IWhatsAppAdapter.
+
+    - Destinatários diferentes são atendidos em paralelo (pool de threads);
+      as mensagens de um mesmo destinatário saem sempre na ordem em que foram criadas.
+    - Falhas são reagendadas com backoff exponencial até 'max_tentativas';
+      depois disso a mensagem fica como FALHOU, com o último erro registrado.
+    - Cada lote é reservado (EM_ENVIO) com um prazo; se o processo morrer no meio
+      do envio, as mensagens voltam a ficar disponíveis quando o prazo expira.
+    """
+
+    PRAZO_RESERVA = timedelta(minutes=5)
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        whatsapp_adapter: IWhatsAppAdapter,
+        tamanho_lote: int = 50,
+        max_tentativas: int = 5,
+        backoff_base_segundos: float = 2.0,
+        backoff_maximo_segundos: float = 300.0,
+        workers: int = 4,
+        intervalo_segundos: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.whatsapp_adapter = whatsapp_adapter
+        self.tamanho_lote = tamanho_lote
+        self.max_tentativas = max_tentativas
+        self.backoff_base_segundos = backoff_base_segundos
+        self.backoff_maximo_segundos = backoff_maximo_segundos
+        self.workers = workers
+        self.intervalo_segundos = intervalo_segundos
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="despachante-notificacoes", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float | None = 10.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executar(self) -> None:
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="envio-whatsapp") as pool:
+            while not self._parar.is_set():
+                try:
+                    processadas = self.processar_pendentes(pool)
+                except Exception:
+                    logger.exception("Erro inesperado ao processar a fila de notificações.")
+                    processadas = 0
+                # Fila vazia: espera o próximo ciclo. Lote cheio: continua drenando.
+                if processadas < self.tamanho_lote:
+                    self._parar.wait(self.intervalo_segundos)
+
+    # --- Processamento ---
+
+    def _backoff(self, tentativas: int) -> timedelta:
+        segundos = self.backoff_base_segundos * (2 ** (tentativas - 1))
+        return timedelta(seconds=min(segundos, self.backoff_maximo_segundos))
+
+    def _disponivel(self, agora: datetime):
+        return or_(
+            NotificacaoDB.status == NotificacaoStatus.PENDENTE,
+            (NotificacaoDB.status == NotificacaoStatus.EM_ENVIO) & (NotificacaoDB.proxima_tentativa_em <= agora),
+        )
+
+    def _reservar(self, session: Session, agora: datetime) -> dict[str, list[tuple[uuid.UUID, str, str, int]]]:
+        """
+        Seleciona e reserva o próximo lote, agrupado por destinatário e em ordem de criação.
+        Retorna, por destinatário, tuplas (id, numero_destino, texto, tentativas).
+        """
+        na_fila = [NotificacaoStatus.PENDENTE, NotificacaoStatus.EM_ENVIO]
+        anterior = aliased(NotificacaoDB)
+        # Uma mensagem anterior aguardando nova tentativa (ou em envio por outro despachante)
+        # segura as seguintes do mesmo destinatário. O filtro fica antes do LIMIT: um
+        # destinatário em backoff com muitas mensagens não ocupa o lote dos demais.
+        bloqueada = (
+            select(anterior.id)
+            .where(
+                anterior.numero_destino == NotificacaoDB.numero_destino,
+                anterior.criado_em < NotificacaoDB.criado_em,
+                anterior.status.in_(na_fila),
+                anterior.proxima_tentativa_em > agora,
+            )
+            .exists()
+        )
+        candidatas = (
+            session.query(
+                NotificacaoDB.id, NotificacaoDB.numero_destino, NotificacaoDB.texto, NotificacaoDB.tentativas,
+            )
+            .filter(NotificacaoDB.status.in_(na_fila), NotificacaoDB.proxima_tentativa_em <= agora, ~bloqueada)
+            .order_by(NotificacaoDB.criado_em)
+            .limit(self.tamanho_lote)
+            .all()
+        )
+        por_destino: dict[str, list[tuple]] = defaultdict(list)
+        for id_notificacao, destino, texto, tentativas in candidatas:
+            por_destino[destino].append((id_notificacao, destino, texto, tentativas or 0))
+        if not por_destino:
+            return {}
+
+        ids = [n[0] for grupo in por_destino.values() for n in grupo]
+        reservadas = set(session.execute(
+            update(NotificacaoDB)
+            .where(NotificacaoDB.id.in_(ids), self._disponivel(agora))
+            .values(status=NotificacaoStatus.EM_ENVIO, proxima_tentativa_em=agora + self.PRAZO_RESERVA)
+            .returning(NotificacaoDB.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        session.commit()
+        # Outro despachante pode ter reservado parte do lote antes; mantém só o prefixo reservado.
+        resultado = {}
+        for destino, grupo in por_destino.items():
+            prefixo = []
+            for notificacao in grupo:
+                if notificacao[0] not in reservadas:
+                    break
+                prefixo.append(notificacao)
+            if prefixo:
+                resultado[destino] = prefixo
+        return resultado
+
+    def _enviar_em_ordem(self, mensagens: list[tuple]) -> list[Exception | None]:
+        """Envia as mensagens de um destinatário em sequência, parando na primeira falha."""
+        resultados = []
+        for _, numero_destino, texto, _ in mensagens:
+            try:
+                self.whatsapp_adapter.enviar_texto(numero_destino=numero_destino, texto=texto)
+            except Exception as e:
+                resultados.append(e)
+                break
+            resultados.append(None)
+        return resultados
+
+    def processar_pendentes(self, pool: ThreadPoolExecutor | None = None) -> int:
+        """
+        Executa um ciclo de envio e retorna quantas mensagens foram reservadas.
+        Sem 'pool', os destinatários são atendidos sequencialmente (útil em testes e scripts).
+        """
+        session = self.session_factory()
+        try:
+            por_destino = self._reservar(session, datetime.now())
+            if not por_destino:
+                return 0
+
+            lotes = list(por_destino.values())
+            if pool is None:
+                resultados = [self._enviar_em_ordem(lote) for lote in lotes]
+            else:
+                resultados = list(pool.map(self._enviar_em_ordem, lotes))
+
+            agora = datetime.now()
+            enviadas, devolvidas = [], []
+            for lote, resultado in zip(lotes, resultados):
+                for notificacao, erro in zip(lote, resultado):
+                    if erro is None:
+                        enviadas.append(notificacao[0])
+                    else:
+                        self._registrar_falha(session, notificacao, erro, agora)
+                # Mensagens após uma falha voltam para a fila, sem contar tentativa.
+                devolvidas.extend(n[0] for n in lote[len(resultado):])
+
+            if enviadas:
+                session.execute(
+                    update(NotificacaoDB).where(NotificacaoDB.id.in_(enviadas))
+                    .values(status=NotificacaoStatus.ENVIADA, enviado_em=agora, ultimo_erro=None)
+                    .execution_options(synchronize_session=False)
+                )
+            if devolvidas:
+                session.execute(
+                    update(NotificacaoDB).where(NotificacaoDB.id.in_(devolvidas))
+                    .values(status=NotificacaoStatus.PENDENTE, proxima_tentativa_em=agora)
+                    .execution_options(synchronize_session=False)
+                )
+            session.commit()
+            if enviadas:
+                metricas.notificacoes.incrementar("enviada", valor=len(enviadas))
+            return sum(len(lote) for lote in lotes)
+        finally:
+            session.close()
+
+    def _registrar_falha(self, session: Session, notificacao: tuple, erro: Exception, agora: datetime) -> None:
+        id_notificacao, numero_destino, _, tentativas = notificacao
+        tentativas += 1
+        valores = {"tentativas": tentativas, "ultimo_erro": str(erro)}
+        if tentativas >= self.max_tentativas:
+            valores["status"] = NotificacaoStatus.FALHOU
+            metricas.notificacoes.incrementar("falhou")
+            logger.error(
+                "Notificação %s para %s descartada após %d tentativas: %s",
+                id_notificacao, numero_destino, tentativas, erro,
+            )
+        else:
+            valores["status"] = NotificacaoStatus.PENDENTE
+            valores["proxima_tentativa_em"] = agora + self._backoff(tentativas)
+            metricas.notificacoes.incrementar("reagendada")
+            logger.warning(
+                "Falha ao enviar notificação %s para %s (tentativa %d): %s",
+                id_notificacao, numero_destino, tentativas, erro,
+            )
+        session.execute(
+            update(NotificacaoDB).where(NotificacaoDB.id == id_notificacao).values(**valores)
+            .execution_options(synchronize_session=False)
+        )
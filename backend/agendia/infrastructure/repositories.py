@@ -1,65 +1,573 @@
+import heapq
+import threading
 import uuid
-from datetime import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Collection, Iterator
+from datetime import datetime, time
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from agendia.application.ports import (IProfissionalRepositorio, IProfissionalRepositorioAsync,
+                                      ConflitoConcorrenciaError)
+from agendia.core.domain import (Profissional, ProfissionalResumo, Servico, Agendamento, AgendamentoStatus,
+                                 AgendaCompacta, CalendarioCompilado, CalendarioTrabalho, Turno,
+                                 DURACAO_MAXIMA_AGENDAMENTO)
+from .models import (ProfissionalDB, ServicoDB, AgendamentoDB, AgendamentoArquivadoDB,
+                     profissional_servico_association)
+
+# Horário semanal e calendário de cada profissional já convertidos do JSON e compilados,
+# com a versão de origem: enquanto ela não mudar, '_to_domain' não converte nem compila de novo.
+CALENDARIOS_MAX = 10_000
+_calendarios: dict[UUID, tuple] = {}
+_calendarios_lock = threading.Lock()
+
+
+def _horario_trabalho_para_json(horario_trabalho: dict[int, Turno]) -> dict:
+    return {str(dia): [inicio.isoformat(), fim.isoformat()] for dia, (inicio, fim) in horario_trabalho.items()}
+
+
+def _calendario_para_json(calendario: CalendarioTrabalho) -> dict | None:
+    if not (calendario.pausas or calendario.feriados or calendario.excecoes):
+        return None
+    dados = calendario.model_dump(mode="json")
+    dados["feriados"] = sorted(dados["feriados"])  # Ordem estável: a comparação em 'salvar' não vê mudança falsa
+    return dados
+
+
+def _calendario_do_banco(profissional_db: ProfissionalDB) -> tuple[dict[int, Turno], CalendarioTrabalho, CalendarioCompilado]:
+    """Horário semanal, calendário e sua forma compilada, reaproveitados enquanto a versão do profissional for a mesma."""
+    origem = (profissional_db.versao, profissional_db.horario_trabalho, profissional_db.calendario)
+    guardado = _calendarios.get(profissional_db.id)
+    if guardado is not None and guardado[0] == origem:
+        return guardado[1]
+    horario_trabalho = {
+        int(dia): (time.fromisoformat(inicio), time.fromisoformat(fim))
+        for dia, (inicio, fim) in (profissional_db.horario_trabalho or {}).items()
+    }
+    calendario = (
+        CalendarioTrabalho.model_validate(profissional_db.calendario) if profissional_db.calendario
+        else CalendarioTrabalho()
+    )
+    convertido = (horario_trabalho, calendario, CalendarioCompilado(horario_trabalho, calendario))
+    with _calendarios_lock:
+        if profissional_db.id not in _calendarios and len(_calendarios) >= CALENDARIOS_MAX:
+            del _calendarios[next(iter(_calendarios))]  # Descarta o mais antigo
+        _calendarios[profissional_db.id] = (origem, convertido)
+    return convertido
 
-from agendia.application.ports import IProfissionalRepositorio
-from agendia.core.domain import Profissional, Servico, Agendamento
-from .models import ProfissionalDB, ServicoDB, AgendamentoDB
 
 class SQLiteProfissionalRepositorio(IProfissionalRepositorio):
     """Implementação concreta do repositório para SQLAlchemy com SQLite."""
 
     def __init__(self, session: Session):
         self.session = session
+        # Estado persistido dos agendamentos já lidos/gravados por este repositório,
+        # usado por 'salvar' para gravar apenas o que é novo ou foi modificado.
+        self._agendamentos_persistidos: dict[UUID, tuple] = {}
+        # Referências fortes às linhas carregadas: o identity map da sessão é fraco,
+        # e 'salvar' depende dele para não consultar de novo o profissional e seus serviços.
+        self._profissionais_carregados: dict[UUID, ProfissionalDB] = {}
 
-    def _to_domain(self, profissional_db: ProfissionalDB) -> Profissional | None:
+    @staticmethod
+    def _estado_agendamento(agendamento: Agendamento) -> tuple:
+        return (agendamento.status, agendamento.data_hora_inicio, agendamento.data_hora_fim, agendamento.cliente_contato)
+
+    def _to_domain(
+        self, profissional_db: ProfissionalDB, agendamentos_db: list[AgendamentoDB] | None = None
+    ) -> Profissional | None:
         if not profissional_db:
             return None
+        if agendamentos_db is None:
+            agendamentos_db = profissional_db.agendamentos
         # ... (código do _to_domain inalterado) ...
-        horario_trabalho_domain = {
-            int(day): (time.fromisoformat(start), time.fromisoformat(end))
-            for day, (start, end) in profissional_db.horario_trabalho.items()
-        } if profissional_db.horario_trabalho else {}
-        return Profissional(
+        self._profissionais_carregados[profissional_db.id] = profissional_db
+        for ag in agendamentos_db:
+            self._agendamentos_persistidos[ag.id] = (ag.status, ag.data_hora_inicio, ag.data_hora_fim, ag.cliente_contato)
+        horario_trabalho, calendario, compilado = _calendario_do_banco(profissional_db)
+        profissional = Profissional(
             id=profissional_db.id, nome=profissional_db.nome,
-            telefone_whatsapp=profissional_db.telefone_whatsapp,
-            horario_trabalho=horario_trabalho_domain,
+            telefone_whatsapp=profissional_db.telefone_whatsapp, versao=profissional_db.versao,
+            horario_trabalho=horario_trabalho, calendario=calendario,
             servicos_oferecidos=[Servico(nome=s.nome, duracao_minutos=s.duracao_minutos) for s in profissional_db.servicos_oferecidos],
-            agendamentos=[Agendamento(id=ag.id, servico=Servico(nome=ag.servico.nome, duracao_minutos=ag.servico.duracao_minutos), data_hora_inicio=ag.data_hora_inicio, cliente_contato=ag.cliente_contato, status=ag.status) for ag in profissional_db.agendamentos]
+            agendamentos=[Agendamento(id=ag.id, servico=Servico(nome=ag.servico.nome, duracao_minutos=ag.servico.duracao_minutos), data_hora_inicio=ag.data_hora_inicio, cliente_contato=ag.cliente_contato, status=ag.status) for ag in agendamentos_db]
         )
+        profissional.carregar_calendario(compilado)
+        return profissional
 
     def salvar(self, profissional: Profissional) -> None:
-        # ... (código do salvar inalterado) ...
-        profissional_db = self.session.query(ProfissionalDB).filter_by(id=profissional.id).first()
+        """
+        Grava o agregado de forma incremental: apenas agendamentos novos ou
+        modificados são inseridos/atualizados e a associação de serviços só é
+        alterada quando difere da persistida. Agendamentos ausentes do agregado
+        (ex.: fora da janela carregada) nunca são removidos.
+        Cada gravação incrementa a versão do profissional (compare-and-swap com a
+        versão lida) e levanta ConflitoConcorrenciaError se ela já tiver mudado.
+        """
+        # 'get' usa o identity map da sessão: se o profissional foi carregado nesta sessão, não há consulta.
+        profissional_db = self.session.get(ProfissionalDB, profissional.id)
         if not profissional_db:
-            profissional_db = ProfissionalDB(id=profissional.id)
+            nova_versao = 1
+            profissional_db = ProfissionalDB(id=profissional.id, versao=nova_versao)
             self.session.add(profissional_db)
-        profissional_db.nome = profissional.nome
-        profissional_db.telefone_whatsapp = profissional.telefone_whatsapp
-        profissional_db.horario_trabalho = {day: (start.isoformat(), end.isoformat()) for day, (start, end) in profissional.horario_trabalho.items()}
-        profissional_db.servicos_oferecidos.clear()
-        for servico_domain in profissional.servicos_oferecidos:
-            servico_db = self.session.query(ServicoDB).filter_by(nome=servico_domain.nome).first()
+        else:
+            # Compare-and-swap: primeiro comando da transação, então também reserva a escrita
+            # no SQLite; outra gravação concorrente do mesmo profissional não encontra a versão lida.
+            nova_versao = profissional.versao + 1
+            resultado = self.session.execute(
+                update(ProfissionalDB)
+                .where(ProfissionalDB.id == profissional.id, ProfissionalDB.versao == profissional.versao)
+                .values(versao=nova_versao)
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount != 1:
+                self.session.rollback()
+                raise ConflitoConcorrenciaError(
+                    f"O profissional {profissional.id} foi alterado por outra operação; leia-o novamente."
+                )
+            set_committed_value(profissional_db, "versao", nova_versao)
+        horario_trabalho_db = _horario_trabalho_para_json(profissional.horario_trabalho)
+        calendario_db = _calendario_para_json(profissional.calendario)
+        if profissional_db.nome != profissional.nome:
+            profissional_db.nome = profissional.nome
+        if profissional_db.telefone_whatsapp != profissional.telefone_whatsapp:
+            profissional_db.telefone_whatsapp = profissional.telefone_whatsapp
+        if profissional_db.horario_trabalho != horario_trabalho_db:
+            profissional_db.horario_trabalho = horario_trabalho_db
+        if profissional_db.calendario != calendario_db:
+            profissional_db.calendario = calendario_db
+
+        if profissional.id not in self._profissionais_carregados:
+            # Agregado que não foi lido por este repositório (ex.: veio de um cache).
+            self._carregar_estados_persistidos([ag.id for ag in profissional.agendamentos])
+        servicos_db = self._sincronizar_servicos(profissional_db, profissional.servicos_oferecidos)
+        novos_estados = self._sincronizar_agendamentos(profissional, servicos_db)
+        self.session.commit()
+        self._agendamentos_persistidos.update(novos_estados)
+        profissional.versao = nova_versao
+
+    def _carregar_estados_persistidos(self, ids: list[UUID]) -> None:
+        """Registra o estado persistido dos agendamentos ainda desconhecidos, em uma única consulta 'IN'."""
+        desconhecidos = [id_ for id_ in ids if id_ not in self._agendamentos_persistidos]
+        if not desconhecidos:
+            return
+        linhas = self.session.execute(
+            select(
+                AgendamentoDB.id, AgendamentoDB.status, AgendamentoDB.data_hora_inicio,
+                AgendamentoDB.data_hora_fim, AgendamentoDB.cliente_contato,
+            ).where(AgendamentoDB.id.in_(desconhecidos))
+        )
+        for id_, *estado in linhas:
+            self._agendamentos_persistidos[id_] = tuple(estado)
+
+    def _buscar_servicos_por_nome(self, nomes: set[str]) -> dict[str, ServicoDB]:
+        """Resolve vários serviços em uma única consulta 'IN'."""
+        if not nomes:
+            return {}
+        return {s.nome: s for s in self.session.query(ServicoDB).filter(ServicoDB.nome.in_(nomes))}
+
+    def _sincronizar_servicos(self, profissional_db: ProfissionalDB, servicos: list[Servico]) -> dict[str, ServicoDB]:
+        atuais = {s.nome: s for s in profissional_db.servicos_oferecidos}
+        desejados = {s.nome: s for s in servicos}
+        if atuais.keys() == desejados.keys():
+            return atuais
+
+        faltantes = self._buscar_servicos_por_nome(desejados.keys() - atuais.keys())
+        for nome, servico_domain in desejados.items():
+            if nome in atuais:
+                continue
+            servico_db = faltantes.get(nome)
             if not servico_db:
-                servico_db = ServicoDB(id=uuid.uuid4(), nome=servico_domain.nome, duracao_minutos=servico_domain.duracao_minutos)
+                servico_db = ServicoDB(id=uuid.uuid4(), nome=nome, duracao_minutos=servico_domain.duracao_minutos)
                 self.session.add(servico_db)
             profissional_db.servicos_oferecidos.append(servico_db)
-        self.session.commit()
+            atuais[nome] = servico_db
+        for nome in atuais.keys() - desejados.keys():
+            profissional_db.servicos_oferecidos.remove(atuais.pop(nome))
+        return atuais
+
+    def _sincronizar_agendamentos(self, profissional: Profissional, servicos_db: dict[str, ServicoDB]) -> dict[UUID, tuple]:
+        novos, modificados, estados = [], [], {}
+        for agendamento in profissional.agendamentos:
+            estado = self._estado_agendamento(agendamento)
+            persistido = self._agendamentos_persistidos.get(agendamento.id)
+            if persistido is None:
+                novos.append(agendamento)
+            elif persistido != estado:
+                modificados.append(agendamento)
+            else:
+                continue
+            estados[agendamento.id] = estado
+        if not estados:
+            return estados
+
+        # Serviços de agendamentos que não estão entre os oferecidos (ex.: serviço descontinuado).
+        nomes_faltantes = {ag.servico.nome for ag in novos} - servicos_db.keys()
+        servicos_db = {**servicos_db, **self._buscar_servicos_por_nome(nomes_faltantes)}
+        for agendamento in novos:
+            servico_db = servicos_db.get(agendamento.servico.nome)
+            if not servico_db:
+                servico_db = ServicoDB(
+                    id=uuid.uuid4(), nome=agendamento.servico.nome, duracao_minutos=agendamento.servico.duracao_minutos
+                )
+                self.session.add(servico_db)
+                servicos_db[servico_db.nome] = servico_db
+            self.session.add(AgendamentoDB(
+                id=agendamento.id, profissional_id=profissional.id, servico=servico_db,
+                cliente_contato=agendamento.cliente_contato, data_hora_inicio=agendamento.data_hora_inicio,
+                data_hora_fim=agendamento.data_hora_fim, status=agendamento.status,
+            ))
+        if modificados:
+            # UPDATE em lote pela chave primária (executemany).
+            self.session.execute(update(AgendamentoDB), [
+                {
+                    "id": ag.id, "status": ag.status, "cliente_contato": ag.cliente_contato,
+                    "data_hora_inicio": ag.data_hora_inicio, "data_hora_fim": ag.data_hora_fim,
+                }
+                for ag in modificados
+            ])
+        return estados
+
+    def _buscar(
+        self, janela: tuple[datetime, datetime] | None, somente_ocupacao: bool = False, **filtro
+    ) -> Profissional | None:
+        query = self.session.query(ProfissionalDB).options(joinedload(ProfissionalDB.servicos_oferecidos))
+        if janela is None and not somente_ocupacao:
+            query = query.options(joinedload(ProfissionalDB.agendamentos).joinedload(AgendamentoDB.servico))
+        profissional_db = query.filter_by(**filtro).first()
+        if not profissional_db:
+            return None
+        if somente_ocupacao:
+            profissional = self._to_domain(profissional_db, [])
+            ocupacao = self._ocupacao(AgendamentoDB.profissional_id == profissional_db.id, janela)
+            profissional.carregar_ocupacao(ocupacao.get(profissional_db.id, AgendaCompacta()))
+            return profissional
+        if janela is None:
+            return self._to_domain(profissional_db)
+        return self._to_domain(profissional_db, self._agendamentos_na_janela(profissional_db.id, janela))
+
+    def _ocupacao(self, filtro_profissional, janela: tuple[datetime, datetime] | None) -> dict[UUID, AgendaCompacta]:
+        """Agendamentos confirmados (na janela, se houver) em forma compacta, por profissional; só início e fim são lidos."""
+        condicoes = [filtro_profissional, AgendamentoDB.status == AgendamentoStatus.CONFIRMADO]
+        if janela is not None:
+            condicoes.extend(self._sobrepoe_janela(janela))
+        intervalos: dict[UUID, list[tuple[datetime, datetime]]] = defaultdict(list)
+        consulta = (
+            select(AgendamentoDB.profissional_id, AgendamentoDB.data_hora_inicio, AgendamentoDB.data_hora_fim)
+            .where(*condicoes)
+            .order_by(AgendamentoDB.data_hora_inicio)
+        )
+        for id_profissional, inicio, fim in self.session.execute(consulta):
+            intervalos[id_profissional].append((inicio, fim))
+        return {id_profissional: AgendaCompacta(lista) for id_profissional, lista in intervalos.items()}
+
+    @staticmethod
+    def _sobrepoe_janela(janela: tuple[datetime, datetime], tabela=AgendamentoDB) -> tuple:
+        """
+        Condições SQL para agendamentos (de 'tabela') que se sobrepõem a [inicio, fim).
+        O limite inferior em data_hora_inicio (inicio - duração máxima) mantém a
+        consulta como uma varredura de intervalo no índice (profissional_id, data_hora_inicio).
+        """
+        inicio, fim = janela
+        return (
+            tabela.data_hora_inicio > inicio - DURACAO_MAXIMA_AGENDAMENTO,
+            tabela.data_hora_inicio < fim,
+            tabela.data_hora_fim > inicio,
+        )
+
+    def _agendamentos_na_janela(self, id_profissional: UUID, janela: tuple[datetime, datetime]) -> list[AgendamentoDB]:
+        return (
+            self.session.query(AgendamentoDB)
+            .options(joinedload(AgendamentoDB.servico))
+            .filter(AgendamentoDB.profissional_id == id_profissional, *self._sobrepoe_janela(janela))
+            .order_by(AgendamentoDB.data_hora_inicio)
+            .all()
+        )
+
+    def buscar_por_id(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        return self._buscar(janela, somente_ocupacao, id=id_profissional)
+
+    def buscar_por_telefone(
+        self, telefone: str, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        return self._buscar(janela, somente_ocupacao, telefone_whatsapp=telefone)
+
+    def obter_versao(self, id_profissional: UUID) -> int | None:
+        return self.session.execute(
+            select(ProfissionalDB.versao).where(ProfissionalDB.id == id_profissional)
+        ).scalar_one_or_none()
+
+    def obter_atualizacao(self, id_profissional: UUID) -> tuple[int, datetime | None] | None:
+        linha = self.session.execute(
+            select(ProfissionalDB.versao, ProfissionalDB.atualizado_em).where(ProfissionalDB.id == id_profissional)
+        ).one_or_none()
+        return tuple(linha) if linha else None
+
+    # Apenas colunas, sem entidades ORM: nada se acumula no identity map ao percorrer o resultado.
+    _COLUNAS_AGENDAMENTO = (
+        AgendamentoDB.id, ServicoDB.nome, ServicoDB.duracao_minutos,
+        AgendamentoDB.data_hora_inicio, AgendamentoDB.cliente_contato, AgendamentoDB.status,
+    )
+
+    @classmethod
+    def _consulta_agendamentos(cls, id_profissional: UUID, janela: tuple[datetime, datetime]):
+        """
+        Agendamentos operacionais e arquivados da janela em uma única consulta (UNION ALL),
+        ordenada pelo início no banco: o resultado continua podendo ser lido em lotes.
+        """
+        def da_tabela(tabela):
+            return (
+                select(tabela.id, ServicoDB.nome, ServicoDB.duracao_minutos,
+                       tabela.data_hora_inicio, tabela.cliente_contato, tabela.status)
+                .join(ServicoDB, tabela.servico_id == ServicoDB.id)
+                .where(tabela.profissional_id == id_profissional, *cls._sobrepoe_janela(janela, tabela))
+            )
+
+        uniao = union_all(da_tabela(AgendamentoDB), da_tabela(AgendamentoArquivadoDB)).subquery()
+        return select(uniao).order_by(uniao.c.data_hora_inicio)
+
+    @staticmethod
+    def _agendamento_de_linha(linha) -> Agendamento:
+        id_, nome_servico, duracao_minutos, inicio, cliente_contato, status = linha
+        return Agendamento(
+            id=id_, servico=Servico(nome=nome_servico, duracao_minutos=duracao_minutos),
+            data_hora_inicio=inicio, cliente_contato=cliente_contato, status=status,
+        )
+
+    def iterar_agendamentos(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime], tamanho_lote: int = 1000
+    ) -> Iterator[Agendamento]:
+        consulta = self._consulta_agendamentos(id_profissional, janela).execution_options(yield_per=tamanho_lote)
+        for linha in self.session.execute(consulta):
+            yield self._agendamento_de_linha(linha)
+
+    def listar_agendamentos(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        # O profissional entra na consulta (LEFT JOIN) só para distinguir "sem agendamentos" de "inexistente";
+        # os agendamentos vêm pelo índice (profissional_id, data_hora_inicio), já filtrados e ordenados.
+        condicoes = [AgendamentoDB.profissional_id == ProfissionalDB.id, *self._sobrepoe_janela(janela)]
+        if status is not None:
+            condicoes.append(AgendamentoDB.status.in_(list(status)))
+        consulta = (
+            select(ProfissionalDB.id, *self._COLUNAS_AGENDAMENTO)
+            .select_from(ProfissionalDB)
+            .outerjoin(AgendamentoDB, and_(*condicoes))
+            .outerjoin(ServicoDB, AgendamentoDB.servico_id == ServicoDB.id)
+            .where(ProfissionalDB.id == id_profissional)
+            .order_by(AgendamentoDB.data_hora_inicio)
+        )
+        linhas = self.session.execute(consulta).all()
+        if not linhas:
+            return None
+        return [self._agendamento_de_linha(linha[1:]) for linha in linhas if linha[1] is not None]
 
-    def buscar_por_id(self, id_profissional: UUID) -> Profissional | None:
-        # ... (código do buscar_por_id inalterado) ...
-        profissional_db = (self.session.query(ProfissionalDB).options(joinedload(ProfissionalDB.servicos_oferecidos), joinedload(ProfissionalDB.agendamentos).joinedload(AgendamentoDB.servico)).filter_by(id=id_profissional).first())
-        return self._to_domain(profissional_db)
-    
-    def buscar_por_telefone(self, telefone: str) -> Profissional | None:
-        # ... (código do buscar_por_telefone inalterado) ...
-        profissional_db = (self.session.query(ProfissionalDB).options(joinedload(ProfissionalDB.servicos_oferecidos), joinedload(ProfissionalDB.agendamentos).joinedload(AgendamentoDB.servico)).filter_by(telefone_whatsapp=telefone).first())
-        return self._to_domain(profissional_db)
+    def listar_historico(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        recentes = self.listar_agendamentos(id_profissional, janela, status=status)
+        if recentes is None:
+            return None
+        condicoes = [
+            AgendamentoArquivadoDB.profissional_id == id_profissional,
+            *self._sobrepoe_janela(janela, AgendamentoArquivadoDB),
+        ]
+        if status is not None:
+            condicoes.append(AgendamentoArquivadoDB.status.in_(list(status)))
+        consulta = (
+            select(
+                AgendamentoArquivadoDB.id, ServicoDB.nome, ServicoDB.duracao_minutos,
+                AgendamentoArquivadoDB.data_hora_inicio, AgendamentoArquivadoDB.cliente_contato,
+                AgendamentoArquivadoDB.status,
+            )
+            .join(ServicoDB, AgendamentoArquivadoDB.servico_id == ServicoDB.id)
+            .where(*condicoes)
+            .order_by(AgendamentoArquivadoDB.data_hora_inicio)
+        )
+        arquivados = [self._agendamento_de_linha(linha) for linha in self.session.execute(consulta)]
+        # As duas listas já vêm ordenadas; o horizonte pode ter mudado, então elas podem se intercalar.
+        return list(heapq.merge(arquivados, recentes, key=lambda agendamento: agendamento.data_hora_inicio))
+
+    def listar_por_servico(
+        self, nome_servico: str, janela: tuple[datetime, datetime], somente_ocupacao: bool = False
+    ) -> list[Profissional]:
+        # 1ª consulta: profissionais que oferecem o serviço, já com todos os seus serviços.
+        servico_filtro = aliased(ServicoDB)
+        profissionais_db = (
+            self.session.query(ProfissionalDB)
+            .join(servico_filtro, ProfissionalDB.servicos_oferecidos)
+            .filter(servico_filtro.nome == nome_servico)
+            .options(joinedload(ProfissionalDB.servicos_oferecidos))
+            .order_by(ProfissionalDB.nome, ProfissionalDB.id)
+            .all()
+        )
+        if not profissionais_db:
+            return []
+
+        # 2ª consulta: agendamentos confirmados na janela de todos esses profissionais de uma vez.
+        oferecem_servico = (
+            select(profissional_servico_association.c.profissional_id)
+            .join(ServicoDB, ServicoDB.id == profissional_servico_association.c.servico_id)
+            .where(ServicoDB.nome == nome_servico)
+        )
+        if somente_ocupacao:
+            ocupacoes = self._ocupacao(AgendamentoDB.profissional_id.in_(oferecem_servico), janela)
+            profissionais = []
+            for prof_db in profissionais_db:
+                profissional = self._to_domain(prof_db, [])
+                profissional.carregar_ocupacao(ocupacoes.get(prof_db.id, AgendaCompacta()))
+                profissionais.append(profissional)
+            return profissionais
+
+        agendamentos_por_profissional: dict[UUID, list[AgendamentoDB]] = defaultdict(list)
+        agendamentos_db = (
+            self.session.query(AgendamentoDB)
+            .options(joinedload(AgendamentoDB.servico))
+            .filter(
+                AgendamentoDB.profissional_id.in_(oferecem_servico),
+                AgendamentoDB.status == AgendamentoStatus.CONFIRMADO,
+                *self._sobrepoe_janela(janela),
+            )
+            .order_by(AgendamentoDB.data_hora_inicio)
+        )
+        for agendamento_db in agendamentos_db:
+            agendamentos_por_profissional[agendamento_db.profissional_id].append(agendamento_db)
+
+        return [
+            self._to_domain(prof_db, agendamentos_por_profissional.get(prof_db.id, []))
+            for prof_db in profissionais_db
+        ]
 
     # --- NOVO MÉTODO IMPLEMENTADO ---
     def listar_todos(self) -> list[Profissional]:
         """Busca todos os profissionais no banco de dados."""
-        todos_profissionais_db = self.session.query(ProfissionalDB).all()
+        # 'selectinload' carrega as coleções de todos os profissionais em poucas consultas (sem N+1).
+        todos_profissionais_db = (
+            self.session.query(ProfissionalDB)
+            .options(
+                selectinload(ProfissionalDB.servicos_oferecidos),
+                selectinload(ProfissionalDB.agendamentos).joinedload(AgendamentoDB.servico),
+            )
+            .all()
+        )
         # Converte cada resultado do banco para o nosso objeto de domínio
-        return [self._to_domain(prof_db) for prof_db in todos_profissionais_db]
\ No newline at end of file
+        return [self._to_domain(prof_db) for prof_db in todos_profissionais_db]
+
+    def _query_resumos(self):
+        return (
+            self.session.query(ProfissionalDB.id, ProfissionalDB.nome, ProfissionalDB.telefone_whatsapp)
+            .order_by(ProfissionalDB.id)
+        )
+
+    def listar_resumos(self, after_id: UUID | None = None, limit: int = 100) -> list[ProfissionalResumo]:
+        query = self._query_resumos()
+        if after_id is not None:
+            query = query.filter(ProfissionalDB.id > after_id)
+        return [
+            ProfissionalResumo(id=id_, nome=nome, telefone_whatsapp=telefone)
+            for id_, nome, telefone in query.limit(limit)
+        ]
+
+    def iterar_resumos(self, tamanho_lote: int = 1000) -> Iterator[ProfissionalResumo]:
+        # Uma única consulta, consumida em lotes pelo cursor.
+        for id_, nome, telefone in self._query_resumos().yield_per(tamanho_lote):
+            yield ProfissionalResumo(id=id_, nome=nome, telefone_whatsapp=telefone)
+
+
+class AsyncProfissionalRepositorio(IProfissionalRepositorioAsync):
+    """
+    Repositório assíncrono sobre uma AsyncSession.
+    Cada método executa o repositório síncrono com 'AsyncSession.run_sync': o
+    SQL e o mapeamento são os mesmos, mas a espera pelo banco libera o event
+    loop em vez de ocupar uma thread.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        repositorio_sincrono: Callable[[Session], IProfissionalRepositorio] = SQLiteProfissionalRepositorio,
+    ):
+        self.session = session
+        self._repositorio = repositorio_sincrono(session.sync_session)
+
+    async def _executar(self, metodo, *args, **kwargs):
+        return await self.session.run_sync(lambda _: metodo(*args, **kwargs))
+
+    async def salvar(self, profissional: Profissional) -> None:
+        await self._executar(self._repositorio.salvar, profissional)
+
+    async def buscar_por_id(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        return await self._executar(
+            self._repositorio.buscar_por_id, id_profissional, janela=janela, somente_ocupacao=somente_ocupacao
+        )
+
+    async def buscar_por_telefone(
+        self, telefone: str, janela: tuple[datetime, datetime] | None = None, somente_ocupacao: bool = False
+    ) -> Profissional | None:
+        return await self._executar(
+            self._repositorio.buscar_por_telefone, telefone, janela=janela, somente_ocupacao=somente_ocupacao
+        )
+
+    async def obter_versao(self, id_profissional: UUID) -> int | None:
+        return await self._executar(self._repositorio.obter_versao, id_profissional)
+
+    async def obter_atualizacao(self, id_profissional: UUID) -> tuple[int, datetime | None] | None:
+        return await self._executar(self._repositorio.obter_atualizacao, id_profissional)
+
+    async def iterar_agendamentos(
+        self, id_profissional: UUID, janela: tuple[datetime, datetime], tamanho_lote: int = 1000
+    ) -> AsyncIterator[Agendamento]:
+        # 'stream' mantém o cursor aberto e busca 'tamanho_lote' linhas por vez, sem bloquear o event loop.
+        consulta = SQLiteProfissionalRepositorio._consulta_agendamentos(id_profissional, janela)
+        resultado = await self.session.stream(consulta.execution_options(yield_per=tamanho_lote))
+        async for linha in resultado:
+            yield SQLiteProfissionalRepositorio._agendamento_de_linha(linha)
+
+    async def listar_agendamentos(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        return await self._executar(self._repositorio.listar_agendamentos, id_profissional, janela, status=status)
+
+    async def listar_historico(
+        self,
+        id_profissional: UUID,
+        janela: tuple[datetime, datetime],
+        status: Collection[AgendamentoStatus] | None = None,
+    ) -> list[Agendamento] | None:
+        return await self._executar(self._repositorio.listar_historico, id_profissional, janela, status=status)
+
+    async def listar_por_servico(
+        self, nome_servico: str, janela: tuple[datetime, datetime], somente_ocupacao: bool = False
+    ) -> list[Profissional]:
+        return await self._executar(
+            self._repositorio.listar_por_servico, nome_servico, janela, somente_ocupacao=somente_ocupacao
+        )
+
+    async def listar_resumos(self, after_id: UUID | None = None, limit: int = 100) -> list[ProfissionalResumo]:
+        return await self._executar(self._repositorio.listar_resumos, after_id=after_id, limit=limit)
+
+    async def iterar_resumos(self, tamanho_lote: int = 1000) -> AsyncIterator[ProfissionalResumo]:
+        # Páginas por chave: nenhuma consulta fica aberta entre um lote e outro.
+        after_id = None
+        while True:
+            lote = await self.listar_resumos(after_id=after_id, limit=tamanho_lote)
+            for resumo in lote:
+                yield resumo
+            if len(lote) < tamanho_lote:
+                return
+            after_id = lote[-1].id
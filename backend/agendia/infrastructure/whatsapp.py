@@ -0,0 +1,54 @@
+import threading
+from typing import Callable
+
+from agendia.application.ports import IWhatsAppAdapter
+from agendia.config import Settings
+
+
+def criar_whatsapp_adapter(settings: Settings) -> IWhatsAppAdapter:
+    """
+    Cria o adaptador escolhido em 'settings.whatsapp_adapter'.
+    Cada implementação é importada só aqui: o PyWhatKit depende de um ambiente
+    gráfico e o 'requests' do adaptador HTTP não precisa pesar na importação da API.
+    """
+    if settings.whatsapp_adapter == "pywhatkit":
+        from .whatsapp_adapter import PyWhatKitAdapter
+        return PyWhatKitAdapter()
+    from .whatsapp_http import HttpWhatsAppAdapter
+    return HttpWhatsAppAdapter(
+        url_base=settings.whatsapp_adapter_url,
+        timeout_conexao_segundos=settings.whatsapp_timeout_conexao_segundos,
+        timeout_leitura_segundos=settings.whatsapp_timeout_leitura_segundos,
+        pool_conexoes=settings.whatsapp_pool_conexoes,
+    )
+
+
+class WhatsAppSobDemanda(IWhatsAppAdapter):
+    """
+    Adia a criação do adaptador real até o primeiro envio. Quem só precisa
+    ter um adaptador em mãos (ex.: o despachante, criado na inicialização da
+    API) não paga a importação nem a abertura de conexões antes da hora.
+    """
+
+    def __init__(self, fabrica: Callable[[], IWhatsAppAdapter]):
+        self._fabrica = fabrica
+        self._adaptador: IWhatsAppAdapter | None = None
+        self._lock = threading.Lock()
+
+    def _resolver(self) -> IWhatsAppAdapter:
+        if self._adaptador is None:
+            with self._lock:
+                if self._adaptador is None:
+                    self._adaptador = self._fabrica()
+        return self._adaptador
+
+    def enviar_texto(self, numero_destino: str, texto: str) -> None:
+        self._resolver().enviar_texto(numero_destino=numero_destino, texto=texto)
+
+    def enviar_lote(self, mensagens: list[tuple[str, str]]) -> list[Exception | None]:
+        return self._resolver().enviar_lote(mensagens)
+
+    def fechar(self) -> None:
+        # Nunca usado: não há o que fechar (nem motivo para criar o adaptador agora).
+        if self._adaptador is not None:
+            self._adaptador.fechar()
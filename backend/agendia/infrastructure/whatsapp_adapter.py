@@ -1,7 +1,7 @@
 import pywhatkit
 from pywhatkit.core.exceptions import CountryCodeException
 
-from agendia.application.ports import IWhatsAppAdapter
+from agendia.application.ports import IWhatsAppAdapter, EnvioMensagemError
 
 class PyWhatKitAdapter(IWhatsAppAdapter):
     """
@@ -16,6 +16,9 @@ class PyWhatKitAdapter(IWhatsAppAdapter):
             numero_destino: O número no formato internacional com o sinal de '+'. 
                             Ex: +5583999998888
             texto: A mensagem a ser enviada.
+
+        Raises:
+            EnvioMensagemError: se o número for inválido ou o envio falhar.
         """
         try:
             print(f"INFO: Tentando enviar mensagem para {numero_destino} com PyWhatKit...")
@@ -30,7 +33,9 @@ class PyWhatKitAdapter(IWhatsAppAdapter):
             )
             print("SUCESSO: Mensagem enviada para a fila de envio do PyWhatKit.")
 
-        except CountryCodeException:
-            print(f"ERRO: O número '{numero_destino}' é inválido. Ele precisa incluir o código do país com o sinal de '+' (ex: +55).")
+        except CountryCodeException as e:
+            raise EnvioMensagemError(
+                f"O número '{numero_destino}' é inválido. Ele precisa incluir o código do país com o sinal de '+' (ex: +55)."
+            ) from e
         except Exception as e:
-            print(f"ERRO: Ocorreu um erro inesperado ao tentar enviar a mensagem com PyWhatKit: {e}")
\ No newline at end of file
+            raise EnvioMensagemError(f"Erro inesperado ao tentar enviar a mensagem com PyWhatKit: {e}") from e
\ No newline at end of file
@@ -0,0 +1,80 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from agendia.application.ports import IWhatsAppAdapter, EnvioMensagemError
+
+
+class HttpWhatsAppAdapter(IWhatsAppAdapter):
+    """
+    Implementação do adaptador de WhatsApp que envia as mensagens pelo serviço
+    Node em 'whatsapp-adapter/' (whatsapp-web.js), via HTTP.
+
+    Usa uma única sessão 'requests' com pool de conexões keep-alive, então a
+    mesma instância deve ser compartilhada (ela é segura para uso entre threads).
+    """
+
+    def __init__(
+        self,
+        url_base: str,
+        timeout_conexao_segundos: float = 2.0,
+        timeout_leitura_segundos: float = 15.0,
+        pool_conexoes: int = 20,
+    ):
+        self.url_base = url_base.rstrip("/")
+        self.timeout = (timeout_conexao_segundos, timeout_leitura_segundos)
+        self.session = requests.Session()
+        # Sem novas tentativas aqui: quem reenvia é o despachante da fila de notificações.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_conexoes, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, caminho: str, payload: dict) -> dict:
+        try:
+            resposta = self.session.post(f"{self.url_base}{caminho}", json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise EnvioMensagemError(f"Falha de comunicação com o serviço de WhatsApp: {e}") from e
+        try:
+            corpo = resposta.json()
+        except ValueError:
+            corpo = {}
+        if resposta.status_code >= 400:
+            raise EnvioMensagemError(
+                f"O serviço de WhatsApp recusou o envio ({resposta.status_code}): {corpo.get('erro', resposta.text)}"
+            )
+        return corpo
+
+    def enviar_texto(self, numero_destino: str, texto: str) -> None:
+        """
+        Envia uma mensagem de texto pelo endpoint POST /send do serviço Node.
+
+        Args:
+            numero_destino: O número no formato internacional. Ex: +5583999998888
+            texto: A mensagem a ser enviada.
+
+        Raises:
+            EnvioMensagemError: se o serviço estiver fora do ar ou recusar o envio.
+        """
+        self._post("/send", {"numero": numero_destino, "texto": texto})
+
+    def enviar_lote(self, mensagens: list[tuple[str, str]]) -> list[Exception | None]:
+        """Envia todas as mensagens em uma única requisição a POST /send-batch."""
+        if not mensagens:
+            return []
+        try:
+            corpo = self._post("/send-batch", {
+                "mensagens": [{"numero": numero, "texto": texto} for numero, texto in mensagens]
+            })
+        except EnvioMensagemError as e:
+            return [e] * len(mensagens)
+        resultados = corpo.get("resultados", [])
+        if len(resultados) != len(mensagens):
+            erro = EnvioMensagemError("Resposta do serviço de WhatsApp não corresponde ao lote enviado.")
+            return [erro] * len(mensagens)
+        return [
+            None if resultado.get("ok") else EnvioMensagemError(resultado.get("erro", "Falha no envio."))
+            for resultado in resultados
+        ]
+
+    def fechar(self) -> None:
+        """Fecha as conexões do pool."""
+        self.session.close()
@@ -0,0 +1,115 @@
+"""
+Leituras e escritas concorrentes no SQLite: perfil padrão x perfil de produção.
+
+Por alguns segundos, processos leitores carregam a agenda do dia de um
+profissional (buscar_por_id com janela) enquanto processos escritores fazem
+agendamentos (cada um na agenda de um profissional diferente). Compara:
+- padrão: journal DELETE, synchronous FULL, sem PRAGMAs (como antes de Settings);
+- produção: os PRAGMAs de Settings (WAL, synchronous NORMAL, busy_timeout, mmap, cache).
+
+Cada perfil usa um arquivo novo em um diretório temporário.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.bench_banco_concorrencia [segundos] [leitoras] [escritoras]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time as relogio
+from datetime import datetime, time, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from agendia.application.use_cases import RealizarAgendamentoUseCase, AgendamentoInput
+from agendia.core.domain import Profissional, Servico
+from agendia.infrastructure.database import Base, criar_engine, pragmas_sqlite
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+PERFIS = {"padrão": {}, "produção": pragmas_sqlite()}
+INICIO = datetime(2025, 6, 9, 0, 0)
+
+
+def preparar(session_factory, total: int) -> list[Profissional]:
+    profissionais = []
+    with session_factory() as session:
+        repositorio = SQLiteProfissionalRepositorio(session)
+        for i in range(total):
+            profissional = Profissional(
+                nome=f"Profissional {i}", telefone_whatsapp=f"+55839{i:08d}",
+                servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+                horario_trabalho={dia: (time(0, 0), time(23, 59)) for dia in range(7)},
+            )
+            repositorio.salvar(profissional)
+            profissionais.append(profissional)
+    return profissionais
+
+
+def _trabalhar(papel: str, i: int, url: str, pragmas: dict, profissional_id, segundos: float, fila) -> None:
+    """Laço de um processo leitor ou escritor; devolve (leituras, escritas, erros) pela fila."""
+    engine = criar_engine(url, pragmas=pragmas)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    leituras = escritas = erros = 0
+    horario = INICIO
+    fim = relogio.perf_counter() + segundos
+    while relogio.perf_counter() < fim:
+        try:
+            with session_factory() as session:
+                repositorio = SQLiteProfissionalRepositorio(session)
+                if papel == "leitora":
+                    repositorio.buscar_por_id(profissional_id, janela=(INICIO, INICIO + timedelta(days=1)))
+                    leituras += 1
+                else:
+                    RealizarAgendamentoUseCase(repositorio, SQLiteFilaNotificacoes(session)).executar(AgendamentoInput(
+                        profissional_id=profissional_id, cliente_contato=f"cliente-{i}",
+                        nome_servico="Corte", data_hora_inicio=horario,
+                    ))
+                    escritas += 1
+        except Exception:
+            erros += 1
+        if papel == "escritora":
+            horario += timedelta(minutes=30)
+    engine.dispose()
+    fila.put((leituras, escritas, erros))
+
+
+def executar_perfil(pragmas: dict, segundos: float, leitoras: int, escritoras: int) -> dict[str, float]:
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='agendia-banco-'), 'agendia.db')}"
+    engine = criar_engine(url, pragmas=pragmas)
+    Base.metadata.create_all(bind=engine)
+    profissionais = preparar(sessionmaker(autocommit=False, autoflush=False, bind=engine), max(leitoras, escritoras))
+    engine.dispose()
+
+    # Um processo por leitora/escritora, como vários workers do uvicorn sobre o mesmo arquivo.
+    fila = multiprocessing.Queue()
+    papeis = [("leitora", i) for i in range(leitoras)] + [("escritora", i) for i in range(escritoras)]
+    processos = [
+        multiprocessing.Process(
+            target=_trabalhar, args=(papel, i, url, pragmas, profissionais[i].id, segundos, fila)
+        )
+        for papel, i in papeis
+    ]
+    for p in processos:
+        p.start()
+    resultados = [fila.get() for _ in processos]
+    for p in processos:
+        p.join()
+    leituras, escritas, erros = (sum(coluna) for coluna in zip(*resultados))
+    return {"leituras": leituras / segundos, "escritas": escritas / segundos, "erros": erros / segundos}
+
+
+def main(segundos: float, leitoras: int, escritoras: int):
+    print(f"{leitoras} leitoras, {escritoras} escritoras, {segundos:.0f} s por perfil")
+    for nome, pragmas in PERFIS.items():
+        resultado = executar_perfil(pragmas, segundos, leitoras, escritoras)
+        print(f"{nome:9s}: {resultado['leituras']:7.0f} leituras/s  {resultado['escritas']:6.0f} escritas/s  "
+              f"{resultado['erros']:5.1f} erros/s")
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 4,
+    )
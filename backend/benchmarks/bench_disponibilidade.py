@@ -0,0 +1,82 @@
+"""
+Benchmark da checagem de disponibilidade (Profissional.esta_disponivel).
+
+Mede a latência média de uma checagem de conflito conforme o histórico do
+profissional cresce de 10 até 100 mil agendamentos. Com o índice ordenado a
+latência deve se manter praticamente constante.
+
+Também mede a busca de horários livres (Profissional.horarios_livres) em um
+período de 30 dias dentro do histórico.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.bench_disponibilidade
+"""
+import random
+import time as relogio
+from datetime import datetime, time, timedelta
+
+from agendia.core.domain import Agendamento, AgendamentoStatus, Profissional, Servico
+
+TAMANHOS = (10, 100, 1_000, 10_000, 100_000)
+CHECAGENS = 2_000
+
+
+def criar_profissional(total_agendamentos: int) -> Profissional:
+    servico = Servico(nome="Corte", duracao_minutos=30)
+    profissional = Profissional(
+        nome="Profissional Benchmark",
+        telefone_whatsapp="+5583900000000",
+        servicos_oferecidos=[servico],
+        horario_trabalho={dia: (time(0, 0), time(23, 59)) for dia in range(7)},
+    )
+    inicio = datetime(2020, 1, 1, 0, 0)
+    status = (AgendamentoStatus.CONFIRMADO, AgendamentoStatus.CANCELADO, AgendamentoStatus.CONCLUIDO)
+    for i in range(total_agendamentos):
+        profissional.agendamentos.append(Agendamento(
+            servico=servico,
+            data_hora_inicio=inicio + timedelta(minutes=30 * i),
+            cliente_contato=f"cliente_{i}",
+            status=status[i % 3],
+        ))
+    return profissional
+
+
+def medir(profissional: Profissional) -> float:
+    """Retorna a latência média, em microssegundos, de uma checagem."""
+    fim_agenda = profissional.agendamentos[-1].data_hora_fim
+    minutos_totais = int((fim_agenda - datetime(2020, 1, 1)).total_seconds() // 60)
+    candidatos = [
+        datetime(2020, 1, 1) + timedelta(minutes=random.randrange(0, minutos_totais + 1))
+        for _ in range(CHECAGENS)
+    ]
+    profissional.esta_disponivel(candidatos[0], 30)  # Constrói o índice fora da medição
+
+    comeco = relogio.perf_counter()
+    for candidato in candidatos:
+        profissional.esta_disponivel(candidato, 30)
+    return (relogio.perf_counter() - comeco) / CHECAGENS * 1_000_000
+
+
+def medir_busca_30_dias(profissional: Profissional) -> float:
+    """Retorna o tempo, em milissegundos, de uma busca de horários livres em 30 dias."""
+    servico = profissional.servicos_oferecidos[0]
+    inicio = profissional.agendamentos[len(profissional.agendamentos) // 2].data_hora_inicio.replace(hour=0, minute=0)
+    profissional.esta_disponivel(inicio, 30)  # Constrói o índice fora da medição
+
+    comeco = relogio.perf_counter()
+    profissional.horarios_livres(servico, inicio, inicio + timedelta(days=30), granularidade_minutos=15)
+    return (relogio.perf_counter() - comeco) * 1_000
+
+
+def main():
+    random.seed(42)
+    print(f"{'agendamentos':>14} | {'latência média (µs)':>20} | {'busca 30 dias (ms)':>19}")
+    for tamanho in TAMANHOS:
+        profissional = criar_profissional(tamanho)
+        latencia = medir(profissional)
+        busca = medir_busca_30_dias(profissional)
+        print(f"{tamanho:>14} | {latencia:>20.2f} | {busca:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
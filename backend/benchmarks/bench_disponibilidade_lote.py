@@ -0,0 +1,77 @@
+"""
+Benchmark da checagem de disponibilidade em lote (Profissional.disponibilidade_em_lote).
+
+Sobre o mesmo histórico de bench_disponibilidade (100 mil agendamentos por
+padrão), testa uma grade de 10 mil horários candidatos (de 15 em 15 minutos,
+a partir do meio do histórico) de três formas:
+- escalar: um 'esta_disponivel' por candidato;
+- lote: uma chamada com a grade em datetime64, agenda em entidades Agendamento;
+- lote compacta: idem, com a agenda carregada como AgendaCompacta
+  (a forma das leituras com 'somente_ocupacao').
+
+Confere que as três máscaras são iguais e imprime a latência de cada uma.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.bench_disponibilidade_lote [agendamentos] [candidatos]
+"""
+import sys
+import time as relogio
+from datetime import datetime
+
+import numpy as np
+
+from agendia.core.domain import AgendaCompacta, AgendamentoStatus, Profissional
+from benchmarks.bench_disponibilidade import criar_profissional
+
+DURACAO = 30
+REPETICOES = 5
+
+
+def grade(profissional: Profissional, candidatos: int) -> np.ndarray:
+    meio = profissional.agendamentos[len(profissional.agendamentos) // 2].data_hora_inicio
+    inicio = np.datetime64(meio.replace(hour=0, minute=0), "m")
+    return inicio + np.arange(candidatos) * np.timedelta64(15, "m")
+
+
+def compactar(profissional: Profissional) -> Profissional:
+    compacto = profissional.model_copy(update={"agendamentos": []})
+    compacto.carregar_ocupacao(AgendaCompacta(
+        (ag.data_hora_inicio, ag.data_hora_fim)
+        for ag in profissional.agendamentos if ag.status == AgendamentoStatus.CONFIRMADO
+    ))
+    return compacto
+
+
+def cronometrar(funcao) -> tuple[float, object]:
+    """Menor tempo, em milissegundos, entre algumas repetições (e o último resultado)."""
+    melhor, resultado = float("inf"), None
+    for _ in range(REPETICOES):
+        comeco = relogio.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, relogio.perf_counter() - comeco)
+    return melhor * 1_000, resultado
+
+
+def main(total_agendamentos: int, candidatos: int):
+    profissional = criar_profissional(total_agendamentos)
+    compacto = compactar(profissional)
+    horarios = grade(profissional, candidatos)
+    como_datetime = horarios.astype("datetime64[s]").astype(datetime).tolist()
+    profissional.esta_disponivel(como_datetime[0], DURACAO)  # Constrói o índice fora da medição
+
+    escalar, esperado = cronometrar(lambda: [profissional.esta_disponivel(h, DURACAO) for h in como_datetime])
+    lote, mascara = cronometrar(lambda: profissional.disponibilidade_em_lote(horarios, DURACAO))
+    lote_compacta, mascara_compacta = cronometrar(lambda: compacto.disponibilidade_em_lote(horarios, DURACAO))
+    assert mascara.tolist() == esperado and mascara_compacta.tolist() == esperado
+
+    print(f"{total_agendamentos} agendamentos, {candidatos} candidatos ({sum(esperado)} livres)")
+    print(f"{'forma':>14} | {'tempo (ms)':>10} | {'x escalar':>9}")
+    for nome, tempo in (("escalar", escalar), ("lote", lote), ("lote compacta", lote_compacta)):
+        print(f"{nome:>14} | {tempo:>10.2f} | {escalar / tempo:>9.0f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000,
+    )
@@ -0,0 +1,102 @@
+"""
+Benchmark das representações da agenda: Agendamento (pydantic) x AgendaCompacta.
+
+Para um histórico de 100 mil agendamentos confirmados, compara as duas formas
+que um repositório pode entregar ao domínio:
+- entidades: um Agendamento (com seu Servico) por linha, como em '_to_domain';
+- compacta: os pares (início, fim) em uma AgendaCompacta, como nas leituras
+  com 'somente_ocupacao'.
+
+Mede a memória alocada (tracemalloc), o tempo de montagem a partir de tuplas
+como as devolvidas pelo banco e a latência média de uma checagem de
+disponibilidade sobre o agregado montado.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.bench_representacao_agenda [agendamentos]
+"""
+import random
+import sys
+import time as relogio
+import tracemalloc
+from datetime import datetime, time, timedelta
+
+from agendia.core.domain import AgendaCompacta, Agendamento, Profissional, Servico
+
+CHECAGENS = 2_000
+INICIO = datetime(2020, 1, 1, 0, 0)
+SERVICO = Servico(nome="Corte", duracao_minutos=30)
+
+
+def linhas_do_banco(total: int) -> list[tuple]:
+    """(id, início, fim, contato), como as colunas lidas dos agendamentos."""
+    return [
+        (i, INICIO + timedelta(minutes=30 * i), INICIO + timedelta(minutes=30 * i + 30), f"cliente_{i}")
+        for i in range(total)
+    ]
+
+
+def _profissional() -> Profissional:
+    return Profissional(
+        nome="Profissional Benchmark", telefone_whatsapp="+5583900000000", servicos_oferecidos=[SERVICO],
+        horario_trabalho={dia: (time(0, 0), time(23, 59)) for dia in range(7)},
+    )
+
+
+def montar_entidades(linhas: list[tuple]) -> Profissional:
+    profissional = _profissional()
+    profissional.agendamentos = [
+        Agendamento(
+            servico=Servico(nome=SERVICO.nome, duracao_minutos=SERVICO.duracao_minutos),
+            data_hora_inicio=inicio, cliente_contato=contato,
+        )
+        for _, inicio, _, contato in linhas
+    ]
+    return profissional
+
+
+def montar_compacta(linhas: list[tuple]) -> Profissional:
+    profissional = _profissional()
+    profissional.carregar_ocupacao(AgendaCompacta((inicio, fim) for _, inicio, fim, _ in linhas))
+    return profissional
+
+
+def _montar_com_indice(montar, linhas: list[tuple]) -> Profissional:
+    profissional = montar(linhas)
+    profissional.esta_disponivel(INICIO, 30)  # O índice também faz parte do custo de montagem
+    return profissional
+
+
+def medir(montar, linhas: list[tuple]) -> tuple[float, float, float]:
+    """Retorna (MiB alocados, ms para montar, µs por checagem)."""
+    # A memória é medida em uma montagem à parte: o tracemalloc deixa as alocações bem mais lentas.
+    tracemalloc.start()
+    profissional = _montar_com_indice(montar, linhas)
+    memoria = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del profissional
+
+    comeco = relogio.perf_counter()
+    profissional = _montar_com_indice(montar, linhas)
+    montagem = (relogio.perf_counter() - comeco) * 1_000
+
+    minutos_totais = 30 * len(linhas)
+    candidatos = [INICIO + timedelta(minutes=random.randrange(0, minutos_totais)) for _ in range(CHECAGENS)]
+    comeco = relogio.perf_counter()
+    for candidato in candidatos:
+        profissional.esta_disponivel(candidato, 30)
+    checagem = (relogio.perf_counter() - comeco) / CHECAGENS * 1_000_000
+    return memoria, montagem, checagem
+
+
+def main(total: int):
+    random.seed(42)
+    linhas = linhas_do_banco(total)
+    print(f"{total} agendamentos")
+    print(f"{'representação':>14} | {'memória (MiB)':>13} | {'montagem (ms)':>13} | {'checagem (µs)':>13}")
+    for nome, montar in (("entidades", montar_entidades), ("compacta", montar_compacta)):
+        memoria, montagem, checagem = medir(montar, linhas)
+        print(f"{nome:>14} | {memoria:>13.1f} | {montagem:>13.0f} | {checagem:>13.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,48 @@
+"""
+Benchmark de vazão do HttpWhatsAppAdapter contra o stub local do whatsapp-adapter.
+
+Mede mensagens por segundo em três modos: envio sequencial, envio concorrente
+(várias threads compartilhando o pool de conexões) e envio em lote (/send-batch).
+O PyWhatKitAdapter, para comparação, leva ~15 s por mensagem.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.bench_whatsapp_http
+"""
+import time as relogio
+from concurrent.futures import ThreadPoolExecutor
+
+from agendia.infrastructure.whatsapp_http import HttpWhatsAppAdapter
+from tests.stub_whatsapp_server import StubWhatsAppServer
+
+MENSAGENS = 2_000
+THREADS = 8
+TAMANHO_LOTE = 100
+
+
+def medir(descricao: str, enviar) -> None:
+    comeco = relogio.perf_counter()
+    enviar()
+    duracao = relogio.perf_counter() - comeco
+    print(f"{descricao:>22} | {MENSAGENS / duracao:>10.0f} msg/s")
+
+
+def main():
+    servidor = StubWhatsAppServer().iniciar()
+    adapter = HttpWhatsAppAdapter(url_base=servidor.url, pool_conexoes=THREADS)
+    mensagens = [(f"+55839{i % 50:08d}", f"mensagem {i}") for i in range(MENSAGENS)]
+    try:
+        print(f"{'modo':>22} | {'vazão':>14}")
+        medir("sequencial", lambda: [adapter.enviar_texto(n, t) for n, t in mensagens])
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            medir(f"{THREADS} threads", lambda: list(pool.map(lambda m: adapter.enviar_texto(*m), mensagens)))
+        medir(
+            f"lotes de {TAMANHO_LOTE}",
+            lambda: [adapter.enviar_lote(mensagens[i:i + TAMANHO_LOTE]) for i in range(0, MENSAGENS, TAMANHO_LOTE)],
+        )
+    finally:
+        adapter.fechar()
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
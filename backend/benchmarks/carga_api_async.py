@@ -0,0 +1,113 @@
+"""
+Vazão da API com 1.000 conexões simultâneas: rotas 'async' x caminho síncrono.
+
+Dispara o mesmo volume de GET /profissionais/{id}/disponibilidade contra:
+- a aplicação real (rota 'async', AsyncSession + aiosqlite);
+- uma cópia síncrona da mesma rota (função 'def' + SessionLocal), como era
+  antes: cada requisição ocupa uma thread do threadpool do Starlette.
+
+As requisições rodam em processo (httpx + ASGI, sem rede). O banco é criado
+em um diretório temporário, para não tocar no agendia.db.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.carga_api_async [requisicoes] [conexoes]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time as relogio
+from datetime import date, time
+from uuid import UUID
+
+import httpx
+from fastapi import Depends, FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# O banco é lido de Settings na importação de 'agendia': precisa ser definido antes.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='agendia-carga-'), 'agendia.db')}"
+
+from main import app, get_profissional_repositorio
+from agendia.application.ports import IProfissionalRepositorio
+from agendia.application.use_cases import ConsultarDisponibilidadeUseCase, ConsultaDisponibilidadeInput
+from agendia.core.domain import Profissional, Servico
+from agendia.infrastructure.database import SessionLocal, engine
+from agendia.infrastructure.migracoes import migrar
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+PROFISSIONAIS = 20
+DIA = date(2025, 6, 9)
+
+app_sincrono = FastAPI()
+
+@app_sincrono.get("/profissionais/{profissional_id}/disponibilidade")
+def consultar_disponibilidade_sincrono(
+    profissional_id: UUID, servico: str, de: date, ate: date,
+    repo: IProfissionalRepositorio = Depends(get_profissional_repositorio),
+):
+    return ConsultarDisponibilidadeUseCase(repositorio=repo).executar(ConsultaDisponibilidadeInput(
+        profissional_id=profissional_id, nome_servico=servico, data_inicio=de, data_fim=ate
+    ))
+
+
+def preparar_dados() -> list[UUID]:
+    with engine.begin() as conexao:  # O transporte ASGI não roda o lifespan, que migraria o banco
+        migrar(conexao)
+    session = SessionLocal()
+    try:
+        repositorio = SQLiteProfissionalRepositorio(session)
+        ids = []
+        for i in range(PROFISSIONAIS):
+            profissional = Profissional(
+                nome=f"Profissional {i}", telefone_whatsapp=f"+55839{i:08d}",
+                servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+                horario_trabalho={dia: (time(9, 0), time(18, 0)) for dia in range(6)},
+            )
+            repositorio.salvar(profissional)
+            ids.append(profissional.id)
+        return ids
+    finally:
+        session.close()
+
+
+def percentil(valores: list[float], p: float) -> float:
+    return sorted(valores)[min(len(valores) - 1, int(len(valores) * p))]
+
+
+async def medir(aplicacao: FastAPI, ids: list[UUID], requisicoes: int, conexoes: int) -> tuple[float, list[float]]:
+    transporte = httpx.ASGITransport(app=aplicacao)
+    limites = httpx.Limits(max_connections=conexoes)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://agendia", limits=limites) as cliente:
+        semaforo = asyncio.Semaphore(conexoes)
+
+        async def requisicao(i: int) -> float:
+            async with semaforo:
+                comeco = relogio.perf_counter()
+                resposta = await cliente.get(
+                    f"/profissionais/{ids[i % len(ids)]}/disponibilidade",
+                    params={"servico": "Corte", "de": DIA.isoformat(), "ate": DIA.isoformat()},
+                )
+                resposta.raise_for_status()
+                return relogio.perf_counter() - comeco
+
+        comeco = relogio.perf_counter()
+        latencias = await asyncio.gather(*(requisicao(i) for i in range(requisicoes)))
+        return relogio.perf_counter() - comeco, latencias
+
+
+async def main(requisicoes: int, conexoes: int):
+    ids = preparar_dados()
+    print(f"{requisicoes} requisições, {conexoes} conexões simultâneas")
+    for nome, aplicacao in (("síncrono", app_sincrono), ("async", app)):
+        await medir(aplicacao, ids, min(requisicoes, 200), conexoes)  # aquecimento
+        duracao, latencias = await medir(aplicacao, ids, requisicoes, conexoes)
+        print(f"{nome:9s}: {requisicoes / duracao:7.0f} req/s  "
+              f"p50={statistics.median(latencias) * 1000:7.1f} ms  p99={percentil(latencias, 0.99) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1_000,
+    ))
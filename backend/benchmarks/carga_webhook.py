@@ -0,0 +1,98 @@
+"""
+Teste de carga do webhook POST /webhook/whatsapp.
+
+Simula centenas de conversas simultâneas contra a aplicação em processo
+(httpx + ASGI, sem rede) e, durante a rajada, mede a latência de GET /
+para mostrar que o event loop não fica bloqueado pelo trabalho do webhook.
+
+O banco é criado em um diretório temporário, para não tocar no agendia.db.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.carga_webhook [conversas]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time as relogio
+from datetime import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# O banco é lido de Settings na importação de 'agendia': precisa ser definido antes.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='agendia-carga-'), 'agendia.db')}"
+
+from main import app
+from agendia.core.domain import Profissional, Servico
+from agendia.infrastructure.database import SessionLocal, engine
+from agendia.infrastructure.migracoes import migrar
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+PROFISSIONAIS = 20
+
+
+def preparar_dados() -> list[str]:
+    with engine.begin() as conexao:  # O transporte ASGI não roda o lifespan, que migraria o banco
+        migrar(conexao)
+    session = SessionLocal()
+    try:
+        repositorio = SQLiteProfissionalRepositorio(session)
+        telefones = []
+        for i in range(PROFISSIONAIS):
+            telefone = f"+55839{i:08d}"
+            repositorio.salvar(Profissional(
+                nome=f"Profissional {i}", telefone_whatsapp=telefone,
+                servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+                horario_trabalho={dia: (time(9, 0), time(18, 0)) for dia in range(6)},
+            ))
+            telefones.append(telefone)
+        return telefones
+    finally:
+        session.close()
+
+
+def percentil(valores: list[float], p: float) -> float:
+    return sorted(valores)[min(len(valores) - 1, int(len(valores) * p))]
+
+
+async def main(conversas: int):
+    telefones = preparar_dados()
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://agendia") as cliente:
+        async def conversa(i: int) -> float:
+            comeco = relogio.perf_counter()
+            resposta = await cliente.post("/webhook/whatsapp", json={
+                "sender": f"55839{i:08d}@c.us",
+                "recipient": telefones[i % len(telefones)].lstrip("+") + "@c.us",
+                "text": "1" if i % 2 else "Oi",
+            })
+            resposta.raise_for_status()
+            return relogio.perf_counter() - comeco
+
+        async def sonda_event_loop(parar: asyncio.Event, latencias: list[float]):
+            while not parar.is_set():
+                comeco = relogio.perf_counter()
+                (await cliente.get("/")).raise_for_status()
+                latencias.append(relogio.perf_counter() - comeco)
+                await asyncio.sleep(0.01)
+
+        parar, latencias_sonda = asyncio.Event(), []
+        sonda = asyncio.create_task(sonda_event_loop(parar, latencias_sonda))
+        comeco = relogio.perf_counter()
+        latencias = await asyncio.gather(*(conversa(i) for i in range(conversas)))
+        duracao = relogio.perf_counter() - comeco
+        parar.set()
+        await sonda
+
+    print(f"conversas simultâneas : {conversas}")
+    print(f"tempo total           : {duracao:.2f} s ({conversas / duracao:.0f} req/s)")
+    print(f"latência webhook      : p50={statistics.median(latencias) * 1000:.1f} ms "
+          f"p95={percentil(latencias, 0.95) * 1000:.1f} ms p99={percentil(latencias, 0.99) * 1000:.1f} ms")
+    print(f"latência GET / (sonda): p50={statistics.median(latencias_sonda) * 1000:.1f} ms "
+          f"máx={max(latencias_sonda) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,487 @@
+"""
+Suíte de benchmarks dos caminhos quentes: agendar, consultar agenda, carregar e
+gravar agregados, listar profissionais e as rotas da API.
+
+Gera um cadastro sintético de N profissionais × M agendamentos (histórico
+concluído/cancelado e agenda futura confirmada, com semente fixa) em um banco
+SQLite novo, num diretório temporário, e mede cada operação:
+- latência (média, mediana, p95, mínimo e máximo, em ms);
+- comandos SQL emitidos por operação. Não depende da máquina, então
+  regressões como um N+1 aparecem mesmo entre execuções em máquinas diferentes.
+
+A API roda em processo (TestClient, com o lifespan), com um IWhatsAppAdapter
+que só conta as mensagens: nada sai para o serviço real.
+
+Os resultados podem ser gravados em JSON (--saida) e comparados com os de
+outro commit (--comparar). A comparação marca como regressão a mediana acima
+da tolerância ou qualquer aumento no número de comandos SQL, e termina com
+código de saída 1.
+
+Uso (a partir da pasta 'backend/'):
+    python -m benchmarks.suite [-n 50] [-m 1000] [-r 50] [-k filtro] [--saida base.json]
+    python -m benchmarks.suite --comparar base.json [--tolerancia 0.1]
+    python -m benchmarks.suite --atual novo.json --comparar base.json   # só compara, sem medir
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time as relogio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from uuid import UUID
+
+# O banco e as configurações são lidos na importação de 'agendia': precisam ser definidos antes.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='agendia-suite-'), 'agendia.db')}"
+# O despachante da API só varre a fila no início; o envio é medido à parte, em 'notificacoes.processar_pendentes'.
+os.environ["NOTIFICACOES_INTERVALO_SEGUNDOS"] = "3600"
+os.environ["LEMBRETES_INTERVALO_SEGUNDOS"] = "3600"  # Idem para o agendador de lembretes
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+from agendia.application.ports import IWhatsAppAdapter
+from agendia.application.use_cases import (
+    AgendamentoInput, ConsultaAgendaInput, ConsultaDisponibilidadeInput, ConsultarAgendaUseCase,
+    ConsultarDisponibilidadeUseCase, ImportarCadastroUseCase, RealizarAgendamentoUseCase,
+)
+from agendia.core.domain import Agendamento, AgendamentoStatus, Servico
+from agendia.infrastructure.database import SessionLocal, async_engine, engine
+from agendia.infrastructure.importacao import SQLiteImportadorCadastro
+from agendia.infrastructure.migracoes import migrar
+from agendia.infrastructure.notificacoes import DespachanteNotificacoes, SQLiteFilaNotificacoes
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+# Segunda-feira: o histórico termina uma semana depois dela; os agendamentos novos ficam bem adiante.
+REFERENCIA = datetime(2025, 6, 2)
+SERVICOS = (Servico(nome="Corte", duracao_minutos=30), Servico(nome="Escova", duracao_minutos=60))
+HORARIOS_POR_DIA = 20  # 08:00-18:00, de 30 em 30 minutos
+AQUECIMENTO = 3
+
+
+# --- Dados sintéticos ---
+
+@dataclass
+class Cenario:
+    """Cadastro gerado e o que os benchmarks precisam dele."""
+    profissionais: int
+    agendamentos: int
+    ids: list[UUID]
+    telefones: list[str]
+    cliente: TestClient
+    whatsapp: "WhatsAppNulo"
+    aleatorio: random.Random = field(default_factory=lambda: random.Random(0))
+
+    def profissional(self, i: int) -> tuple[UUID, str]:
+        return self.ids[i % len(self.ids)], self.telefones[i % len(self.telefones)]
+
+    def horario_livre(self, i: int, deslocamento_dias: int) -> tuple[UUID, datetime]:
+        """O i-ésimo horário ainda livre, a partir de 'deslocamento_dias' após o histórico, em rodízio entre profissionais."""
+        rodada, indice = divmod(i, len(self.ids))
+        dia, horario = divmod(rodada, HORARIOS_POR_DIA)
+        inicio = REFERENCIA + timedelta(days=deslocamento_dias + dia, hours=8, minutes=30 * horario)
+        return self.ids[indice], inicio
+
+
+def linhas_cadastro(profissionais: int, agendamentos: int, semente: int):
+    """NDJSON de importação: cada profissional com os serviços e 'agendamentos' horários até uma semana após REFERENCIA."""
+    aleatorio = random.Random(semente)
+    fim_historico = REFERENCIA + timedelta(days=7)
+    for p in range(profissionais):
+        telefone = f"+55839{p:08d}"
+        yield json.dumps({
+            "tipo": "profissional", "telefone_whatsapp": telefone, "nome": f"Profissional {p}",
+            "horario_trabalho": {str(dia): ["08:00", "18:00"] for dia in range(7)},
+        })
+        for servico in SERVICOS:
+            yield json.dumps({
+                "tipo": "servico", "telefone_whatsapp": telefone,
+                "servico": servico.nome, "duracao_minutos": servico.duracao_minutos,
+            })
+        for a in range(agendamentos):
+            dia, horario = divmod(a, HORARIOS_POR_DIA)
+            inicio = fim_historico - timedelta(days=dia + 1) + timedelta(hours=8, minutes=30 * horario)
+            if inicio >= REFERENCIA:
+                status = AgendamentoStatus.CONFIRMADO
+            else:
+                status = AgendamentoStatus.CANCELADO if aleatorio.random() < 0.1 else AgendamentoStatus.CONCLUIDO
+            yield json.dumps({
+                "tipo": "agendamento", "telefone_whatsapp": telefone, "servico": SERVICOS[0].nome,
+                "data_hora_inicio": inicio.isoformat(), "cliente_contato": f"+55119{aleatorio.randrange(10**8):08d}",
+                "status": status.value,
+            })
+
+
+def gerar_cadastro(profissionais: int, agendamentos: int, semente: int) -> tuple[list[UUID], list[str]]:
+    with engine.begin() as conexao:  # A API só migra o banco no lifespan, que ainda não rodou
+        migrar(conexao)
+    with SessionLocal() as session:
+        resultado = ImportarCadastroUseCase(SQLiteImportadorCadastro(session)).executar(
+            linhas_cadastro(profissionais, agendamentos, semente)
+        )
+        if resultado.linhas_com_erro:
+            raise RuntimeError(f"Cadastro sintético com erros: {resultado.erros[:3]}")
+        telefones = [f"+55839{p:08d}" for p in range(profissionais)]
+        repositorio = SQLiteProfissionalRepositorio(session)
+        ids = [repositorio.buscar_por_telefone(t, janela=(REFERENCIA, REFERENCIA)).id for t in telefones]
+    return ids, telefones
+
+
+class WhatsAppNulo(IWhatsAppAdapter):
+    """Adaptador que aceita e conta as mensagens, sem enviá-las."""
+
+    def __init__(self):
+        self.enviadas = 0
+        self._lock = threading.Lock()
+
+    def enviar_texto(self, numero_destino: str, texto: str) -> None:
+        with self._lock:
+            self.enviadas += 1
+
+
+# --- Medição ---
+
+class ContadorSQL:
+    """Conta os comandos enviados ao banco pelos engines síncrono e assíncrono."""
+
+    def __init__(self, *engines):
+        self.total = 0
+        for engine_ in engines:
+            event.listen(engine_, "before_cursor_execute", self._contar)
+
+    def _contar(self, *args) -> None:
+        self.total += 1
+
+
+@dataclass
+class Operacao:
+    """'executar' é medido; 'preparar' (fora da medição) produz o argumento de cada execução."""
+    executar: Callable[[object], object]
+    preparar: Callable[[int], object] = lambda i: i
+
+
+@dataclass
+class Benchmark:
+    nome: str
+    fabrica: Callable[[Cenario], Operacao]
+    peso: int = 1  # Operações pesadas rodam 'repeticoes // peso' vezes (no mínimo 3)
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(nome: str, peso: int = 1):
+    def registrar(fabrica: Callable[[Cenario], Operacao]) -> Callable[[Cenario], Operacao]:
+        BENCHMARKS.append(Benchmark(nome, fabrica, peso))
+        return fabrica
+    return registrar
+
+
+def medir(bench: Benchmark, cenario: Cenario, repeticoes: int, contador: ContadorSQL) -> dict[str, float]:
+    operacao = bench.fabrica(cenario)
+    repeticoes = max(3, repeticoes // bench.peso)
+    aquecimento = AQUECIMENTO if bench.peso == 1 else 1
+    latencias, consultas = [], 0
+    for i in range(aquecimento + repeticoes):
+        argumento = operacao.preparar(i)
+        antes = contador.total
+        comeco = relogio.perf_counter()
+        operacao.executar(argumento)
+        duracao = relogio.perf_counter() - comeco
+        if i >= aquecimento:
+            latencias.append(duracao * 1_000)
+            consultas += contador.total - antes
+    latencias.sort()
+    return {
+        "repeticoes": repeticoes,
+        "media_ms": round(statistics.fmean(latencias), 4),
+        "mediana_ms": round(statistics.median(latencias), 4),
+        "p95_ms": round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))], 4),
+        "min_ms": round(latencias[0], 4),
+        "max_ms": round(latencias[-1], 4),
+        "consultas_sql": round(consultas / repeticoes, 2),
+    }
+
+
+# --- Benchmarks ---
+
+@benchmark("dominio.esta_disponivel")
+def _esta_disponivel(cenario: Cenario) -> Operacao:
+    with SessionLocal() as session:
+        profissional = SQLiteProfissionalRepositorio(session).buscar_por_id(cenario.ids[0])
+    minutos = cenario.agendamentos // HORARIOS_POR_DIA * 24 * 60
+    return Operacao(
+        preparar=lambda i: REFERENCIA + timedelta(minutes=cenario.aleatorio.randrange(-minutos, 7 * 24 * 60)),
+        executar=lambda horario: profissional.esta_disponivel(horario, 30),
+    )
+
+
+@benchmark("repositorio.buscar_por_id")
+def _buscar_completo(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        with SessionLocal() as session:
+            return SQLiteProfissionalRepositorio(session).buscar_por_id(cenario.profissional(i)[0])
+    return Operacao(executar)
+
+
+@benchmark("repositorio.buscar_por_id_janela")
+def _buscar_janela(cenario: Cenario) -> Operacao:
+    janela = (REFERENCIA, REFERENCIA + timedelta(days=1))
+
+    def executar(i: int):
+        with SessionLocal() as session:
+            return SQLiteProfissionalRepositorio(session).buscar_por_id(cenario.profissional(i)[0], janela=janela)
+    return Operacao(executar)
+
+
+@benchmark("repositorio.salvar")
+def _salvar(cenario: Cenario) -> Operacao:
+    def preparar(i: int):
+        id_profissional, inicio = cenario.horario_livre(i, deslocamento_dias=100)
+        session = SessionLocal()
+        repositorio = SQLiteProfissionalRepositorio(session)
+        profissional = repositorio.buscar_por_id(id_profissional, janela=(inicio, inicio + timedelta(days=1)))
+        profissional.adicionar_novo_agendamento(
+            Agendamento(servico=SERVICOS[0], data_hora_inicio=inicio, cliente_contato="+5511900000000")
+        )
+        return session, repositorio, profissional
+
+    def executar(argumento):
+        session, repositorio, profissional = argumento
+        try:
+            repositorio.salvar(profissional)
+        finally:
+            session.close()
+    return Operacao(executar, preparar)
+
+
+@benchmark("repositorio.listar_todos", peso=10)
+def _listar_todos(cenario: Cenario) -> Operacao:
+    def executar(_):
+        with SessionLocal() as session:
+            return SQLiteProfissionalRepositorio(session).listar_todos()
+    return Operacao(executar)
+
+
+@benchmark("repositorio.listar_resumos")
+def _listar_resumos(cenario: Cenario) -> Operacao:
+    def executar(_):
+        with SessionLocal() as session:
+            return SQLiteProfissionalRepositorio(session).listar_resumos(limit=100)
+    return Operacao(executar)
+
+
+@benchmark("repositorio.listar_por_servico")
+def _listar_por_servico(cenario: Cenario) -> Operacao:
+    janela = (REFERENCIA, REFERENCIA + timedelta(days=1))
+
+    def executar(_):
+        with SessionLocal() as session:
+            return SQLiteProfissionalRepositorio(session).listar_por_servico(SERVICOS[0].nome, janela)
+    return Operacao(executar)
+
+
+@benchmark("casos_de_uso.realizar_agendamento")
+def _realizar_agendamento(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        id_profissional, inicio = cenario.horario_livre(i, deslocamento_dias=200)
+        with SessionLocal() as session:
+            RealizarAgendamentoUseCase(SQLiteProfissionalRepositorio(session), SQLiteFilaNotificacoes(session)).executar(
+                AgendamentoInput(profissional_id=id_profissional, cliente_contato="+5511900000001",
+                                 nome_servico=SERVICOS[0].nome, data_hora_inicio=inicio)
+            )
+    return Operacao(executar)
+
+
+@benchmark("casos_de_uso.consultar_agenda")
+def _consultar_agenda(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        with SessionLocal() as session:
+            return ConsultarAgendaUseCase(SQLiteProfissionalRepositorio(session)).executar(
+                ConsultaAgendaInput(profissional_id=cenario.profissional(i)[0], data=REFERENCIA.date())
+            )
+    return Operacao(executar)
+
+
+@benchmark("casos_de_uso.consultar_disponibilidade")
+def _consultar_disponibilidade(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        with SessionLocal() as session:
+            return ConsultarDisponibilidadeUseCase(SQLiteProfissionalRepositorio(session)).executar(
+                ConsultaDisponibilidadeInput(
+                    profissional_id=cenario.profissional(i)[0], nome_servico=SERVICOS[0].nome,
+                    data_inicio=REFERENCIA.date(), data_fim=REFERENCIA.date() + timedelta(days=6),
+                )
+            )
+    return Operacao(executar)
+
+
+def _get(cenario: Cenario, url: str, **params):
+    resposta = cenario.cliente.get(url, params=params)
+    resposta.raise_for_status()
+    return resposta
+
+
+@benchmark("api.listar_profissionais")
+def _api_listar(cenario: Cenario) -> Operacao:
+    return Operacao(lambda _: _get(cenario, "/profissionais/", limit=100))
+
+
+@benchmark("api.disponibilidade")
+def _api_disponibilidade(cenario: Cenario) -> Operacao:
+    dia = REFERENCIA.date().isoformat()
+    return Operacao(lambda i: _get(
+        cenario, f"/profissionais/{cenario.profissional(i)[0]}/disponibilidade", servico=SERVICOS[0].nome, de=dia, ate=dia
+    ))
+
+
+@benchmark("api.agenda_semana")
+def _api_agenda(cenario: Cenario) -> Operacao:
+    de, ate = REFERENCIA.date(), REFERENCIA.date() + timedelta(days=6)
+    return Operacao(lambda i: _get(
+        cenario, f"/profissionais/{cenario.profissional(i)[0]}/agenda", de=de.isoformat(), ate=ate.isoformat()
+    ))
+
+
+@benchmark("api.criar_agendamento")
+def _api_criar_agendamento(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        id_profissional, inicio = cenario.horario_livre(i, deslocamento_dias=300)
+        resposta = cenario.cliente.post("/agendamentos/", json={
+            "profissional_id": str(id_profissional), "cliente_contato": "+5511900000002",
+            "nome_servico": SERVICOS[0].nome, "data_hora_inicio": inicio.isoformat(),
+        })
+        resposta.raise_for_status()
+    return Operacao(executar)
+
+
+@benchmark("api.webhook_whatsapp")
+def _api_webhook(cenario: Cenario) -> Operacao:
+    def executar(i: int):
+        telefone = cenario.profissional(i)[1]
+        resposta = cenario.cliente.post("/webhook/whatsapp", json={
+            "sender": f"55119{i:08d}@c.us", "recipient": f"{telefone.lstrip('+')}@c.us", "text": SERVICOS[0].nome,
+        })
+        resposta.raise_for_status()
+    return Operacao(executar)
+
+
+@benchmark("notificacoes.processar_pendentes")
+def _processar_pendentes(cenario: Cenario) -> Operacao:
+    despachante = DespachanteNotificacoes(session_factory=SessionLocal, whatsapp_adapter=cenario.whatsapp)
+
+    def preparar(i: int):
+        with SessionLocal() as session:
+            fila = SQLiteFilaNotificacoes(session)
+            for m in range(despachante.tamanho_lote):
+                fila.enfileirar(cenario.profissional(i + m)[1], "Lembrete do seu agendamento.")
+            session.commit()
+
+    return Operacao(lambda _: despachante.processar_pendentes(), preparar)
+
+
+# --- Execução e comparação ---
+
+def metadados(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {
+            "profissionais": args.profissionais, "agendamentos": args.agendamentos,
+            "repeticoes": args.repeticoes, "semente": args.semente,
+        },
+    }
+
+
+def executar_suite(args: argparse.Namespace) -> dict:
+    selecionados = [b for b in BENCHMARKS if not args.filtro or args.filtro in b.nome]
+    comeco = relogio.perf_counter()
+    ids, telefones = gerar_cadastro(args.profissionais, args.agendamentos, args.semente)
+    print(f"Cadastro: {args.profissionais} profissionais × {args.agendamentos} agendamentos "
+          f"em {relogio.perf_counter() - comeco:.1f} s")
+
+    whatsapp = WhatsAppNulo()
+    main.get_whatsapp_adapter = lambda: whatsapp  # O lifespan da API usa o adaptador nulo
+    contador = ContadorSQL(engine, async_engine.sync_engine)
+    resultados = {}
+    with TestClient(main.app) as cliente:
+        cenario = Cenario(args.profissionais, args.agendamentos, ids, telefones, cliente, whatsapp,
+                          aleatorio=random.Random(args.semente))
+        print(f"{'benchmark':<40} | {'mediana (ms)':>12} | {'p95 (ms)':>9} | {'SQL/op':>6}")
+        for bench in selecionados:
+            resultado = medir(bench, cenario, args.repeticoes, contador)
+            resultados[bench.nome] = resultado
+            print(f"{bench.nome:<40} | {resultado['mediana_ms']:>12.3f} | {resultado['p95_ms']:>9.3f} | "
+                  f"{resultado['consultas_sql']:>6.1f}")
+    return {"meta": metadados(args), "resultados": resultados}
+
+
+def comparar(base: dict, atual: dict, tolerancia: float) -> list[str]:
+    """Imprime a comparação e retorna os nomes dos benchmarks que regrediram."""
+    print(f"\nBase: {base['meta'].get('commit')}  Atual: {atual['meta'].get('commit')}")
+    print(f"{'benchmark':<40} | {'base (ms)':>10} | {'atual (ms)':>10} | {'variação':>9} | {'SQL/op':>11}")
+    regressoes = []
+    for nome, resultado in atual["resultados"].items():
+        anterior = base["resultados"].get(nome)
+        if anterior is None:
+            print(f"{nome:<40} | {'—':>10} | {resultado['mediana_ms']:>10.3f} | {'novo':>9} |")
+            continue
+        variacao = resultado["mediana_ms"] / anterior["mediana_ms"] - 1 if anterior["mediana_ms"] else 0.0
+        mais_sql = resultado["consultas_sql"] > anterior["consultas_sql"]
+        regrediu = variacao > tolerancia or mais_sql
+        if regrediu:
+            regressoes.append(nome)
+        print(f"{nome:<40} | {anterior['mediana_ms']:>10.3f} | {resultado['mediana_ms']:>10.3f} | "
+              f"{variacao:>+9.1%} | {anterior['consultas_sql']:>4.1f} → {resultado['consultas_sql']:<4.1f}"
+              f"{'  REGRESSÃO' if regrediu else ''}")
+    return regressoes
+
+
+def main_cli(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do AgendIA.")
+    parser.add_argument("-n", "--profissionais", type=int, default=50)
+    parser.add_argument("-m", "--agendamentos", type=int, default=1000, help="Agendamentos por profissional.")
+    parser.add_argument("-r", "--repeticoes", type=int, default=50)
+    parser.add_argument("-k", "--filtro", help="Roda só os benchmarks cujo nome contém o texto.")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument("--comparar", metavar="BASE", help="JSON de outra execução para comparar.")
+    parser.add_argument("--atual", help="Em vez de medir, compara este JSON com o de --comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Aumento relativo da mediana tolerado antes de acusar regressão (padrão: 0.10).")
+    args = parser.parse_args(argv)
+
+    if args.atual:
+        with open(args.atual, encoding="utf-8") as arquivo:
+            atual = json.load(arquivo)
+    else:
+        atual = executar_suite(args)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        if comparar(base, atual, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
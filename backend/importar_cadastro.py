@@ -0,0 +1,49 @@
+"""
+Importa profissionais, serviços e agendamentos históricos de um arquivo NDJSON ou CSV.
+
+O arquivo tem uma linha por registro, com as colunas descritas em
+'LinhaImportacao' (agendia/application/use_cases.py). Exemplo de NDJSON:
+
+    {"tipo": "profissional", "telefone_whatsapp": "+5583999990000", "nome": "Ana", "horario_trabalho": {"0": ["09:00", "18:00"]}}
+    {"tipo": "servico", "telefone_whatsapp": "+5583999990000", "servico": "Corte", "duracao_minutos": 30}
+    {"tipo": "agendamento", "telefone_whatsapp": "+5583999990000", "servico": "Corte", "data_hora_inicio": "2024-03-01T10:00:00", "cliente_contato": "+5583988887777", "status": "Concluído"}
+
+Uso (a partir da pasta 'backend/'):
+    python importar_cadastro.py arquivo.ndjson [--formato ndjson|csv] [--atualizar] [--tamanho-lote 5000]
+"""
+import argparse
+import os
+import time
+
+from agendia.application.use_cases import ImportarCadastroUseCase, FORMATOS_IMPORTACAO
+from agendia.infrastructure.database import SessionLocal, engine
+from agendia.infrastructure.importacao import SQLiteImportadorCadastro
+from agendia.infrastructure.migracoes import migrar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em massa de cadastros do AgendIA.")
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=FORMATOS_IMPORTACAO,
+                        help="Padrão: deduzido da extensão do arquivo ('.csv' → csv; demais → ndjson).")
+    parser.add_argument("--atualizar", action="store_true",
+                        help="Atualiza nome e horário de trabalho de profissionais já cadastrados.")
+    parser.add_argument("--tamanho-lote", type=int, default=ImportarCadastroUseCase.TAMANHO_LOTE)
+    args = parser.parse_args()
+    formato = args.formato or ("csv" if os.path.splitext(args.arquivo)[1].lower() == ".csv" else "ndjson")
+
+    with engine.begin() as conexao:
+        migrar(conexao)
+    comeco = time.perf_counter()
+    with SessionLocal() as session, open(args.arquivo, encoding="utf-8-sig", newline="") as arquivo:
+        use_case = ImportarCadastroUseCase(SQLiteImportadorCadastro(session), tamanho_lote=args.tamanho_lote)
+        resultado = use_case.executar(arquivo, formato=formato, atualizar_existentes=args.atualizar)
+
+    print(resultado.model_dump_json(indent=2, exclude={"erros"}))
+    for erro in resultado.erros:
+        print(f"linha {erro.linha}: {erro.mensagem}")
+    print(f"Concluído em {time.perf_counter() - comeco:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
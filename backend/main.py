@@ -1,20 +1,45 @@
-import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status
+import io
+import tempfile
+from email.utils import format_datetime, parsedate_to_datetime
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from anyio import CapacityLimiter, to_thread
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List # <-- IMPORTAR List
 
 # ... (outros imports inalterados) ...
 from agendia.config import settings
-from agendia.infrastructure.database import SessionLocal, Base, engine
-from agendia.infrastructure.whatsapp_adapter import PyWhatKitAdapter
-from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
-from agendia.application.ports import IProfissionalRepositorio, IWhatsAppAdapter
+from agendia.core.domain import Agendamento, AgendamentoStatus
+from agendia.infrastructure.database import SessionLocal, AsyncSessionLocal, async_engine
+from agendia.infrastructure.migracoes import migrar
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio, AsyncProfissionalRepositorio
+from agendia.infrastructure.cache import CacheProfissionais, CacheProfissionalRepositorio
+from agendia.infrastructure.whatsapp import WhatsAppSobDemanda, criar_whatsapp_adapter
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes, DespachanteNotificacoes
+from agendia.infrastructure.lembretes import AgendadorLembretes
+from agendia.infrastructure.arquivamento import ArquivadorAgendamentos
+from agendia.infrastructure.conversas import MemoriaArmazemConversas
+from agendia.infrastructure.importacao import SQLiteImportadorCadastro
+from agendia.infrastructure.metricas import MiddlewareMetricas, RepositorioMedido, registro
+from agendia.application.ports import (IProfissionalRepositorio, IProfissionalRepositorioAsync, IWhatsAppAdapter,
+                                      IFilaNotificacoes, IArmazemConversas, IImportadorCadastro,
+                                      ConflitoConcorrenciaError)
 from agendia.application.use_cases import (
-    RealizarAgendamentoUseCase, AgendamentoInput, ProfissionalNaoEncontradoError
+    RealizarAgendamentoAsyncUseCase, AgendamentoInput, ProfissionalNaoEncontradoError,
+    ConsultarDisponibilidadeAsyncUseCase, ConsultaDisponibilidadeInput, ServicoNaoEncontradoError,
+    BuscarProfissionaisDisponiveisAsyncUseCase, BuscaProfissionaisDisponiveisInput, ProfissionalDisponivel,
+    ResponderMensagemUseCase, MensagemRecebidaInput,
+    ImportarCadastroUseCase, ResultadoImportacao, FORMATOS_IMPORTACAO,
+    ExportarAgendaAsyncUseCase, ExportacaoAgendaInput, FORMATOS_EXPORTACAO,
+    ConsultarAgendaPeriodoAsyncUseCase, ConsultaAgendaPeriodoInput
 )
 from pydantic import BaseModel
 from typing import Optional
+from datetime import date, datetime, timezone
 
 class ProfissionalCreate(BaseModel):
     nome: str
@@ -27,9 +52,86 @@ class ProfissionalPublic(BaseModel):
     class Config:
         from_attributes = True
 
+class RespostaWebhook(BaseModel):
+    reply: str
+
+class DisponibilidadePublic(BaseModel):
+    profissional_id: UUID
+    servico: str
+    horarios: List[datetime]
+
 # ... (código de setup inalterado) ...
-Base.metadata.create_all(bind=engine)
-app = FastAPI(title="AgendIA API", version="0.1.0")
+# Importar este módulo não toca no banco nem abre conexões: as tabelas são criadas no 'lifespan'.
+
+# Threads reservadas ao webhook: uma rajada de mensagens não ocupa o pool usado pelas demais rotas.
+limitador_webhook = CapacityLimiter(settings.webhook_max_concorrencia)
+cache_profissionais = CacheProfissionais(
+    max_itens=settings.cache_profissionais_max, ttl_segundos=settings.cache_profissionais_ttl_segundos
+)
+armazem_conversas = MemoriaArmazemConversas(
+    max_conversas=settings.conversas_max, ttl_segundos=settings.conversas_ttl_segundos
+)
+
+# Estatísticas mantidas pelo cache e pelo armazém de conversas, lidas a cada coleta do /metrics.
+registro.coletada(
+    "agendia_cache_profissionais_eventos_total", "Eventos do cache de profissionais, por tipo.",
+    lambda: {(tipo,): valor for tipo, valor in cache_profissionais.estatisticas().items() if tipo not in ("itens", "taxa_acerto")},
+    tipo="counter", rotulos=("evento",),
+)
+registro.coletada(
+    "agendia_cache_profissionais_itens", "Profissionais guardados no cache.",
+    lambda: {(): cache_profissionais.estatisticas()["itens"]},
+)
+registro.coletada(
+    "agendia_conversas_ativas", "Conversas do chatbot em memória.",
+    lambda: {(): armazem_conversas.estatisticas()["conversas"]},
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.database_migrar:
+        async with async_engine.begin() as conexao:
+            await conexao.run_sync(migrar)
+    # O adaptador de WhatsApp só é criado no primeiro envio.
+    whatsapp = WhatsAppSobDemanda(lambda: get_whatsapp_adapter())  # Resolvida na hora: pode ser substituída (ex.: benchmarks)
+    # O despachante esvazia a fila de notificações em segundo plano.
+    despachante = DespachanteNotificacoes(
+        session_factory=SessionLocal,
+        whatsapp_adapter=whatsapp,
+        tamanho_lote=settings.notificacoes_tamanho_lote,
+        max_tentativas=settings.notificacoes_max_tentativas,
+        backoff_base_segundos=settings.notificacoes_backoff_base_segundos,
+        backoff_maximo_segundos=settings.notificacoes_backoff_maximo_segundos,
+        workers=settings.notificacoes_workers,
+        intervalo_segundos=settings.notificacoes_intervalo_segundos,
+    )
+    # Os lembretes (24h/2h antes do horário) entram na mesma fila e saem pelo despachante.
+    agendador_lembretes = AgendadorLembretes(
+        session_factory=SessionLocal,
+        antecedencias_horas=settings.lembretes_antecedencias_horas,
+        intervalo_segundos=settings.lembretes_intervalo_segundos,
+    )
+    # Os agendamentos encerrados e antigos saem da tabela operacional, em lotes.
+    arquivador = ArquivadorAgendamentos(
+        session_factory=SessionLocal,
+        horizonte_dias=settings.arquivamento_horizonte_dias,
+        tamanho_lote=settings.arquivamento_tamanho_lote,
+        intervalo_segundos=settings.arquivamento_intervalo_segundos,
+    )
+    despachante.iniciar()
+    agendador_lembretes.iniciar()
+    arquivador.iniciar()
+    try:
+        yield
+    finally:
+        arquivador.parar()
+        agendador_lembretes.parar()
+        despachante.parar()
+        whatsapp.fechar()
+        await async_engine.dispose()
+
+app = FastAPI(title="AgendIA API", version="0.1.0", lifespan=lifespan)
+app.add_middleware(MiddlewareMetricas)
 def get_db_session():
     # ...
     db = SessionLocal()
@@ -38,59 +140,263 @@ def get_db_session():
     finally:
         db.close()
 def get_profissional_repositorio(db: Session = Depends(get_db_session)) -> IProfissionalRepositorio:
-    return SQLiteProfissionalRepositorio(session=db)
+    return RepositorioMedido(CacheProfissionalRepositorio(SQLiteProfissionalRepositorio(session=db), cache_profissionais))
+# Dependências das rotas 'async': declaradas com 'async def' para não passarem pelo threadpool.
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
+        yield db
+async def get_profissional_repositorio_async(
+    db: AsyncSession = Depends(get_async_db_session)
+) -> IProfissionalRepositorioAsync:
+    return AsyncProfissionalRepositorio(
+        db, repositorio_sincrono=lambda s: RepositorioMedido(
+            CacheProfissionalRepositorio(SQLiteProfissionalRepositorio(s), cache_profissionais)
+        )
+    )
+async def get_fila_notificacoes_async(db: AsyncSession = Depends(get_async_db_session)) -> IFilaNotificacoes:
+    # 'enfileirar' só adiciona a linha à sessão; a gravação acontece no 'salvar' do repositório.
+    return SQLiteFilaNotificacoes(session=db.sync_session)
+@lru_cache
 def get_whatsapp_adapter() -> IWhatsAppAdapter:
-    return PyWhatKitAdapter()
+    # Uma única instância por processo, para reaproveitar o pool de conexões.
+    return criar_whatsapp_adapter(settings)
+def get_fila_notificacoes(db: Session = Depends(get_db_session)) -> IFilaNotificacoes:
+    # Mesma sessão do repositório (o FastAPI reaproveita a dependência na requisição),
+    # para que a mensagem seja gravada na transação do agendamento.
+    return SQLiteFilaNotificacoes(session=db)
+def get_armazem_conversas() -> IArmazemConversas:
+    return armazem_conversas
+def get_importador_cadastro(db: Session = Depends(get_db_session)) -> IImportadorCadastro:
+    return SQLiteImportadorCadastro(session=db)
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Bem-vindo à API do AgendIA!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas do processo no formato de texto do Prometheus."""
+    return Response(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # --- NOVO ENDPOINT ADICIONADO ---
 @app.get("/profissionais/", response_model=List[ProfissionalPublic])
-def listar_todos_os_profissionais(
-    repo: IProfissionalRepositorio = Depends(get_profissional_repositorio)
+async def listar_todos_os_profissionais(
+    after_id: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
 ):
     """
-    Retorna uma lista de todos os profissionais cadastrados no sistema.
+    Retorna os profissionais cadastrados no sistema, ordenados por id.
+    Paginação por chave: passe o último 'id' recebido em 'after_id' para obter a próxima página.
+    Com 'stream=true', todos os profissionais são enviados como NDJSON (um JSON por linha).
     """
-    return repo.listar_todos()
+    if stream:
+        linhas = (resumo.model_dump_json() + "\n" async for resumo in repo.iterar_resumos())
+        return StreamingResponse(linhas, media_type="application/x-ndjson")
+    return await repo.listar_resumos(after_id=after_id, limit=limit)
 
 
 @app.post("/profissionais/", response_model=ProfissionalPublic, status_code=status.HTTP_201_CREATED)
-def criar_profissional(
+async def criar_profissional(
     profissional_in: ProfissionalCreate,
-    repo: IProfissionalRepositorio = Depends(get_profissional_repositorio)
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
 ):
     # ... (código do criar_profissional inalterado) ...
     print(f"Recebida requisição para criar profissional: {profissional_in.nome}")
-    db_profissional = repo.buscar_por_telefone(profissional_in.telefone_whatsapp)
+    db_profissional = await repo.buscar_por_telefone(profissional_in.telefone_whatsapp)
     if db_profissional:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Um profissional com este número de WhatsApp já existe.")
     from agendia.core.domain import Profissional
     novo_profissional = Profissional(**profissional_in.model_dump())
-    repo.salvar(novo_profissional)
+    await repo.salvar(novo_profissional)
     print(f"Profissional '{novo_profissional.nome}' criado com sucesso.")
     return novo_profissional
 
+@app.get("/profissionais/{profissional_id}/disponibilidade", response_model=DisponibilidadePublic)
+async def consultar_disponibilidade(
+    profissional_id: UUID,
+    servico: str,
+    de: date,
+    ate: date,
+    granularidade: int = Query(15, gt=0),
+    limite: Optional[int] = Query(None, gt=0),
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
+):
+    """Lista os horários livres para o serviço entre as datas 'de' e 'ate' (inclusive)."""
+    try:
+        use_case = ConsultarDisponibilidadeAsyncUseCase(repositorio=repo)
+        horarios = await use_case.executar(ConsultaDisponibilidadeInput(
+            profissional_id=profissional_id, nome_servico=servico, data_inicio=de, data_fim=ate,
+            granularidade_minutos=granularidade, limite=limite
+        ))
+    except (ProfissionalNaoEncontradoError, ServicoNaoEncontradoError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return DisponibilidadePublic(profissional_id=profissional_id, servico=servico, horarios=horarios)
+
+@app.get("/profissionais/{profissional_id}/agenda", response_model=List[Agendamento])
+async def consultar_agenda(
+    profissional_id: UUID,
+    de: date,
+    ate: date,
+    status_agendamento: Optional[List[AgendamentoStatus]] = Query(None, alias="status"),
+    historico: bool = False,
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
+):
+    """
+    Lista, em ordem de início, os agendamentos do profissional entre 'de' e
+    'ate' (inclusive). 'status' pode ser repetido (ex.: ?status=Confirmado&status=Concluído);
+    sem ele, todos os status são retornados. Com 'historico=true', inclui os
+    agendamentos antigos já arquivados.
+    """
+    try:
+        return await ConsultarAgendaPeriodoAsyncUseCase(repositorio=repo).executar(ConsultaAgendaPeriodoInput(
+            profissional_id=profissional_id, data_inicio=de, data_fim=ate, status=status_agendamento,
+            incluir_arquivados=historico,
+        ))
+    except ProfissionalNaoEncontradoError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _nao_modificado(request: Request, etag: str, atualizado_em: Optional[datetime]) -> bool:
+    """Avalia If-None-Match e, na ausência dele, If-Modified-Since (RFC 9110, 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in (e.strip() for e in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or atualizado_em is None:
+        return False
+    try:
+        desde = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified tem resolução de segundos.
+    return atualizado_em.replace(microsecond=0, tzinfo=timezone.utc) <= desde
+
+@app.get("/profissionais/{profissional_id}/agenda/exportar")
+async def exportar_agenda(
+    request: Request,
+    profissional_id: UUID,
+    de: date,
+    ate: date,
+    formato: str = Query("ndjson", pattern="^(ndjson|csv|ics)$"),
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
+):
+    """
+    Exporta os agendamentos do profissional entre 'de' e 'ate' (inclusive), incluindo
+    os já arquivados, em NDJSON, CSV ou iCalendar (.ics), enviados à medida que são lidos do banco.
+    Responde 304 se o cliente já tiver a versão atual (If-None-Match com o
+    ETag recebido, ou If-Modified-Since com o Last-Modified).
+    """
+    try:
+        agenda = await ExportarAgendaAsyncUseCase(repositorio=repo).executar(ExportacaoAgendaInput(
+            profissional_id=profissional_id, data_inicio=de, data_fim=ate, formato=formato
+        ))
+    except ProfissionalNaoEncontradoError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A versão muda a cada gravação do profissional (agendamentos incluídos); a URL já distingue período e formato.
+    cabecalhos = {"ETag": f'"{profissional_id}-{agenda.versao}"', "Cache-Control": "private, no-cache"}
+    if agenda.atualizado_em is not None:
+        cabecalhos["Last-Modified"] = format_datetime(agenda.atualizado_em.replace(tzinfo=timezone.utc), usegmt=True)
+    if _nao_modificado(request, cabecalhos["ETag"], agenda.atualizado_em):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    if formato != "ndjson":
+        cabecalhos["Content-Disposition"] = f'attachment; filename="agenda-{profissional_id}.{formato}"'
+    return StreamingResponse(agenda.conteudo, media_type=FORMATOS_EXPORTACAO[formato], headers=cabecalhos)
+
+@app.get("/disponibilidade/", response_model=List[ProfissionalDisponivel])
+async def buscar_profissionais_disponiveis(
+    servico: str,
+    inicio: datetime,
+    fim: Optional[datetime] = None,
+    granularidade: int = Query(15, gt=0),
+    limite: Optional[int] = Query(None, gt=0),
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async)
+):
+    """
+    Lista os profissionais que podem atender o serviço.
+    Sem 'fim', verifica apenas o horário exato 'inicio'; com 'fim', lista os horários livres no período.
+    """
+    try:
+        use_case = BuscarProfissionaisDisponiveisAsyncUseCase(repositorio=repo)
+        return await use_case.executar(BuscaProfissionaisDisponiveisInput(
+            nome_servico=servico, inicio=inicio, fim=fim,
+            granularidade_minutos=granularidade, limite_por_profissional=limite
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/agendamentos/", status_code=status.HTTP_201_CREATED)
-def criar_agendamento(
+async def criar_agendamento(
     input_data: AgendamentoInput,
-    repo: IProfissionalRepositorio = Depends(get_profissional_repositorio),
-    adapter: IWhatsAppAdapter = Depends(get_whatsapp_adapter)
+    repo: IProfissionalRepositorioAsync = Depends(get_profissional_repositorio_async),
+    fila: IFilaNotificacoes = Depends(get_fila_notificacoes_async)
 ):
     # ... (código do criar_agendamento inalterado) ...
     try:
-        use_case = RealizarAgendamentoUseCase(repositorio=repo, whatsapp_adapter=adapter)
-        agendamento_criado = use_case.executar(input_data)
+        use_case = RealizarAgendamentoAsyncUseCase(repositorio=repo, fila_notificacoes=fila)
+        agendamento_criado = await use_case.executar(input_data)
         return {"id": agendamento_criado.id, "cliente_contato": agendamento_criado.cliente_contato, "data_hora_inicio": agendamento_criado.data_hora_inicio.isoformat()}
     except ProfissionalNaoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except ValueError as e:
+    except (ValueError, ConflitoConcorrenciaError) as e:
         raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ocorreu um erro inesperado: {e}")
 
+# Corpo da importação mantido em memória até este tamanho; acima disso, vai para um arquivo temporário.
+IMPORTACAO_MAX_MEMORIA_BYTES = 8 * 1024 * 1024
+
+@app.post("/importacao/", response_model=ResultadoImportacao)
+async def importar_cadastro(
+    request: Request,
+    formato: Optional[str] = Query(None, description="'ndjson' ou 'csv'; sem ele, deduzido do Content-Type."),
+    atualizar: bool = False,
+    importador: IImportadorCadastro = Depends(get_importador_cadastro)
+):
+    """
+    Importa profissionais, serviços e agendamentos históricos em massa.
+    O corpo da requisição é o próprio arquivo (NDJSON ou CSV, uma linha por
+    registro; ver LinhaImportacao). Com 'atualizar=true', profissionais já
+    cadastrados têm nome e horário de trabalho substituídos pelos do arquivo.
+    """
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if formato not in FORMATOS_IMPORTACAO:
+        raise HTTPException(status_code=400, detail=f"Formato '{formato}' não suportado.")
+    use_case = ImportarCadastroUseCase(importador=importador)
+    with tempfile.SpooledTemporaryFile(max_size=IMPORTACAO_MAX_MEMORIA_BYTES) as arquivo:
+        # O corpo é recebido em partes, sem segurar o event loop; a gravação roda em uma thread.
+        async for parte in request.stream():
+            arquivo.write(parte)
+        arquivo.seek(0)
+        linhas = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+        return await to_thread.run_sync(use_case.executar, linhas, formato, atualizar)
+
+@app.post("/webhook/whatsapp", response_model=RespostaWebhook)
+async def webhook_whatsapp(
+    mensagem: MensagemRecebidaInput,
+    repo: IProfissionalRepositorio = Depends(get_profissional_repositorio),
+    fila: IFilaNotificacoes = Depends(get_fila_notificacoes),
+    armazem: IArmazemConversas = Depends(get_armazem_conversas)
+):
+    """
+    Recebe as mensagens encaminhadas pelo whatsapp-adapter e devolve a resposta do chatbot.
+    O chatbot faz várias consultas e cálculos de horários por mensagem: esse
+    trabalho roda em threads dedicadas, fora do event loop, então uma conversa
+    lenta não segura as demais.
+    """
+    use_case = ResponderMensagemUseCase(repositorio=repo, armazem_conversas=armazem, fila_notificacoes=fila)
+    resposta = await to_thread.run_sync(use_case.executar, mensagem, limiter=limitador_webhook)
+    return RespostaWebhook(reply=resposta)
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -6,6 +6,7 @@ from agendia.application.use_cases import RealizarAgendamentoUseCase, Agendament
 from agendia.infrastructure.database import SessionLocal, Base, engine
 from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
 from agendia.infrastructure.whatsapp_adapter import PyWhatKitAdapter
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes, DespachanteNotificacoes
 
 def run_test_scenario():
     """
@@ -22,8 +23,9 @@ def run_test_scenario():
     
     agendamento_use_case = RealizarAgendamentoUseCase(
         repositorio=profissional_repo,
-        whatsapp_adapter=whatsapp_adapter
+        fila_notificacoes=SQLiteFilaNotificacoes(session=db_session)
     )
+    despachante = DespachanteNotificacoes(session_factory=SessionLocal, whatsapp_adapter=whatsapp_adapter)
 
     # --- Preparação dos Dados (Arrange) ---
     print("2. Preparando dados iniciais...")
@@ -74,6 +76,9 @@ def run_test_scenario():
         agendamento_criado = agendamento_use_case.executar(dados_do_agendamento)
         print("SUCESSO: Caso de uso executado.")
         print(f"Agendamento criado com ID: {agendamento_criado.id}")
+
+        print("4.1. Enviando a confirmação que ficou na fila de notificações...")
+        despachante.processar_pendentes()
         
     except Exception as e:
         print(f"ERRO: A execução do caso de uso falhou: {e}")
@@ -3,12 +3,24 @@ from uuid import uuid4
 import pytest
 
 from agendia.core.domain import Profissional, Servico, Agendamento, AgendamentoStatus
-from agendia.application.ports import IProfissionalRepositorio
+from agendia.application.ports import (IProfissionalRepositorio, IFilaNotificacoes, EtapaConversa,
+                                      ConflitoConcorrenciaError)
+from agendia.infrastructure.conversas import MemoriaArmazemConversas
 from agendia.application.use_cases import (
     RealizarAgendamentoUseCase,
     ConsultarAgendaUseCase,
+    ConsultarAgendaPeriodoUseCase,
+    ConsultarDisponibilidadeUseCase,
+    BuscarProfissionaisDisponiveisUseCase,
+    ResponderMensagemUseCase,
+    ExportarAgendaUseCase,
     AgendamentoInput,
     ConsultaAgendaInput,
+    ConsultaAgendaPeriodoInput,
+    ConsultaDisponibilidadeInput,
+    BuscaProfissionaisDisponiveisInput,
+    MensagemRecebidaInput,
+    ExportacaoAgendaInput,
     ProfissionalNaoEncontradoError,
     ServicoNaoEncontradoError,
 )
@@ -28,6 +40,7 @@ def test_realizar_agendamento_com_sucesso(mocker):
     profissional_existente = Profissional(
         id=id_profissional,
         nome="Dr. Teste",
+        telefone_whatsapp="+5583900000001",
         servicos_oferecidos=[servico_corte],
         # --- CORREÇÃO: Adicionado horário de trabalho para o profissional ---
         horario_trabalho={2: (time(9, 0), time(18, 0))}
@@ -44,17 +57,65 @@ def test_realizar_agendamento_com_sucesso(mocker):
     )
 
     # 2. Execução
-    use_case = RealizarAgendamentoUseCase(repositorio=mock_repo)
+    mock_fila = mocker.Mock(spec=IFilaNotificacoes)
+    use_case = RealizarAgendamentoUseCase(repositorio=mock_repo, fila_notificacoes=mock_fila)
     novo_agendamento = use_case.executar(input_data=input_dto)
 
     # 3. Assert (Verificação)
-    mock_repo.buscar_por_id.assert_called_once_with(id_profissional)
+    mock_repo.buscar_por_id.assert_called_once_with(
+        id_profissional, janela=(datetime(2025, 1, 1), datetime(2025, 1, 3)), somente_ocupacao=True
+    )
     mock_repo.salvar.assert_called_once_with(profissional_existente)
     
     assert len(profissional_existente.agendamentos) == 1
     assert profissional_existente.agendamentos[0].cliente_contato == "cliente_feliz"
     assert novo_agendamento is not None
     assert novo_agendamento.status == AgendamentoStatus.CONFIRMADO
+    mock_fila.enfileirar.assert_called_once()
+    assert mock_fila.enfileirar.call_args.kwargs["numero_destino"] == "cliente_feliz"
+
+
+def test_realizar_agendamento_repete_apos_conflito_de_concorrencia(mocker):
+    """Se a agenda mudou entre a leitura e a gravação, o agendamento é refeito sobre dados novos."""
+    servico_corte = Servico(nome="Corte", duracao_minutos=30)
+    def carregar(*args, **kwargs):
+        return Profissional(
+            nome="Dr. Teste", telefone_whatsapp="+5583900000001", servicos_oferecidos=[servico_corte],
+            horario_trabalho={2: (time(9, 0), time(18, 0))},
+        )
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.buscar_por_id.side_effect = carregar
+    mock_repo.salvar.side_effect = [ConflitoConcorrenciaError(), None]
+    mock_fila = mocker.Mock(spec=IFilaNotificacoes)
+
+    use_case = RealizarAgendamentoUseCase(repositorio=mock_repo, fila_notificacoes=mock_fila)
+    use_case.executar(AgendamentoInput(
+        profissional_id=uuid4(), cliente_contato="c", nome_servico="Corte",
+        data_hora_inicio=datetime(2025, 1, 1, 10, 0),
+    ))
+
+    assert mock_repo.buscar_por_id.call_count == 2
+    assert mock_repo.salvar.call_count == 2
+
+
+def test_realizar_agendamento_desiste_apos_max_tentativas(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.buscar_por_id.side_effect = lambda *args, **kwargs: Profissional(
+        nome="Dr. Teste", telefone_whatsapp="+5583900000001",
+        servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+        horario_trabalho={2: (time(9, 0), time(18, 0))},
+    )
+    mock_repo.salvar.side_effect = ConflitoConcorrenciaError()
+
+    use_case = RealizarAgendamentoUseCase(
+        repositorio=mock_repo, fila_notificacoes=mocker.Mock(spec=IFilaNotificacoes), max_tentativas=3
+    )
+    with pytest.raises(ConflitoConcorrenciaError):
+        use_case.executar(AgendamentoInput(
+            profissional_id=uuid4(), cliente_contato="c", nome_servico="Corte",
+            data_hora_inicio=datetime(2025, 1, 1, 10, 0),
+        ))
+    assert mock_repo.salvar.call_count == 3
 
 
 def test_realizar_agendamento_falha_se_profissional_nao_existe(mocker):
@@ -70,11 +131,13 @@ def test_realizar_agendamento_falha_se_profissional_nao_existe(mocker):
         data_hora_inicio=datetime(2025, 1, 1, 10, 0)
     )
     
-    use_case = RealizarAgendamentoUseCase(repositorio=mock_repo)
+    mock_fila = mocker.Mock(spec=IFilaNotificacoes)
+    use_case = RealizarAgendamentoUseCase(repositorio=mock_repo, fila_notificacoes=mock_fila)
     with pytest.raises(ProfissionalNaoEncontradoError):
         use_case.executar(input_data=input_dto)
 
     mock_repo.salvar.assert_not_called()
+    mock_fila.enfileirar.assert_not_called()
 
 
 # --- Testes para ConsultarAgendaUseCase ---
@@ -91,6 +154,7 @@ def test_consultar_agenda_retorna_agendamentos_do_dia(mocker):
     profissional_com_agenda = Profissional(
         id=id_profissional,
         nome="Dr. Agenda",
+        telefone_whatsapp="+5583900000002",
         agendamentos=[agendamento_hoje_1, agendamento_hoje_2, agendamento_amanha]
     )
     
@@ -105,7 +169,308 @@ def test_consultar_agenda_retorna_agendamentos_do_dia(mocker):
     use_case = ConsultarAgendaUseCase(repositorio=mock_repo)
     agenda_do_dia = use_case.executar(input_data=input_dto)
     
-    mock_repo.buscar_por_id.assert_called_once_with(id_profissional)
+    mock_repo.buscar_por_id.assert_called_once_with(
+        id_profissional, janela=(datetime(2025, 6, 8), datetime(2025, 6, 9))
+    )
     assert len(agenda_do_dia) == 2
     assert agenda_do_dia[0] == agendamento_hoje_1
-    assert agenda_do_dia[1] == agendamento_hoje_2
\ No newline at end of file
+    assert agenda_do_dia[1] == agendamento_hoje_2
+
+# --- Testes para ConsultarAgendaPeriodoUseCase ---
+
+def test_consultar_agenda_periodo_delega_filtro_ao_repositorio(mocker):
+    id_profissional = uuid4()
+    servico = Servico(nome="Consulta", duracao_minutos=50)
+    agenda = [Agendamento(servico=servico, cliente_contato="A", data_hora_inicio=datetime(2025, 6, 9, 10, 0))]
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.listar_agendamentos.return_value = agenda
+
+    resultado = ConsultarAgendaPeriodoUseCase(repositorio=mock_repo).executar(ConsultaAgendaPeriodoInput(
+        profissional_id=id_profissional, data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 15),
+        status=[AgendamentoStatus.CONFIRMADO],
+    ))
+
+    assert resultado == agenda
+    mock_repo.listar_agendamentos.assert_called_once_with(
+        id_profissional, (datetime(2025, 6, 9), datetime(2025, 6, 16)), status=[AgendamentoStatus.CONFIRMADO]
+    )
+
+def test_consultar_agenda_periodo_valida_profissional_e_periodo(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.listar_agendamentos.return_value = None
+    use_case = ConsultarAgendaPeriodoUseCase(repositorio=mock_repo)
+
+    with pytest.raises(ProfissionalNaoEncontradoError):
+        use_case.executar(ConsultaAgendaPeriodoInput(
+            profissional_id=uuid4(), data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 9)
+        ))
+    with pytest.raises(ValueError):
+        use_case.executar(ConsultaAgendaPeriodoInput(
+            profissional_id=uuid4(), data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 8)
+        ))
+
+def test_consultar_agenda_periodo_com_arquivados_usa_o_historico(mocker):
+    id_profissional = uuid4()
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.listar_historico.return_value = []
+
+    ConsultarAgendaPeriodoUseCase(repositorio=mock_repo).executar(ConsultaAgendaPeriodoInput(
+        profissional_id=id_profissional, data_inicio=date(2024, 6, 9), data_fim=date(2024, 6, 15),
+        incluir_arquivados=True,
+    ))
+
+    mock_repo.listar_historico.assert_called_once_with(
+        id_profissional, (datetime(2024, 6, 9), datetime(2024, 6, 16)), status=None
+    )
+    mock_repo.listar_agendamentos.assert_not_called()
+
+# --- Testes para ExportarAgendaUseCase ---
+
+def test_exportar_agenda_em_csv_e_ics(mocker):
+    id_profissional = uuid4()
+    servico = Servico(nome="Corte, barba", duracao_minutos=45)
+    agendamentos = [
+        Agendamento(servico=servico, cliente_contato="A", data_hora_inicio=datetime(2025, 6, 9, 10, 0)),
+        Agendamento(servico=servico, cliente_contato="B", data_hora_inicio=datetime(2025, 6, 10, 9, 0),
+                    status=AgendamentoStatus.CANCELADO),
+    ]
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.obter_atualizacao.return_value = (7, datetime(2025, 6, 1, 12, 0))
+    mock_repo.iterar_agendamentos.side_effect = lambda *args, **kwargs: iter(agendamentos)
+    use_case = ExportarAgendaUseCase(repositorio=mock_repo)
+
+    def exportar(formato: str):
+        return use_case.executar(ExportacaoAgendaInput(
+            profissional_id=id_profissional, data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 10), formato=formato
+        ))
+
+    csv_ = exportar("csv")
+    assert csv_.versao == 7
+    linhas = "".join(csv_.conteudo).splitlines()
+    assert linhas[0] == "id,servico,duracao_minutos,data_hora_inicio,data_hora_fim,cliente_contato,status"
+    assert linhas[1].endswith(',"Corte, barba",45,2025-06-09T10:00:00,2025-06-09T10:45:00,A,Confirmado')
+    mock_repo.iterar_agendamentos.assert_called_with(
+        id_profissional, (datetime(2025, 6, 9), datetime(2025, 6, 11)), tamanho_lote=ExportarAgendaUseCase.TAMANHO_LOTE
+    )
+
+    ics = "".join(exportar("ics").conteudo)
+    assert ics.startswith("BEGIN:VCALENDAR\r\n") and ics.endswith("END:VCALENDAR\r\n")
+    assert ics.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20250609T100000\r\nDTEND:20250609T104500\r\nSUMMARY:Corte\\, barba - A" in ics
+    assert "STATUS:CANCELLED" in ics
+
+def test_exportar_agenda_de_profissional_inexistente(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.obter_atualizacao.return_value = None
+    with pytest.raises(ProfissionalNaoEncontradoError):
+        ExportarAgendaUseCase(repositorio=mock_repo).executar(ExportacaoAgendaInput(
+            profissional_id=uuid4(), data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 9)
+        ))
+
+def test_exportar_agenda_recusa_periodo_invalido_antes_de_gerar_o_conteudo(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.obter_atualizacao.return_value = (1, None)
+    with pytest.raises(ValueError):
+        # Sem percorrer 'conteudo': o erro sai de 'executar', antes do cabeçalho da resposta.
+        ExportarAgendaUseCase(repositorio=mock_repo).executar(ExportacaoAgendaInput(
+            profissional_id=uuid4(), data_inicio=date(2025, 6, 10), data_fim=date(2025, 6, 9)
+        ))
+    mock_repo.iterar_agendamentos.assert_not_called()
+
+# --- Testes para ConsultarDisponibilidadeUseCase ---
+
+def test_consultar_disponibilidade_retorna_horarios_livres(mocker):
+    """Testa se a consulta retorna os horários livres do serviço no período, carregando só a janela necessária."""
+    id_profissional = uuid4()
+    corte = Servico(nome="Corte", duracao_minutos=60)
+    profissional = Profissional(
+        id=id_profissional,
+        nome="Dr. Agenda",
+        telefone_whatsapp="+5583900000002",
+        servicos_oferecidos=[corte],
+        horario_trabalho={0: (time(9, 0), time(12, 0))},
+        agendamentos=[Agendamento(servico=corte, cliente_contato="A", data_hora_inicio=datetime(2025, 6, 9, 10, 0))],
+    )
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.buscar_por_id.return_value = profissional
+
+    input_dto = ConsultaDisponibilidadeInput(
+        profissional_id=id_profissional, nome_servico="Corte",
+        data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 9), granularidade_minutos=60
+    )
+    horarios = ConsultarDisponibilidadeUseCase(repositorio=mock_repo).executar(input_dto)
+
+    mock_repo.buscar_por_id.assert_called_once_with(
+        id_profissional, janela=(datetime(2025, 6, 9), datetime(2025, 6, 11)), somente_ocupacao=True
+    )
+    assert horarios == [datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 11, 0)]
+
+
+def test_consultar_disponibilidade_falha_com_servico_nao_oferecido(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.buscar_por_id.return_value = Profissional(nome="Dr. Agenda", telefone_whatsapp="+5583900000002")
+
+    input_dto = ConsultaDisponibilidadeInput(
+        profissional_id=uuid4(), nome_servico="Corte",
+        data_inicio=date(2025, 6, 9), data_fim=date(2025, 6, 10)
+    )
+    with pytest.raises(ServicoNaoEncontradoError):
+        ConsultarDisponibilidadeUseCase(repositorio=mock_repo).executar(input_dto)
+
+
+def test_consultar_disponibilidade_rejeita_periodo_invertido(mocker):
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    input_dto = ConsultaDisponibilidadeInput(
+        profissional_id=uuid4(), nome_servico="Corte",
+        data_inicio=date(2025, 6, 10), data_fim=date(2025, 6, 9)
+    )
+    with pytest.raises(ValueError):
+        ConsultarDisponibilidadeUseCase(repositorio=mock_repo).executar(input_dto)
+    mock_repo.buscar_por_id.assert_not_called()
+
+
+# --- Testes para BuscarProfissionaisDisponiveisUseCase ---
+
+def test_buscar_profissionais_disponiveis_em_horario_exato(mocker):
+    """Apenas os profissionais livres no horário pedido devem ser retornados."""
+    manicure = Servico(nome="Manicure", duracao_minutos=60)
+    expediente = {0: (time(9, 0), time(18, 0))}
+    livre = Profissional(nome="Ana", telefone_whatsapp="+5583900000010",
+                         servicos_oferecidos=[manicure], horario_trabalho=expediente)
+    ocupada = Profissional(
+        nome="Bia", telefone_whatsapp="+5583900000011", servicos_oferecidos=[manicure], horario_trabalho=expediente,
+        agendamentos=[Agendamento(servico=manicure, cliente_contato="A", data_hora_inicio=datetime(2025, 6, 9, 14, 30))],
+    )
+    folga = Profissional(nome="Cris", telefone_whatsapp="+5583900000012", servicos_oferecidos=[manicure])
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.listar_por_servico.return_value = [livre, ocupada, folga]
+
+    input_dto = BuscaProfissionaisDisponiveisInput(nome_servico="Manicure", inicio=datetime(2025, 6, 9, 15, 0))
+    resultado = BuscarProfissionaisDisponiveisUseCase(repositorio=mock_repo).executar(input_dto)
+
+    mock_repo.listar_por_servico.assert_called_once_with(
+        "Manicure", (datetime(2025, 6, 9, 15, 0), datetime(2025, 6, 10, 15, 0)), somente_ocupacao=True
+    )
+    assert [r.profissional.nome for r in resultado] == ["Ana"]
+    assert resultado[0].horarios == [datetime(2025, 6, 9, 15, 0)]
+
+
+def test_buscar_profissionais_disponiveis_em_periodo(mocker):
+    """Com um período, cada profissional vem com seus horários livres."""
+    manicure = Servico(nome="Manicure", duracao_minutos=60)
+    profissional = Profissional(nome="Ana", telefone_whatsapp="+5583900000010",
+                                servicos_oferecidos=[manicure], horario_trabalho={0: (time(9, 0), time(11, 0))})
+    mock_repo = mocker.Mock(spec=IProfissionalRepositorio)
+    mock_repo.listar_por_servico.return_value = [profissional]
+
+    input_dto = BuscaProfissionaisDisponiveisInput(
+        nome_servico="Manicure", inicio=datetime(2025, 6, 9), fim=datetime(2025, 6, 10), granularidade_minutos=60
+    )
+    resultado = BuscarProfissionaisDisponiveisUseCase(repositorio=mock_repo).executar(input_dto)
+
+    assert resultado[0].horarios == [datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 10, 0)]
+
+
+# --- Testes para ResponderMensagemUseCase ---
+
+@pytest.fixture
+def profissional_chatbot() -> Profissional:
+    return Profissional(
+        nome="Salão Unhas de Ouro",
+        telefone_whatsapp="+5583988887777",
+        servicos_oferecidos=[Servico(nome="Manicure", duracao_minutos=60), Servico(nome="Pedicure", duracao_minutos=60)],
+        horario_trabalho={0: (time(9, 0), time(12, 0))},
+    )
+
+
+class _Conversa:
+    """Simula um cliente trocando mensagens com o WhatsApp do profissional."""
+
+    def __init__(self, mocker, profissional):
+        self.repo = mocker.Mock(spec=IProfissionalRepositorio)
+        self.repo.buscar_por_telefone.return_value = profissional
+        self.repo.buscar_por_id.return_value = profissional
+        self.fila = mocker.Mock(spec=IFilaNotificacoes)
+        self.armazem = MemoriaArmazemConversas()
+        self.use_case = ResponderMensagemUseCase(
+            repositorio=self.repo,
+            armazem_conversas=self.armazem,
+            fila_notificacoes=self.fila,
+            agora=lambda: datetime(2025, 6, 9, 8, 0),
+        )
+
+    def enviar(self, texto: str) -> str:
+        return self.use_case.executar(MensagemRecebidaInput(
+            sender="5583911112222@c.us", recipient="5583988887777@c.us", text=texto
+        ))
+
+
+def test_responder_mensagem_apresenta_servicos(mocker, profissional_chatbot):
+    conversa = _Conversa(mocker, profissional_chatbot)
+    resposta = conversa.enviar("Oi, boa tarde")
+
+    conversa.repo.buscar_por_telefone.assert_called_once_with(
+        "+5583988887777", janela=(datetime(2025, 6, 9), datetime(2025, 6, 9))
+    )
+    assert "Salão Unhas de Ouro" in resposta
+    assert "1. Manicure (60 min)" in resposta
+    assert "2. Pedicure (60 min)" in resposta
+    estado = conversa.armazem.obter(("+5583988887777", "+5583911112222"))
+    assert estado.etapa == EtapaConversa.ESCOLHENDO_SERVICO
+
+
+def test_responder_mensagem_usa_servicos_guardados_na_conversa(mocker, profissional_chatbot):
+    conversa = _Conversa(mocker, profissional_chatbot)
+    conversa.enviar("Oi")
+    resposta = conversa.enviar("pedicure")
+
+    # O segundo turno não volta a buscar o profissional pelo telefone.
+    conversa.repo.buscar_por_telefone.assert_called_once()
+    assert resposta.startswith("Próximos horários para 'Pedicure'")
+    assert "1. 09/06 às 09:00" in resposta
+
+
+def test_responder_mensagem_conclui_agendamento_pelo_numero_do_horario(mocker, profissional_chatbot):
+    conversa = _Conversa(mocker, profissional_chatbot)
+    conversa.enviar("Oi")
+    conversa.enviar("2")
+    resposta = conversa.enviar("2")
+
+    assert "confirmado para 09/06 às 09:15" in resposta
+    agendamento = profissional_chatbot.agendamentos[0]
+    assert agendamento.cliente_contato == "+5583911112222"
+    assert agendamento.servico.nome == "Pedicure"
+    conversa.repo.salvar.assert_called_once_with(profissional_chatbot)
+    conversa.fila.enfileirar.assert_called_once()
+    assert conversa.armazem.obter(("+5583988887777", "+5583911112222")) is None
+
+
+def test_responder_mensagem_oferece_novos_horarios_se_o_escolhido_foi_ocupado(mocker, profissional_chatbot):
+    conversa = _Conversa(mocker, profissional_chatbot)
+    conversa.enviar("Manicure")
+    profissional_chatbot.adicionar_novo_agendamento(Agendamento(
+        cliente_contato="+5583900000000",
+        servico=profissional_chatbot.servicos_oferecidos[0],
+        data_hora_inicio=datetime(2025, 6, 9, 9, 0),
+    ))
+    resposta = conversa.enviar("1")
+
+    assert resposta.startswith("Esse horário acabou de ser ocupado.")
+    assert "1. 09/06 às 10:00" in resposta
+    conversa.repo.salvar.assert_not_called()
+
+
+def test_responder_mensagem_reinicia_a_conversa(mocker, profissional_chatbot):
+    conversa = _Conversa(mocker, profissional_chatbot)
+    conversa.enviar("Manicure")
+    resposta = conversa.enviar("menu")
+
+    assert "Qual serviço você deseja agendar?" in resposta
+    estado = conversa.armazem.obter(("+5583988887777", "+5583911112222"))
+    assert estado.etapa == EtapaConversa.ESCOLHENDO_SERVICO
+
+
+def test_responder_mensagem_para_numero_nao_cadastrado(mocker):
+    resposta = _Conversa(mocker, None).enviar("Oi")
+
+    assert "não está vinculado" in resposta
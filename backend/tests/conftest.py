@@ -1,14 +1,17 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from agendia.infrastructure.database import Base
 
 # Usa um banco de dados SQLite em memória para os testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
+# 'StaticPool' faz todas as threads compartilharem a mesma conexão (e, portanto, o mesmo banco em memória)
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,4 +30,43 @@ def db_session():
         # Depois que o teste termina, limpa tudo
         session.close()
         # 'drop_all' remove todas as tabelas, garantindo que o próximo teste comece do zero
-        Base.metadata.drop_all(bind=engine)
\ No newline at end of file
+        Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def session_factory(db_session):
+    """
+    Fábrica de sessões ligada ao mesmo banco de 'db_session', para componentes
+    que abrem suas próprias sessões (ex.: o despachante de notificações).
+    """
+    return TestingSessionLocal
+
+
+@pytest.fixture
+def anyio_backend():
+    # Testes 'async' (marcados com @pytest.mark.anyio) rodam só no asyncio, como a API.
+    return "asyncio"
+
+@pytest.fixture
+async def async_session():
+    """Sessão assíncrona (aiosqlite) sobre um banco em memória próprio do teste."""
+    async_engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(async_engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        await session.close()
+        await async_engine.dispose()
+
+
+@pytest.fixture
+def stub_whatsapp():
+    """Sobe o stub do serviço de envio do WhatsApp em uma porta livre."""
+    from tests.stub_whatsapp_server import StubWhatsAppServer
+
+    servidor = StubWhatsAppServer().iniciar()
+    try:
+        yield servidor
+    finally:
+        servidor.parar()
@@ -1,9 +1,13 @@
-from datetime import datetime, time
+from datetime import date, datetime, time, timedelta
+from uuid import uuid4
+import numpy as np
 import pytest
 
 from agendia.core.domain import (
+    AgendaCompacta,
     Agendamento,
     AgendamentoStatus,
+    CalendarioTrabalho,
     Profissional,
     Servico,
 )
@@ -46,6 +50,7 @@ def profissional_exemplo() -> Profissional:
     corte = Servico(nome="Corte", duracao_minutos=30)
     prof = Profissional(
         nome="Dr. Teste",
+        telefone_whatsapp="+5583900000001",
         servicos_oferecidos=[corte],
         horario_trabalho={
             0: (time(9, 0), time(12, 0)), # Segunda-feira
@@ -98,4 +103,242 @@ def test_nao_deve_adicionar_agendamento_em_horario_indisponivel(profissional_exe
     )
 
     with pytest.raises(ValueError, match="Horário indisponível para este serviço."):
-        profissional_exemplo.adicionar_novo_agendamento(agendamento_conflitante)
\ No newline at end of file
+        profissional_exemplo.adicionar_novo_agendamento(agendamento_conflitante)
+
+# --- Testes para o Índice de Agenda ---
+
+def test_cancelar_agendamento_libera_horario(profissional_exemplo: Profissional):
+    """Verifica se o cancelamento pelo agregado libera o horário no índice."""
+    horario_ocupado = datetime(2025, 6, 9, 10, 0)
+    assert profissional_exemplo.esta_disponivel(horario_ocupado, 30) is False
+
+    existente = profissional_exemplo.agendamentos[0]
+    profissional_exemplo.cancelar_agendamento(existente.id)
+
+    assert existente.status == AgendamentoStatus.CANCELADO
+    assert profissional_exemplo.esta_disponivel(horario_ocupado, 30) is True
+
+def test_concluir_agendamento_retira_do_indice(profissional_exemplo: Profissional):
+    """Agendamentos concluídos não devem mais bloquear o horário."""
+    existente = profissional_exemplo.agendamentos[0]
+    profissional_exemplo.concluir_agendamento(existente.id)
+
+    assert existente.status == AgendamentoStatus.CONCLUIDO
+    assert profissional_exemplo.esta_disponivel(datetime(2025, 6, 9, 10, 0), 30) is True
+
+def test_cancelar_agendamento_inexistente_levanta_erro(profissional_exemplo: Profissional):
+    with pytest.raises(ValueError, match="Agendamento não encontrado"):
+        profissional_exemplo.cancelar_agendamento(uuid4())
+
+def test_cancelamento_direto_na_entidade_e_refletido_no_indice(profissional_exemplo: Profissional):
+    """Mesmo cancelando pela entidade Agendamento, o horário deve ser liberado."""
+    horario_ocupado = datetime(2025, 6, 9, 10, 0)
+    assert profissional_exemplo.esta_disponivel(horario_ocupado, 30) is False
+
+    profissional_exemplo.agendamentos[0].cancelar()
+
+    assert profissional_exemplo.esta_disponivel(horario_ocupado, 30) is True
+
+def test_agendamento_longo_bloqueia_horarios_seguintes(profissional_exemplo: Profissional):
+    """Um agendamento longo que começou antes deve conflitar com horários dentro dele."""
+    longo = Agendamento(
+        servico=Servico(nome="Progressiva", duracao_minutos=90),
+        data_hora_inicio=datetime(2025, 6, 9, 9, 0),
+        cliente_contato="cliente_longo"
+    )
+    profissional_exemplo.adicionar_novo_agendamento(
+        Agendamento(
+            servico=profissional_exemplo.servicos_oferecidos[0],
+            data_hora_inicio=datetime(2025, 6, 9, 11, 0),
+            cliente_contato="outro"
+        )
+    )
+    profissional_exemplo.agendamentos.append(longo)  # Alteração por fora do agregado
+
+    assert profissional_exemplo.esta_disponivel(datetime(2025, 6, 9, 10, 15), 30) is False
+    assert profissional_exemplo.esta_disponivel(datetime(2025, 6, 9, 10, 30), 30) is True
+    assert profissional_exemplo.esta_disponivel(datetime(2025, 6, 9, 10, 45), 30) is False
+
+
+# --- Testes para a busca de horários livres ---
+
+def test_horarios_livres_pula_agendamentos_confirmados(profissional_exemplo: Profissional):
+    """Os horários ocupados (10:00-10:30) não devem ser oferecidos."""
+    corte = profissional_exemplo.servicos_oferecidos[0]
+
+    livres = profissional_exemplo.horarios_livres(
+        corte, datetime(2025, 6, 9), datetime(2025, 6, 10), granularidade_minutos=30
+    )
+
+    assert livres == [
+        datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 9, 30),
+        datetime(2025, 6, 9, 10, 30), datetime(2025, 6, 9, 11, 0), datetime(2025, 6, 9, 11, 30),
+    ]
+
+def test_horarios_livres_respeita_limite_e_dias_sem_expediente(profissional_exemplo: Profissional):
+    """Dias sem expediente são ignorados e a busca para no limite pedido."""
+    corte = profissional_exemplo.servicos_oferecidos[0]
+
+    # Começa numa terça (sem expediente); a próxima segunda é 16/06.
+    livres = profissional_exemplo.horarios_livres(
+        corte, datetime(2025, 6, 10), datetime(2025, 6, 20), granularidade_minutos=15, limite=3
+    )
+
+    assert livres == [datetime(2025, 6, 16, 9, 0), datetime(2025, 6, 16, 9, 15), datetime(2025, 6, 16, 9, 30)]
+
+def test_horarios_livres_coincide_com_esta_disponivel(profissional_exemplo: Profissional):
+    """Todo horário da grade é livre se, e somente se, 'esta_disponivel' o aceita."""
+    servico_longo = Servico(nome="Coloração", duracao_minutos=50)
+    profissional_exemplo.adicionar_novo_agendamento(Agendamento(
+        servico=servico_longo, data_hora_inicio=datetime(2025, 6, 9, 11, 5), cliente_contato="x"
+    ))
+    inicio = datetime(2025, 6, 9, 8, 50)
+
+    livres = profissional_exemplo.horarios_livres(
+        servico_longo, inicio, datetime(2025, 6, 9, 23, 0), granularidade_minutos=5
+    )
+
+    grade = [datetime(2025, 6, 9, 9, 0) + timedelta(minutes=5 * i) for i in range(36)]
+    assert livres == [h for h in grade if profissional_exemplo.esta_disponivel(h, 50)]
+
+
+# --- Testes para a disponibilidade em lote ---
+
+def test_disponibilidade_em_lote_coincide_com_esta_disponivel(profissional_exemplo: Profissional):
+    """Mesma resposta que a checagem escalar, com agendamento longo, cancelado e dias sem expediente."""
+    profissional_exemplo.horario_trabalho[2] = (time(14, 0), time(18, 0))
+    longo = Agendamento(
+        servico=Servico(nome="Progressiva", duracao_minutos=90),
+        data_hora_inicio=datetime(2025, 6, 11, 14, 20), cliente_contato="longo"
+    )
+    cancelado = Agendamento(
+        servico=profissional_exemplo.servicos_oferecidos[0],
+        data_hora_inicio=datetime(2025, 6, 9, 11, 0), cliente_contato="cancelado"
+    )
+    profissional_exemplo.adicionar_novo_agendamento(longo)
+    profissional_exemplo.adicionar_novo_agendamento(cancelado)
+    cancelado.cancelar()  # Alteração por fora do agregado
+    grade = np.datetime64("2025-06-08T00:00") + np.arange(4 * 24 * 12) * np.timedelta64(5, "m")
+
+    for duracao in (15, 30, 50):
+        mascara = profissional_exemplo.disponibilidade_em_lote(grade, duracao)
+        esperado = [profissional_exemplo.esta_disponivel(h, duracao) for h in grade.astype(datetime).tolist()]
+        assert mascara.tolist() == esperado
+    assert mascara.any()
+
+def test_disponibilidade_em_lote_aceita_datetimes_e_ocupacao_compacta(profissional_exemplo: Profissional):
+    profissional_exemplo.carregar_ocupacao(AgendaCompacta([(datetime(2025, 6, 9, 11, 0), datetime(2025, 6, 9, 11, 45))]))
+    candidatos = [datetime(2025, 6, 9, 11, 30), datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 10, 15),
+                  datetime(2025, 6, 9, 11, 45), datetime(2025, 6, 10, 9, 0)]
+
+    assert profissional_exemplo.disponibilidade_em_lote(candidatos, 30).tolist() == [
+        False, True, False, True, False
+    ]
+    assert profissional_exemplo.disponibilidade_em_lote([], 30).tolist() == []
+
+
+def test_agenda_compacta_retorna_intervalos_sobrepostos_em_ordem():
+    """Inclui o intervalo longo que começou antes da busca e exclui os que só encostam nela."""
+    ocupacao = AgendaCompacta([
+        (datetime(2025, 6, 9, 11, 0), datetime(2025, 6, 9, 11, 30)),
+        (datetime(2025, 6, 9, 7, 0), datetime(2025, 6, 9, 10, 0)),
+        (datetime(2025, 6, 9, 8, 0), datetime(2025, 6, 9, 9, 0)),
+    ])
+
+    assert len(ocupacao) == 3
+    assert ocupacao.intervalos(datetime(2025, 6, 9, 9, 30), datetime(2025, 6, 9, 11, 0)) == [
+        (datetime(2025, 6, 9, 7, 0), datetime(2025, 6, 9, 10, 0)),
+    ]
+    assert ocupacao.intervalos(datetime(2025, 6, 9, 10, 0), datetime(2025, 6, 9, 11, 0)) == []
+
+def test_ocupacao_carregada_equivale_aos_agendamentos_materializados(profissional_exemplo: Profissional):
+    """Disponibilidade e horários livres não mudam se a agenda vier só como ocupação."""
+    corte = profissional_exemplo.servicos_oferecidos[0]
+    compacto = profissional_exemplo.model_copy(update={"agendamentos": []})
+    compacto.carregar_ocupacao(AgendaCompacta(
+        (ag.data_hora_inicio, ag.data_hora_fim) for ag in profissional_exemplo.agendamentos
+    ))
+    compacto.adicionar_novo_agendamento(Agendamento(
+        servico=corte, data_hora_inicio=datetime(2025, 6, 9, 11, 0), cliente_contato="novo"
+    ))
+    profissional_exemplo.adicionar_novo_agendamento(Agendamento(
+        servico=corte, data_hora_inicio=datetime(2025, 6, 9, 11, 0), cliente_contato="novo"
+    ))
+
+    periodo = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+    assert compacto.horarios_livres(corte, *periodo, granularidade_minutos=15) == \
+        profissional_exemplo.horarios_livres(corte, *periodo, granularidade_minutos=15)
+    assert compacto.esta_disponivel(datetime(2025, 6, 9, 10, 15), 30) is False
+    with pytest.raises(ValueError):
+        compacto.adicionar_novo_agendamento(Agendamento(
+            servico=corte, data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="outro"
+        ))
+
+
+# --- Testes para o calendário de trabalho ---
+
+@pytest.fixture
+def profissional_com_calendario() -> Profissional:
+    return Profissional(
+        nome="Dra. Agenda", telefone_whatsapp="+5583900000002",
+        servicos_oferecidos=[Servico(nome="Consulta", duracao_minutos=60)],
+        horario_trabalho={0: (time(8, 0), time(18, 0)), 1: (time(8, 0), time(18, 0))},
+        calendario=CalendarioTrabalho(
+            pausas={0: [(time(12, 0), time(13, 0))]},  # Almoço só às segundas
+            feriados={date(2025, 6, 16)},
+            excecoes={date(2025, 6, 23): [(time(8, 0), time(10, 0)), (time(15, 0), time(16, 0))]},
+        ),
+    )
+
+
+def test_calendario_aplica_pausas_feriados_e_excecoes(profissional_com_calendario: Profissional):
+    p = profissional_com_calendario
+    assert p.esta_disponivel(datetime(2025, 6, 9, 11, 30), 30)
+    assert not p.esta_disponivel(datetime(2025, 6, 9, 12, 30), 30)  # Pausa de segunda
+    assert p.esta_disponivel(datetime(2025, 6, 10, 12, 30), 30)  # Terça não tem pausa
+    assert not p.esta_disponivel(datetime(2025, 6, 16, 9, 0), 30)  # Feriado
+    assert p.esta_disponivel(datetime(2025, 6, 23, 15, 0), 30)  # Exceção: turno extra da tarde
+    assert not p.esta_disponivel(datetime(2025, 6, 23, 11, 0), 30)
+
+    consulta = p.servicos_oferecidos[0]
+    assert p.horarios_livres(consulta, datetime(2025, 6, 9), datetime(2025, 6, 10), granularidade_minutos=60) == [
+        datetime(2025, 6, 9, hora) for hora in (8, 9, 10, 11, 13, 14, 15, 16, 17)
+    ]
+    grade = np.datetime64("2025-06-08T00:00") + np.arange(17 * 24 * 4) * np.timedelta64(15, "m")
+    assert p.disponibilidade_em_lote(grade, 30).tolist() == \
+        [p.esta_disponivel(h, 30) for h in grade.astype(datetime).tolist()]
+
+
+def test_atendimento_nao_atravessa_pausa_nem_fim_de_excecao(profissional_com_calendario: Profissional):
+    p = profissional_com_calendario
+    longo = Servico(nome="Tratamento", duracao_minutos=90)
+    assert not p.esta_disponivel(datetime(2025, 6, 9, 11, 45), 60)  # Terminaria dentro do almoço
+    assert not p.esta_disponivel(datetime(2025, 6, 9, 11, 45), 90)  # Atravessaria o almoço inteiro
+    assert p.esta_disponivel(datetime(2025, 6, 9, 11, 0), 60)  # Termina no início da pausa
+    assert not p.esta_disponivel(datetime(2025, 6, 23, 9, 30), 60)  # Passaria do fim da exceção (10:00)
+    assert p.esta_disponivel(datetime(2025, 6, 9, 17, 45), 60)  # Fechamento semanal: pode começar até ele
+
+    livres = p.horarios_livres(longo, datetime(2025, 6, 9), datetime(2025, 6, 10), granularidade_minutos=15)
+    assert datetime(2025, 6, 9, 10, 30) in livres
+    assert not [h for h in livres if datetime(2025, 6, 9, 10, 30) < h < datetime(2025, 6, 9, 13, 0)]
+    grade = np.datetime64("2025-06-08T00:00") + np.arange(17 * 24 * 4) * np.timedelta64(15, "m")
+    assert p.disponibilidade_em_lote(grade, 90).tolist() == \
+        [p.esta_disponivel(h, 90) for h in grade.astype(datetime).tolist()]
+
+
+def test_calendario_compilado_e_reaproveitado_ate_o_horario_mudar(profissional_com_calendario: Profissional):
+    p = profissional_com_calendario
+    compilado = p.calendario_compilado()
+    assert p.model_copy(deep=True).calendario_compilado() is compilado
+
+    p.horario_trabalho[2] = (time(9, 0), time(10, 0))  # Alteração por fora do agregado
+    assert p.calendario_compilado() is not compilado
+    assert p.esta_disponivel(datetime(2025, 6, 11, 9, 30), 30)
+
+    p.calendario = p.calendario.model_copy(update={"feriados": frozenset()})
+    assert p.esta_disponivel(datetime(2025, 6, 16, 9, 0), 30)
+
+
+def test_calendario_rejeita_intervalo_invertido():
+    with pytest.raises(ValueError, match="terminar depois de começar"):
+        CalendarioTrabalho(pausas={0: [(time(13, 0), time(12, 0))]})
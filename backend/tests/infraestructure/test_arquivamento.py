@@ -0,0 +1,72 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from agendia.application.ports import ConflitoConcorrenciaError
+from agendia.core.domain import Agendamento, AgendamentoStatus, Profissional, Servico
+from agendia.infrastructure.arquivamento import ArquivadorAgendamentos
+from agendia.infrastructure.models import AgendamentoArquivadoDB, AgendamentoDB
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+AGORA = datetime(2025, 12, 1, 12, 0)
+CORTE = Servico(nome="Corte", duracao_minutos=30)
+
+
+def _profissional_com_historico(db_session) -> Profissional:
+    """Um agendamento por dia de junho a novembro; o status varia em ciclos de 3 dias."""
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000001", servicos_oferecidos=[CORTE],
+        horario_trabalho={dia: (time(8, 0), time(20, 0)) for dia in range(7)},
+    )
+    inicio = datetime(2025, 6, 1, 10, 0)
+    while inicio < AGORA:
+        agendamento = Agendamento(servico=CORTE, data_hora_inicio=inicio, cliente_contato="+5583911110000")
+        profissional.adicionar_novo_agendamento(agendamento)
+        if inicio.day % 3 == 1:
+            agendamento.concluir()
+        elif inicio.day % 3 == 2:
+            agendamento.cancelar()
+        inicio += timedelta(days=1)
+    SQLiteProfissionalRepositorio(session=db_session).salvar(profissional)
+    return profissional
+
+
+def test_arquiva_so_encerrados_antigos_em_lotes_e_historico_os_mantem(db_session, session_factory):
+    profissional = _profissional_com_historico(db_session)
+    semestre = (datetime(2025, 6, 1), datetime(2025, 12, 1))
+    antes = SQLiteProfissionalRepositorio(session=db_session).listar_agendamentos(profissional.id, semestre)
+    arquivador = ArquivadorAgendamentos(session_factory, horizonte_dias=90, tamanho_lote=7, pausa_entre_lotes_segundos=0)
+
+    movidos = arquivador.processar(AGORA)
+
+    corte = AGORA - timedelta(days=90)
+    esperados = [ag for ag in antes if ag.data_hora_inicio < corte and ag.status != AgendamentoStatus.CONFIRMADO]
+    assert movidos == len(esperados) > 7
+    db_session.expire_all()
+    assert db_session.query(AgendamentoArquivadoDB).count() == movidos
+    restantes = db_session.query(AgendamentoDB).all()
+    assert all(ag.data_hora_inicio >= corte or ag.status == AgendamentoStatus.CONFIRMADO for ag in restantes)
+
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    assert len(repositorio.listar_agendamentos(profissional.id, semestre)) == len(antes) - movidos
+    assert repositorio.listar_historico(profissional.id, semestre) == antes
+    # A exportação (iterar_agendamentos) também percorre o arquivo.
+    assert list(repositorio.iterar_agendamentos(profissional.id, semestre, tamanho_lote=10)) == antes
+    cancelados = repositorio.listar_historico(profissional.id, semestre, status=[AgendamentoStatus.CANCELADO])
+    assert cancelados == [ag for ag in antes if ag.status == AgendamentoStatus.CANCELADO]
+    # Cada lote incrementa a versão: caches e agregados lidos antes ficam desatualizados.
+    assert repositorio.obter_versao(profissional.id) > profissional.versao
+    assert arquivador.processar(AGORA) == 0
+
+
+def test_agregado_lido_antes_do_arquivamento_nao_regrava_o_que_saiu(db_session, session_factory):
+    profissional = _profissional_com_historico(db_session)
+    lido_antes = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+
+    ArquivadorAgendamentos(session_factory, horizonte_dias=90, pausa_entre_lotes_segundos=0).processar(AGORA)
+
+    with pytest.raises(ConflitoConcorrenciaError):
+        SQLiteProfissionalRepositorio(session=db_session).salvar(lido_antes)
+    db_session.expire_all()
+    ids_arquivados = {id_ for (id_,) in db_session.query(AgendamentoArquivadoDB.id)}
+    assert db_session.query(AgendamentoDB).filter(AgendamentoDB.id.in_(ids_arquivados)).count() == 0
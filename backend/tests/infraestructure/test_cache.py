@@ -0,0 +1,164 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event
+
+from agendia.application.use_cases import (
+    AgendamentoInput, ConsultaDisponibilidadeInput, ConsultarDisponibilidadeUseCase, MensagemRecebidaInput,
+    RealizarAgendamentoUseCase, ResponderMensagemUseCase,
+)
+from agendia.core.domain import Profissional, Servico, Agendamento
+from agendia.infrastructure.cache import CacheProfissionais, CacheProfissionalRepositorio
+from agendia.infrastructure.conversas import MemoriaArmazemConversas
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+JANELA = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+MANICURE = Servico(nome="Manicure", duracao_minutos=60)
+
+
+def _contar_consultas(db_session, acao):
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+    event.listen(db_session.bind, "before_cursor_execute", registrar)
+    try:
+        return acao(), consultas
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", registrar)
+
+
+def _cadastrar(db_session) -> Profissional:
+    profissional = Profissional(
+        nome="Salão", telefone_whatsapp="+5583988887777", servicos_oferecidos=[MANICURE],
+        horario_trabalho={0: (time(9, 0), time(18, 0))},
+    )
+    SQLiteProfissionalRepositorio(session=db_session).salvar(profissional)
+    return profissional
+
+
+def _repositorio(db_session, cache) -> CacheProfissionalRepositorio:
+    # Um repositório por "requisição", todos compartilhando o mesmo cache.
+    return CacheProfissionalRepositorio(SQLiteProfissionalRepositorio(session=db_session), cache)
+
+
+def test_segunda_busca_consulta_apenas_a_versao(db_session):
+    profissional = _cadastrar(db_session)
+    cache = CacheProfissionais()
+    _repositorio(db_session, cache).buscar_por_id(profissional.id, janela=JANELA)
+
+    repositorio = _repositorio(db_session, cache)
+    por_id, consultas_id = _contar_consultas(
+        db_session, lambda: repositorio.buscar_por_id(profissional.id, janela=JANELA)
+    )
+    por_telefone, consultas_telefone = _contar_consultas(
+        db_session, lambda: repositorio.buscar_por_telefone("+5583988887777", janela=JANELA)
+    )
+
+    assert por_id.nome == por_telefone.nome == "Salão"
+    assert len(consultas_id) == len(consultas_telefone) == 1
+    assert "versao" in consultas_id[0]
+    assert cache.estatisticas()["acertos"] == 2
+
+
+def test_salvar_invalida_e_agregado_do_cache_pode_ser_gravado(db_session):
+    profissional = _cadastrar(db_session)
+    cache = CacheProfissionais()
+    _repositorio(db_session, cache).buscar_por_id(profissional.id, janela=JANELA)
+
+    repositorio = _repositorio(db_session, cache)
+    carregado = repositorio.buscar_por_id(profissional.id, janela=JANELA)
+    carregado.adicionar_novo_agendamento(
+        Agendamento(servico=MANICURE, data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="c")
+    )
+    repositorio.salvar(carregado)
+
+    assert len(cache) == 0
+    recarregado = _repositorio(db_session, cache).buscar_por_id(profissional.id, janela=JANELA)
+    assert len(recarregado.agendamentos) == 1
+    assert recarregado.versao == carregado.versao == 2
+
+
+def test_gravacao_por_outro_processo_e_detectada_pela_versao(db_session):
+    profissional = _cadastrar(db_session)
+    cache = CacheProfissionais()
+    _repositorio(db_session, cache).buscar_por_id(profissional.id)
+
+    # Outro processo grava sem passar por este cache.
+    outro = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    outro.nome = "Salão Novo"
+    SQLiteProfissionalRepositorio(session=db_session).salvar(outro)
+
+    recarregado = _repositorio(db_session, cache).buscar_por_id(profissional.id)
+    assert recarregado.nome == "Salão Novo"
+    assert cache.estatisticas()["invalidados"] == 1
+
+
+def test_alterar_o_agregado_lido_nao_altera_o_cache(db_session):
+    profissional = _cadastrar(db_session)
+    cache = CacheProfissionais()
+    repositorio = _repositorio(db_session, cache)
+    repositorio.buscar_por_id(profissional.id).servicos_oferecidos.clear()
+
+    assert repositorio.buscar_por_id(profissional.id).servicos_oferecidos == [MANICURE]
+
+
+def test_cache_expira_e_respeita_o_limite_de_itens(db_session):
+    profissional = _cadastrar(db_session)
+    agora = [0.0]
+    cache = CacheProfissionais(max_itens=2, ttl_segundos=10, relogio=lambda: agora[0])
+    repositorio = _repositorio(db_session, cache)
+    for dia in (9, 10, 11):
+        repositorio.buscar_por_id(profissional.id, janela=(datetime(2025, 6, dia), datetime(2025, 6, dia + 1)))
+    assert len(cache) == 2
+
+    agora[0] = 10
+    repositorio.buscar_por_id(profissional.id, janela=(datetime(2025, 6, 11), datetime(2025, 6, 12)))
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas["descartados_lru"] == 1
+    assert estatisticas["expirados"] == 1
+    assert estatisticas["acertos"] == 0
+
+
+def test_conversas_do_mesmo_dia_reaproveitam_o_cache(db_session):
+    """Fluxo do webhook: um repositório por mensagem, com o relógio andando entre as mensagens."""
+    _cadastrar(db_session)
+    cache = CacheProfissionais()
+    armazem = MemoriaArmazemConversas()
+    agora = [datetime(2025, 6, 9, 7, 0)]
+
+    def receber(cliente: int, texto: str) -> str:
+        agora[0] += timedelta(minutes=7)
+        use_case = ResponderMensagemUseCase(
+            repositorio=_repositorio(db_session, cache), armazem_conversas=armazem,
+            fila_notificacoes=SQLiteFilaNotificacoes(db_session), agora=lambda: agora[0],
+        )
+        return use_case.executar(MensagemRecebidaInput(
+            sender=f"55839111100{cliente:02d}@c.us", recipient="5583988887777@c.us", text=texto
+        ))
+
+    for cliente in range(10):
+        assert "Manicure" in receber(cliente, "Oi")
+        assert receber(cliente, "Manicure").startswith("Próximos horários")
+
+    # Só a primeira busca de cada forma (dados do profissional; ocupação da semana) vai ao banco.
+    estatisticas = cache.estatisticas()
+    assert estatisticas["itens"] == 2
+    assert estatisticas["acertos"] == 18
+    assert estatisticas["taxa_acerto"] > 0.9
+
+
+def test_reserva_reaproveita_a_consulta_de_disponibilidade_do_dia(db_session):
+    profissional = _cadastrar(db_session)
+    cache = CacheProfissionais()
+    dia = datetime(2025, 6, 9).date()
+    horarios = ConsultarDisponibilidadeUseCase(_repositorio(db_session, cache)).executar(ConsultaDisponibilidadeInput(
+        profissional_id=profissional.id, nome_servico="Manicure", data_inicio=dia, data_fim=dia,
+    ))
+
+    RealizarAgendamentoUseCase(_repositorio(db_session, cache), SQLiteFilaNotificacoes(db_session)).executar(
+        AgendamentoInput(profissional_id=profissional.id, cliente_contato="+5511",
+                         nome_servico="Manicure", data_hora_inicio=horarios[3])
+    )
+
+    assert cache.estatisticas()["acertos"] == 1
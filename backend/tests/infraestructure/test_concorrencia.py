@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agendia.application.use_cases import RealizarAgendamentoUseCase, AgendamentoInput
+from agendia.core.domain import Profissional, Servico, AgendamentoStatus
+from agendia.infrastructure.database import Base
+from agendia.infrastructure.models import AgendamentoDB
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+THREADS = 8
+
+
+def _banco_em_arquivo(tmp_path):
+    # Um arquivo de verdade: cada thread usa sua própria conexão, como workers distintos.
+    engine = create_engine(f"sqlite:///{tmp_path / 'agendia.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _agendar_em_paralelo(session_factory, id_profissional, horarios: list[datetime]) -> list[object]:
+    """Dispara um agendamento por thread, todas ao mesmo tempo, e retorna o resultado (ou exceção) de cada uma."""
+    barreira = threading.Barrier(len(horarios))
+    resultados: list[object] = [None] * len(horarios)
+
+    def agendar(i: int):
+        session = session_factory()
+        try:
+            use_case = RealizarAgendamentoUseCase(
+                repositorio=SQLiteProfissionalRepositorio(session=session),
+                fila_notificacoes=SQLiteFilaNotificacoes(session=session),
+                # Cada conflito corresponde a outra thread que concluiu; THREADS tentativas bastam.
+                max_tentativas=THREADS,
+            )
+            barreira.wait()
+            resultados[i] = use_case.executar(AgendamentoInput(
+                profissional_id=id_profissional, cliente_contato=f"cliente-{i}",
+                nome_servico="Corte", data_hora_inicio=horarios[i],
+            ))
+        except Exception as e:
+            resultados[i] = e
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=agendar, args=(i,)) for i in range(len(horarios))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultados
+
+
+def _cadastrar(session_factory) -> Profissional:
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000001",
+        servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=60)],
+        horario_trabalho={0: (time(8, 0), time(20, 0))},
+    )
+    with session_factory() as session:
+        SQLiteProfissionalRepositorio(session=session).salvar(profissional)
+    return profissional
+
+
+def _intervalos_confirmados(session_factory) -> list[tuple[datetime, datetime]]:
+    with session_factory() as session:
+        return sorted(
+            session.query(AgendamentoDB.data_hora_inicio, AgendamentoDB.data_hora_fim)
+            .filter(AgendamentoDB.status == AgendamentoStatus.CONFIRMADO)
+        )
+
+
+def test_agendamentos_simultaneos_nao_se_sobrepoem(tmp_path):
+    engine, session_factory = _banco_em_arquivo(tmp_path)
+    profissional = _cadastrar(session_factory)
+
+    # Horários de 60 min a cada 30 min: cada um conflita com seus vizinhos.
+    horarios = [datetime(2025, 6, 9, 9 + i // 2, 30 * (i % 2)) for i in range(THREADS)]
+    resultados = _agendar_em_paralelo(session_factory, profissional.id, horarios)
+
+    recusados = [h for h, r in zip(horarios, resultados) if isinstance(r, Exception)]
+    assert all(isinstance(r, ValueError) for r in resultados if isinstance(r, Exception)), resultados
+    intervalos = _intervalos_confirmados(session_factory)
+    assert len(intervalos) == THREADS - len(recusados)
+    assert all(fim <= proximo_inicio for (_, fim), (proximo_inicio, _) in zip(intervalos, intervalos[1:]))
+    # Toda recusa se deve a um agendamento gravado que ocupa o horário.
+    assert all(any(inicio < h + timedelta(hours=1) and h < fim for inicio, fim in intervalos) for h in recusados)
+    engine.dispose()
+
+
+def test_mesmo_horario_disputado_tem_um_unico_vencedor(tmp_path):
+    engine, session_factory = _banco_em_arquivo(tmp_path)
+    profissional = _cadastrar(session_factory)
+
+    resultados = _agendar_em_paralelo(session_factory, profissional.id, [datetime(2025, 6, 9, 10, 0)] * THREADS)
+
+    assert sum(not isinstance(r, Exception) for r in resultados) == 1
+    assert len(_intervalos_confirmados(session_factory)) == 1
+    engine.dispose()
+
+
+def test_horarios_distintos_sao_todos_gravados_apesar_dos_conflitos(tmp_path):
+    engine, session_factory = _banco_em_arquivo(tmp_path)
+    profissional = _cadastrar(session_factory)
+
+    horarios = [datetime(2025, 6, 9, 8 + i, 0) for i in range(THREADS)]
+    resultados = _agendar_em_paralelo(session_factory, profissional.id, horarios)
+
+    assert not [r for r in resultados if isinstance(r, Exception)]
+    assert len(_intervalos_confirmados(session_factory)) == THREADS
+    engine.dispose()
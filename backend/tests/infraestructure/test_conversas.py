@@ -0,0 +1,48 @@
+from uuid import uuid4
+
+from agendia.application.ports import EstadoConversa
+from agendia.infrastructure.conversas import MemoriaArmazemConversas
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def _estado() -> EstadoConversa:
+    return EstadoConversa(profissional_id=uuid4(), profissional_nome="Salão", servicos=[])
+
+
+def test_conversa_expira_apos_o_ttl():
+    relogio = RelogioFalso()
+    armazem = MemoriaArmazemConversas(ttl_segundos=60, relogio=relogio)
+    estado = _estado()
+    armazem.salvar(("a", "b"), estado)
+
+    relogio.agora = 59
+    assert armazem.obter(("a", "b")) is estado
+    relogio.agora = 60
+    assert armazem.obter(("a", "b")) is None
+    assert len(armazem) == 0
+    assert armazem.estatisticas()["expiradas"] == 1
+
+
+def test_descarta_a_conversa_menos_usada_ao_passar_do_limite():
+    armazem = MemoriaArmazemConversas(max_conversas=2)
+    armazem.salvar(("p", "1"), _estado())
+    armazem.salvar(("p", "2"), _estado())
+    armazem.obter(("p", "1"))  # "1" passa a ser a mais recente
+    armazem.salvar(("p", "3"), _estado())
+
+    assert armazem.obter(("p", "2")) is None
+    assert armazem.obter(("p", "1")) is not None
+    assert armazem.obter(("p", "3")) is not None
+    estatisticas = armazem.estatisticas()
+    assert estatisticas["conversas"] == 2
+    assert estatisticas["descartadas_lru"] == 1
+    assert estatisticas["acertos"] == 3
+    assert estatisticas["faltas"] == 1
+    assert estatisticas["taxa_acerto"] == 0.75
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+
+from agendia.config import settings
+from agendia.infrastructure.database import criar_engine, criar_async_engine, url_assincrona
+
+
+def _pragmas(conexao) -> dict:
+    return {
+        nome: conexao.execute(text(f"PRAGMA {nome}")).scalar()
+        for nome in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size")
+    }
+
+
+def test_engine_aplica_o_perfil_de_pragmas_em_cada_conexao(tmp_path):
+    engine = criar_engine(f"sqlite:///{tmp_path / 'agendia.db'}")
+    try:
+        with engine.connect() as conexao:
+            pragmas = _pragmas(conexao)
+    finally:
+        engine.dispose()
+
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "cache_size": settings.sqlite_cache_size,
+        "mmap_size": settings.sqlite_mmap_size,
+    }
+    assert engine.pool.size() == settings.database_pool_size
+
+
+@pytest.mark.anyio
+async def test_engine_assincrono_aplica_os_mesmos_pragmas(tmp_path):
+    async_engine = criar_async_engine(f"sqlite:///{tmp_path / 'agendia.db'}")
+    try:
+        async with async_engine.connect() as conexao:
+            pragmas = await conexao.run_sync(_pragmas)
+    finally:
+        await async_engine.dispose()
+
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["busy_timeout"] == settings.sqlite_busy_timeout_ms
+
+
+def test_url_assincrona_troca_apenas_o_driver():
+    assert url_assincrona("sqlite:///./agendia.db") == "sqlite+aiosqlite:///./agendia.db"
+    assert url_assincrona("postgresql+psycopg2://u:s@host/agendia") == "postgresql+asyncpg://u:s@host/agendia"
@@ -0,0 +1,211 @@
+import json
+from datetime import datetime, time
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from agendia.application.ports import ConflitoConcorrenciaError
+from agendia.application.use_cases import ImportarCadastroUseCase
+from agendia.core.domain import Agendamento, AgendamentoStatus, Profissional, Servico
+from agendia.infrastructure.importacao import SQLiteImportadorCadastro
+from agendia.infrastructure.models import ServicoDB, profissional_servico_association
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+TELEFONE = "+5583900000020"
+
+
+def _ndjson(*registros: dict) -> list[str]:
+    return [json.dumps(registro) + "\n" for registro in registros]
+
+
+def _importar(db_session, linhas, **kwargs):
+    tamanho_lote = kwargs.pop("tamanho_lote", ImportarCadastroUseCase.TAMANHO_LOTE)
+    use_case = ImportarCadastroUseCase(SQLiteImportadorCadastro(db_session), tamanho_lote=tamanho_lote)
+    return use_case.executar(linhas, **kwargs)
+
+
+def _contar(db_session, tabela) -> int:
+    return db_session.scalar(select(func.count()).select_from(tabela))
+
+
+def test_importa_ndjson_e_monta_os_agregados(db_session):
+    id_agendamento = uuid4()
+    resultado = _importar(db_session, _ndjson(
+        {"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana",
+         "horario_trabalho": {"0": ["09:00", "18:00"]}},
+        {"tipo": "servico", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30},
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "id": str(id_agendamento),
+         "data_hora_inicio": "2024-03-04T10:00:00", "cliente_contato": "+5511", "status": "Concluído"},
+    ))
+
+    assert resultado.linhas_com_erro == 0
+    assert (resultado.profissionais_inseridos, resultado.servicos_inseridos, resultado.vinculos_inseridos,
+            resultado.agendamentos_inseridos) == (1, 1, 1, 1)
+
+    profissional = SQLiteProfissionalRepositorio(db_session).buscar_por_telefone(TELEFONE)
+    assert profissional.horario_trabalho == {0: (time(9, 0), time(18, 0))}
+    assert profissional.servicos_oferecidos == [Servico(nome="Corte", duracao_minutos=30)]
+    [agendamento] = profissional.agendamentos
+    assert agendamento.id == id_agendamento
+    assert agendamento.status == AgendamentoStatus.CONCLUIDO
+    assert agendamento.data_hora_fim == datetime(2024, 3, 4, 10, 30)
+
+
+def test_importa_csv_e_relata_linhas_invalidas_sem_interromper(db_session):
+    linhas = [
+        "tipo,telefone_whatsapp,nome,horario_trabalho,servico,duracao_minutos,data_hora_inicio,cliente_contato\n",
+        f"profissional,{TELEFONE},Ana,0=09:00-18:00;1=09:00-12:00,,,,\n",
+        f"agendamento,{TELEFONE},,,Corte,30,2024-03-04T10:00:00,+5511\n",
+        f"agendamento,{TELEFONE},,,Barba,,2024-03-04T11:00:00,+5511\n",   # sem duração e não cadastrado
+        "agendamento,+5583000000000,,,Corte,,2024-03-04T11:00:00,+5511\n",  # profissional inexistente
+        f"agendamento,{TELEFONE},,,Corte,,amanhã,+5511\n",                 # data inválida
+        "visita,+5583000000000,,,,,,\n",                                   # tipo desconhecido
+    ]
+    resultado = _importar(db_session, linhas, formato="csv")
+
+    assert resultado.linhas_lidas == 6
+    assert resultado.agendamentos_inseridos == 1
+    assert resultado.linhas_com_erro == 4
+    assert sorted(erro.linha for erro in resultado.erros) == [4, 5, 6, 7]
+    assert any("duracao_minutos" in erro.mensagem for erro in resultado.erros)
+    profissional = SQLiteProfissionalRepositorio(db_session).buscar_por_telefone(TELEFONE)
+    assert profissional.horario_trabalho[1] == (time(9, 0), time(12, 0))
+    assert len(profissional.agendamentos) == 1
+
+
+def test_reimportar_o_mesmo_arquivo_nao_duplica_nada(db_session):
+    linhas = _ndjson(
+        {"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana"},
+        {"tipo": "servico", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30},
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "id": str(uuid4()),
+         "data_hora_inicio": "2024-03-04T10:00:00", "cliente_contato": "+5511"},
+    )
+    _importar(db_session, linhas)
+    resultado = _importar(db_session, linhas)
+
+    assert (resultado.profissionais_inseridos, resultado.servicos_inseridos, resultado.vinculos_inseridos,
+            resultado.agendamentos_inseridos) == (0, 0, 0, 0)
+    assert resultado.agendamentos_ignorados == 1
+    assert _contar(db_session, ServicoDB.__table__) == 1
+    assert _contar(db_session, profissional_servico_association) == 1
+
+
+def test_profissional_existente_so_e_atualizado_quando_pedido(db_session):
+    repositorio = SQLiteProfissionalRepositorio(db_session)
+    repositorio.salvar(Profissional(nome="Ana", telefone_whatsapp=TELEFONE))
+    linhas = _ndjson({"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana Souza",
+                      "horario_trabalho": {"2": ["08:00", "12:00"]}})
+
+    mantido = _importar(db_session, linhas)
+    assert (mantido.profissionais_inseridos, mantido.profissionais_atualizados) == (0, 0)
+    assert repositorio.buscar_por_telefone(TELEFONE).nome == "Ana"
+
+    atualizado = _importar(db_session, linhas, atualizar_existentes=True)
+    assert (atualizado.profissionais_inseridos, atualizado.profissionais_atualizados) == (0, 1)
+    db_session.expire_all()
+    profissional = repositorio.buscar_por_telefone(TELEFONE)
+    assert profissional.nome == "Ana Souza"
+    assert profissional.horario_trabalho == {2: (time(8, 0), time(12, 0))}
+
+
+def test_lotes_pequenos_resolvem_referencias_de_lotes_anteriores(db_session):
+    registros = [{"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana"}]
+    registros += [
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30,
+         "data_hora_inicio": f"2024-03-04T{hora:02d}:00:00", "cliente_contato": "+5511", "status": "Concluído"}
+        for hora in range(8, 18)
+    ]
+    resultado = _importar(db_session, _ndjson(*registros), tamanho_lote=3)
+
+    assert resultado.linhas_com_erro == 0
+    assert resultado.agendamentos_inseridos == 10
+    assert len(SQLiteProfissionalRepositorio(db_session).buscar_por_telefone(TELEFONE).agendamentos) == 10
+
+
+def test_importacao_muda_a_versao_dos_profissionais_alterados(db_session):
+    """Quem leu o profissional antes da importação não pode sobrescrevê-la ao salvar."""
+    repositorio = SQLiteProfissionalRepositorio(db_session)
+    servico = Servico(nome="Corte", duracao_minutos=30)
+    repositorio.salvar(Profissional(
+        nome="Ana", telefone_whatsapp=TELEFONE, servicos_oferecidos=[servico],
+        horario_trabalho={0: (time(9, 0), time(18, 0))},
+    ))
+    lido = repositorio.buscar_por_telefone(TELEFONE)
+
+    _importar(db_session, _ndjson(
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte",
+         "data_hora_inicio": "2024-03-04T10:00:00", "cliente_contato": "+5511", "status": "Concluído"},
+    ))
+
+    assert repositorio.obter_versao(lido.id) == lido.versao + 1
+    lido.adicionar_novo_agendamento(Agendamento(
+        servico=servico, data_hora_inicio=datetime(2030, 3, 4, 10, 0), cliente_contato="+5522"
+    ))
+    with pytest.raises(ConflitoConcorrenciaError):
+        repositorio.salvar(lido)
+
+
+def test_confirmados_sobrepostos_sao_recusados(db_session):
+    repositorio = SQLiteProfissionalRepositorio(db_session)
+    servico = Servico(nome="Corte", duracao_minutos=30)
+    profissional = Profissional(
+        nome="Ana", telefone_whatsapp=TELEFONE, servicos_oferecidos=[servico],
+        horario_trabalho={dia: (time(9, 0), time(18, 0)) for dia in range(7)},
+    )
+    profissional.adicionar_novo_agendamento(Agendamento(
+        servico=servico, data_hora_inicio=datetime(2030, 3, 4, 9, 0), cliente_contato="+5500"
+    ))
+    repositorio.salvar(profissional)
+
+    def confirmado(inicio: str) -> dict:
+        return {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "id": str(uuid4()),
+                "data_hora_inicio": inicio, "cliente_contato": "+5511", "status": "Confirmado"}
+
+    resultado = _importar(db_session, _ndjson(
+        confirmado("2030-03-04T10:00:00"),
+        confirmado("2030-03-04T10:00:00"),  # duplicada no próprio arquivo
+        confirmado("2030-03-04T09:15:00"),  # sobrepõe o já agendado
+        confirmado("2030-03-04T10:30:00"),  # encosta no da linha 1: aceito
+        {**confirmado("2030-03-04T10:00:00"), "status": "Cancelado", "data_hora_inicio": "2024-03-04T10:00:00"},
+    ))
+
+    assert resultado.agendamentos_inseridos == 3
+    assert sorted(erro.linha for erro in resultado.erros) == [2, 3]
+    db_session.expire_all()
+    confirmados = [ag for ag in repositorio.buscar_por_telefone(TELEFONE).agendamentos
+                   if ag.status == AgendamentoStatus.CONFIRMADO]
+    assert sorted(ag.data_hora_inicio.time() for ag in confirmados) == [time(9, 0), time(10, 0), time(10, 30)]
+
+
+def test_encerrado_que_ainda_nao_terminou_e_recusado(db_session):
+    resultado = _importar(db_session, _ndjson(
+        {"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana"},
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30,
+         "data_hora_inicio": "2030-03-04T10:00:00", "cliente_contato": "+5511", "status": "Concluído"},
+    ))
+
+    assert resultado.agendamentos_inseridos == 0
+    assert [erro.linha for erro in resultado.erros] == [2]
+
+
+def test_duracao_diferente_da_do_servico_conhecido_e_recusada(db_session):
+    """O agendamento é lido de volta com a duração do serviço: importá-lo com outra mudaria o horário."""
+    resultado = _importar(db_session, _ndjson(
+        {"tipo": "profissional", "telefone_whatsapp": TELEFONE, "nome": "Ana"},
+        {"tipo": "servico", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30},
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 90,
+         "data_hora_inicio": "2030-03-04T10:00:00", "cliente_contato": "+5511"},
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 30,
+         "data_hora_inicio": "2030-03-04T10:30:00", "cliente_contato": "+5522"},
+    ))
+    reimportado = _importar(db_session, _ndjson(
+        {"tipo": "agendamento", "telefone_whatsapp": TELEFONE, "servico": "Corte", "duracao_minutos": 45,
+         "data_hora_inicio": "2030-03-04T11:00:00", "cliente_contato": "+5533"},
+    ))
+
+    assert [erro.linha for erro in resultado.erros] == [3]
+    assert "30 minutos" in resultado.erros[0].mensagem
+    assert [erro.linha for erro in reimportado.erros] == [1]
+    [agendamento] = SQLiteProfissionalRepositorio(db_session).buscar_por_telefone(TELEFONE).agendamentos
+    assert agendamento.data_hora_fim == datetime(2030, 3, 4, 11, 0)
@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta
+
+from agendia.core.domain import Agendamento, Profissional, Servico
+from agendia.infrastructure.lembretes import AgendadorLembretes
+from agendia.infrastructure.models import NotificacaoDB
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+INICIO = datetime(2025, 6, 10, 10, 0)
+CORTE = Servico(nome="Corte", duracao_minutos=30)
+
+
+def _profissional_com_agendamentos(db_session, *horarios: datetime) -> Profissional:
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000001", servicos_oferecidos=[CORTE],
+        horario_trabalho={dia: (time(8, 0), time(20, 0)) for dia in range(7)},
+    )
+    for i, horario in enumerate(horarios):
+        profissional.adicionar_novo_agendamento(
+            Agendamento(servico=CORTE, data_hora_inicio=horario, cliente_contato=f"+558391111000{i}")
+        )
+    SQLiteProfissionalRepositorio(session=db_session).salvar(profissional)
+    return profissional
+
+
+def _lembretes(db_session) -> list[tuple[str, str]]:
+    db_session.expire_all()
+    return sorted((n.numero_destino, n.texto) for n in db_session.query(NotificacaoDB))
+
+
+def test_lembretes_de_24h_e_2h_sao_enfileirados_quando_vencem(db_session, session_factory):
+    _profissional_com_agendamentos(db_session, INICIO)
+    agendador = AgendadorLembretes(session_factory, intervalo_segundos=60)
+
+    assert agendador.processar(INICIO - timedelta(hours=25)) == 0
+    assert agendador.processar(INICIO - timedelta(hours=24)) == 1
+    assert agendador.processar(INICIO - timedelta(hours=3)) == 0
+    assert agendador.processar(INICIO - timedelta(hours=2)) == 1
+    assert agendador.processar(INICIO + timedelta(hours=1)) == 0
+
+    textos = [texto for _, texto in _lembretes(db_session)]
+    assert sorted(textos) == [
+        "Olá! ⏰ Lembrete: seu horário para o serviço 'Corte' com Barbeiro é amanhã às 10:00.",
+        "Olá! ⏰ Lembrete: seu horário para o serviço 'Corte' com Barbeiro é hoje às 10:00.",
+    ]
+
+
+def test_cancelamentos_e_novos_agendamentos_sao_percebidos_sem_recarregar(db_session, session_factory):
+    profissional = _profissional_com_agendamentos(db_session, INICIO)
+    agendador = AgendadorLembretes(session_factory, intervalo_segundos=3600)
+    assert agendador.processar(INICIO - timedelta(hours=25)) == 0  # Carrega o agendamento no heap
+
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    profissional = repositorio.buscar_por_id(profissional.id)
+    profissional.cancelar_agendamento(profissional.agendamentos[0].id)
+    profissional.adicionar_novo_agendamento(
+        Agendamento(servico=CORTE, data_hora_inicio=INICIO + timedelta(hours=1), cliente_contato="+5583922220000")
+    )
+    repositorio.salvar(profissional)
+
+    # O cancelado não recebe lembrete; o novo, feito com menos de 24h de antecedência, recebe só o de 2h.
+    assert agendador.processar(INICIO - timedelta(hours=22)) == 0
+    assert agendador.processar(INICIO - timedelta(hours=1)) == 1
+    assert _lembretes(db_session) == [
+        ("+5583922220000", "Olá! ⏰ Lembrete: seu horário para o serviço 'Corte' com Barbeiro é hoje às 11:00."),
+    ]
+
+
+def test_so_o_lembrete_mais_proximo_sai_quando_varios_venceram(db_session, session_factory):
+    _profissional_com_agendamentos(db_session, INICIO)
+    agendador = AgendadorLembretes(session_factory, intervalo_segundos=60)
+
+    # Ex.: processo fora do ar entre os dois disparos.
+    assert agendador.processar(INICIO - timedelta(hours=1)) == 1
+    assert _lembretes(db_session)[0][1].endswith("é hoje às 10:00.")
+
+
+def test_reinicio_nao_repete_lembretes_ja_enfileirados(db_session, session_factory):
+    _profissional_com_agendamentos(db_session, INICIO)
+    AgendadorLembretes(session_factory).processar(INICIO - timedelta(hours=24))
+
+    AgendadorLembretes(session_factory).processar(INICIO - timedelta(hours=23))
+
+    assert len(_lembretes(db_session)) == 1
@@ -0,0 +1,92 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from agendia.infrastructure import metricas
+from agendia.infrastructure.database import criar_engine
+from agendia.infrastructure.metricas import MiddlewareMetricas, RegistroMetricas, RepositorioMedido, instrumentar_engine
+
+
+def test_exporta_contadores_e_histogramas_no_formato_do_prometheus():
+    registro = RegistroMetricas()
+    contador = registro.contador("teste_total", "Contador de teste.", ("rota",))
+    histograma = registro.histograma("teste_segundos", "Histograma de teste.", ("rota",), limites=(0.1, 1.0))
+    contador.incrementar('/a"b')
+    contador.incrementar('/a"b', valor=2)
+    histograma.observar(0.05, "/x")
+    histograma.observar(0.5, "/x")
+    histograma.observar(3.0, "/x")
+
+    assert registro.exportar().splitlines() == [
+        "# HELP teste_total Contador de teste.",
+        "# TYPE teste_total counter",
+        'teste_total{rota="/a\\"b"} 3',
+        "# HELP teste_segundos Histograma de teste.",
+        "# TYPE teste_segundos histogram",
+        'teste_segundos_bucket{rota="/x",le="0.1"} 1',
+        'teste_segundos_bucket{rota="/x",le="1"} 2',
+        'teste_segundos_bucket{rota="/x",le="+Inf"} 3',
+        'teste_segundos_sum{rota="/x"} 3.55',
+        'teste_segundos_count{rota="/x"} 3',
+    ]
+
+
+def test_engine_instrumentado_conta_comandos_por_tipo(tmp_path):
+    engine = criar_engine(f"sqlite:///{tmp_path / 'agendia.db'}")
+    instrumentar_engine(engine)  # Idempotente: 'criar_engine' já instrumentou
+    antes = metricas.comandos_sql.valor("select")
+    try:
+        with engine.connect() as conexao:
+            conexao.execute(text("SELECT 1"))
+            conexao.execute(text("select 2"))
+    finally:
+        engine.dispose()
+
+    assert metricas.comandos_sql.valor("select") - antes == 2
+
+
+def test_middleware_mede_requisicoes_pela_rota_e_atribui_o_sql_a_elas(tmp_path):
+    engine = criar_engine(f"sqlite:///{tmp_path / 'agendia.db'}")
+    app = FastAPI()
+    app.add_middleware(MiddlewareMetricas)
+
+    @app.get("/teste-metricas/{item}")
+    def consultar(item: int):
+        with engine.connect() as conexao:
+            for _ in range(item):
+                conexao.execute(text("SELECT 1"))
+        return {"item": item}
+
+    rota = "/teste-metricas/{item}"
+    requisicoes_antes = metricas.requisicoes.valor("GET", rota, "200")
+    sem_rota_antes = metricas.requisicoes.valor("GET", "(sem rota)", "404")
+    try:
+        with TestClient(app) as cliente:
+            assert cliente.get("/teste-metricas/3").status_code == 200
+            assert cliente.get("/teste-metricas/0").status_code == 200
+            assert cliente.get("/nao-existe/123").status_code == 404
+    finally:
+        engine.dispose()
+
+    assert metricas.requisicoes.valor("GET", rota, "200") - requisicoes_antes == 2
+    assert metricas.requisicoes.valor("GET", "(sem rota)", "404") - sem_rota_antes == 1
+    # A rota síncrona roda em uma thread que herda o contexto da requisição: o SQL dela é atribuído à rota.
+    saida = metricas.registro.exportar()
+    assert f'agendia_http_requisicao_sql_comandos_sum{{rota="{rota}"}} 3' in saida
+    assert f'agendia_http_requisicao_sql_comandos_count{{rota="{rota}"}} 2' in saida
+
+
+def test_repositorio_medido_cronometra_metodos_e_repassa_resultados():
+    class Repositorio:
+        limite = 10
+
+        def buscar(self, chave):
+            return chave * 2
+
+    repositorio = RepositorioMedido(Repositorio())
+    antes = metricas.duracao_repositorio.contagem("buscar")
+
+    assert repositorio.buscar(4) == 8
+    assert repositorio.buscar(5) == 10
+    assert repositorio.limite == 10
+    assert metricas.duracao_repositorio.contagem("buscar") - antes == 2
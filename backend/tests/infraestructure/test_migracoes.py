@@ -0,0 +1,95 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from agendia.core.domain import Agendamento
+from agendia.infrastructure.database import Base
+from agendia.infrastructure.migracoes import VERSAO_ATUAL, migrar, versao_esquema
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+# Esquema gravado pela primeira versão da API (o do 'agendia.db' versionado no repositório).
+ESQUEMA_INICIAL = [
+    "CREATE TABLE profissionais (id UUID NOT NULL, nome VARCHAR, telefone_whatsapp VARCHAR,"
+    " horario_trabalho JSON, PRIMARY KEY (id))",
+    "CREATE UNIQUE INDEX ix_profissionais_telefone_whatsapp ON profissionais (telefone_whatsapp)",
+    "CREATE INDEX ix_profissionais_nome ON profissionais (nome)",
+    "CREATE TABLE servicos (id UUID NOT NULL, nome VARCHAR, duracao_minutos INTEGER, PRIMARY KEY (id))",
+    "CREATE UNIQUE INDEX ix_servicos_nome ON servicos (nome)",
+    "CREATE TABLE profissional_servico (profissional_id UUID, servico_id UUID,"
+    " FOREIGN KEY(profissional_id) REFERENCES profissionais (id), FOREIGN KEY(servico_id) REFERENCES servicos (id))",
+    "CREATE TABLE agendamentos (id UUID NOT NULL, cliente_contato VARCHAR, data_hora_inicio DATETIME,"
+    " data_hora_fim DATETIME, status VARCHAR(10), servico_id UUID, profissional_id UUID, PRIMARY KEY (id),"
+    " FOREIGN KEY(servico_id) REFERENCES servicos (id), FOREIGN KEY(profissional_id) REFERENCES profissionais (id))",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'agendia.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _banco_da_primeira_versao(engine):
+    id_profissional, id_servico = uuid4(), uuid4()
+    with engine.begin() as conexao:
+        for ddl in ESQUEMA_INICIAL:
+            conexao.execute(text(ddl))
+        conexao.execute(text(
+            "INSERT INTO profissionais VALUES (:id, 'Ana', '+5583900000001', '{\"0\": [\"09:00\", \"18:00\"]}')"
+        ), {"id": id_profissional.hex})
+        conexao.execute(text("INSERT INTO servicos VALUES (:id, 'Corte', 30)"), {"id": id_servico.hex})
+        conexao.execute(text("INSERT INTO profissional_servico VALUES (:p, :s)"),
+                        {"p": id_profissional.hex, "s": id_servico.hex})
+        conexao.execute(text(
+            "INSERT INTO agendamentos VALUES (:id, '+5511', '2030-03-04 09:00:00.000000', '2030-03-04 09:30:00.000000',"
+            " 'CONFIRMADO', :s, :p)"
+        ), {"id": uuid4().hex, "s": id_servico.hex, "p": id_profissional.hex})
+    return id_profissional
+
+
+def test_banco_da_primeira_versao_e_migrado_e_volta_a_ser_usado(engine):
+    id_profissional = _banco_da_primeira_versao(engine)
+
+    with engine.begin() as conexao:
+        assert migrar(conexao) == VERSAO_ATUAL
+    with engine.begin() as conexao:
+        assert migrar(conexao) == 0
+        assert conexao.scalar(versao_esquema.select()) == VERSAO_ATUAL
+
+    inspetor = inspect(engine)
+    assert set(Base.metadata.tables) <= set(inspetor.get_table_names())
+    for nome, tabela in Base.metadata.tables.items():
+        assert {c["name"] for c in inspetor.get_columns(nome)} == set(tabela.columns.keys())
+        assert {i["name"] for i in inspetor.get_indexes(nome)} >= {i.name for i in tabela.indexes}
+
+    with Session(engine) as session:
+        repositorio = SQLiteProfissionalRepositorio(session)
+        profissional = repositorio.buscar_por_id(id_profissional)
+        assert profissional.versao == 1
+        assert len(profissional.agendamentos) == 1
+        profissional.adicionar_novo_agendamento(Agendamento(
+            servico=profissional.servicos_oferecidos[0], data_hora_inicio=datetime(2030, 3, 4, 9, 30),
+            cliente_contato="+5522",
+        ))
+        repositorio.salvar(profissional)
+        assert repositorio.obter_versao(id_profissional) == 2
+
+
+def test_banco_vazio_e_criado_na_versao_atual(engine):
+    with engine.begin() as conexao:
+        assert migrar(conexao) == 0
+        assert conexao.scalar(versao_esquema.select()) == VERSAO_ATUAL
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+
+
+def test_banco_de_versao_mais_nova_nao_e_tocado(engine):
+    with engine.begin() as conexao:
+        migrar(conexao)
+        conexao.execute(versao_esquema.update().values(versao=VERSAO_ATUAL + 1))
+
+    with pytest.raises(RuntimeError), engine.begin() as conexao:
+        migrar(conexao)
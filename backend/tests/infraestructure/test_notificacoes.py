@@ -0,0 +1,146 @@
+import threading
+from datetime import datetime, time, timedelta
+
+from agendia.application.ports import IWhatsAppAdapter, EnvioMensagemError
+from agendia.application.use_cases import RealizarAgendamentoUseCase, AgendamentoInput
+from agendia.core.domain import Profissional, Servico
+from agendia.infrastructure.models import NotificacaoDB, NotificacaoStatus
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes, DespachanteNotificacoes
+from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
+
+
+class WhatsAppFalso(IWhatsAppAdapter):
+    """Registra as mensagens enviadas e falha para os números configurados."""
+
+    def __init__(self, falhar_para: set[str] | None = None, esperadas: int | None = None):
+        self.enviadas: list[tuple[str, str]] = []
+        self.falhar_para = falhar_para or set()
+        # Sinalizado quando 'esperadas' mensagens tiverem sido enviadas.
+        self.concluido = threading.Event()
+        self.esperadas = esperadas
+        self._lock = threading.Lock()
+
+    def enviar_texto(self, numero_destino: str, texto: str) -> None:
+        if numero_destino in self.falhar_para:
+            raise EnvioMensagemError("WhatsApp indisponível")
+        with self._lock:
+            self.enviadas.append((numero_destino, texto))
+            if self.esperadas is not None and len(self.enviadas) >= self.esperadas:
+                self.concluido.set()
+
+
+def _enfileirar(db_session, *mensagens: tuple[str, str]):
+    fila = SQLiteFilaNotificacoes(session=db_session)
+    for numero_destino, texto in mensagens:
+        fila.enfileirar(numero_destino, texto)
+    db_session.commit()
+
+
+def _status(db_session) -> dict[str, NotificacaoStatus]:
+    db_session.expire_all()
+    return {n.texto: n.status for n in db_session.query(NotificacaoDB)}
+
+
+def test_confirmacao_e_gravada_na_mesma_transacao_do_agendamento(db_session):
+    """O agendamento e a mensagem de confirmação devem ser gravados juntos, sem envio síncrono."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000001",
+        servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+        horario_trabalho={0: (time(9, 0), time(18, 0))},
+    )
+    repositorio.salvar(profissional)
+
+    use_case = RealizarAgendamentoUseCase(repositorio=repositorio, fila_notificacoes=SQLiteFilaNotificacoes(db_session))
+    use_case.executar(AgendamentoInput(
+        profissional_id=profissional.id, cliente_contato="+5583911112222",
+        nome_servico="Corte", data_hora_inicio=datetime(2025, 6, 9, 10, 0),
+    ))
+    db_session.rollback()  # Nada pendente na sessão: tudo já foi gravado pelo commit do repositório
+
+    notificacao = db_session.query(NotificacaoDB).one()
+    assert notificacao.numero_destino == "+5583911112222"
+    assert notificacao.status == NotificacaoStatus.PENDENTE
+    assert "Corte" in notificacao.texto
+
+
+def test_despachante_envia_pendentes_em_ordem_por_destinatario(db_session, session_factory):
+    _enfileirar(db_session, ("+551", "a1"), ("+552", "b1"), ("+551", "a2"), ("+551", "a3"))
+    whatsapp = WhatsAppFalso()
+    despachante = DespachanteNotificacoes(session_factory=session_factory, whatsapp_adapter=whatsapp)
+
+    assert despachante.processar_pendentes() == 4
+    assert despachante.processar_pendentes() == 0
+
+    assert [texto for numero, texto in whatsapp.enviadas if numero == "+551"] == ["a1", "a2", "a3"]
+    assert set(_status(db_session).values()) == {NotificacaoStatus.ENVIADA}
+
+
+def test_despachante_reagenda_falhas_com_backoff_e_segura_mensagens_seguintes(db_session, session_factory):
+    _enfileirar(db_session, ("+551", "a1"), ("+551", "a2"), ("+552", "b1"))
+    whatsapp = WhatsAppFalso(falhar_para={"+551"})
+    despachante = DespachanteNotificacoes(
+        session_factory=session_factory, whatsapp_adapter=whatsapp, backoff_base_segundos=60
+    )
+
+    despachante.processar_pendentes()
+
+    status = _status(db_session)
+    assert status == {"a1": NotificacaoStatus.PENDENTE, "a2": NotificacaoStatus.PENDENTE, "b1": NotificacaoStatus.ENVIADA}
+    falha = db_session.query(NotificacaoDB).filter_by(texto="a1").one()
+    assert falha.tentativas == 1
+    assert falha.ultimo_erro == "WhatsApp indisponível"
+    assert falha.proxima_tentativa_em > datetime.now() + timedelta(seconds=50)
+
+    # Enquanto 'a1' aguarda nova tentativa, 'a2' não pode sair antes dela.
+    whatsapp.falhar_para.clear()
+    assert despachante.processar_pendentes() == 0
+    assert whatsapp.enviadas == [("+552", "b1")]
+
+
+def test_destinatario_em_backoff_nao_ocupa_o_lote_dos_demais(db_session, session_factory):
+    # '+551' acumula mais mensagens do que cabem em um lote; '+552' vem depois de todas.
+    _enfileirar(db_session, *[("+551", f"a{i}") for i in range(5)], ("+552", "b1"))
+    whatsapp = WhatsAppFalso(falhar_para={"+551"})
+    despachante = DespachanteNotificacoes(
+        session_factory=session_factory, whatsapp_adapter=whatsapp, tamanho_lote=2, backoff_base_segundos=60
+    )
+
+    despachante.processar_pendentes()  # 'a0' falha e entra em backoff
+    despachante.processar_pendentes()
+
+    assert whatsapp.enviadas == [("+552", "b1")]
+    assert _status(db_session)["a0"] == NotificacaoStatus.PENDENTE
+
+
+def test_despachante_desiste_apos_maximo_de_tentativas(db_session, session_factory):
+    _enfileirar(db_session, ("+551", "a1"))
+    despachante = DespachanteNotificacoes(
+        session_factory=session_factory, whatsapp_adapter=WhatsAppFalso(falhar_para={"+551"}),
+        max_tentativas=2, backoff_base_segundos=0,
+    )
+
+    despachante.processar_pendentes()
+    despachante.processar_pendentes()
+
+    notificacao = db_session.query(NotificacaoDB).one()
+    db_session.refresh(notificacao)
+    assert notificacao.status == NotificacaoStatus.FALHOU
+    assert notificacao.tentativas == 2
+    assert despachante.processar_pendentes() == 0
+
+
+def test_despachante_em_segundo_plano_esvazia_a_fila(db_session, session_factory):
+    _enfileirar(db_session, *[(f"+55{i % 3}", f"m{i}") for i in range(10)])
+    whatsapp = WhatsAppFalso(esperadas=10)
+    despachante = DespachanteNotificacoes(
+        session_factory=session_factory, whatsapp_adapter=whatsapp, intervalo_segundos=0.01, workers=3
+    )
+
+    despachante.iniciar()
+    try:
+        whatsapp.concluido.wait(timeout=5)
+    finally:
+        despachante.parar()
+
+    assert len(whatsapp.enviadas) == 10
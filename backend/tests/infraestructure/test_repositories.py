@@ -1,6 +1,10 @@
 from uuid import uuid4
-from datetime import time
-from agendia.core.domain import Profissional, Servico
+from datetime import date, datetime, time, timedelta
+import pytest
+from sqlalchemy import event
+from agendia.application.ports import ConflitoConcorrenciaError
+from agendia.core.domain import Profissional, Servico, Agendamento, AgendamentoStatus, CalendarioTrabalho
+from agendia.infrastructure.models import AgendamentoDB, ServicoDB
 from agendia.infrastructure.repositories import SQLiteProfissionalRepositorio
 
 def test_salvar_e_buscar_profissional(db_session):
@@ -17,6 +21,7 @@ def test_salvar_e_buscar_profissional(db_session):
     profissional_domain = Profissional(
         id=id_profissional,
         nome="Terapeuta Zen",
+        telefone_whatsapp="+5583900000003",
         servicos_oferecidos=[servico_domain],
         horario_trabalho={1: (time(10, 0), time(19, 0))} # Trabalha às terças
     )
@@ -34,4 +39,377 @@ def test_salvar_e_buscar_profissional(db_session):
     assert profissional_recuperado.nome == "Terapeuta Zen"
     assert len(profissional_recuperado.servicos_oferecidos) == 1
     assert profissional_recuperado.servicos_oferecidos[0].nome == "Massagem Relaxante"
-    assert profissional_recuperado.horario_trabalho[1][0] == time(10, 0)
\ No newline at end of file
+    assert profissional_recuperado.horario_trabalho[1][0] == time(10, 0)
+
+def test_buscar_por_id_com_janela_carrega_apenas_agendamentos_sobrepostos(db_session):
+    """
+    Com uma janela informada, apenas os agendamentos que se sobrepõem a ela
+    devem ser carregados no agregado.
+    """
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    servico_domain = Servico(nome="Corte", duracao_minutos=60)
+    profissional_domain = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000004", servicos_oferecidos=[servico_domain]
+    )
+    repositorio.salvar(profissional_domain)
+    servico_db = db_session.query(ServicoDB).filter_by(nome="Corte").one()
+
+    inicios = [
+        datetime(2024, 1, 10, 10, 0),   # Histórico antigo
+        datetime(2025, 6, 8, 23, 30),   # Começa antes, termina dentro da janela
+        datetime(2025, 6, 9, 9, 0),     # Dentro da janela
+        datetime(2025, 6, 10, 9, 0),    # Depois da janela
+    ]
+    for inicio in inicios:
+        db_session.add(AgendamentoDB(
+            profissional_id=profissional_domain.id, servico_id=servico_db.id, cliente_contato="c",
+            data_hora_inicio=inicio, data_hora_fim=inicio + timedelta(minutes=60),
+            status=AgendamentoStatus.CONFIRMADO,
+        ))
+    db_session.commit()
+
+    janela = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+    por_id = repositorio.buscar_por_id(profissional_domain.id, janela=janela)
+    por_telefone = repositorio.buscar_por_telefone("+5583900000004", janela=janela)
+    completo = repositorio.buscar_por_id(profissional_domain.id)
+
+    esperados = [datetime(2025, 6, 8, 23, 30), datetime(2025, 6, 9, 9, 0)]
+    assert [ag.data_hora_inicio for ag in por_id.agendamentos] == esperados
+    assert [ag.data_hora_inicio for ag in por_telefone.agendamentos] == esperados
+    assert por_id.servicos_oferecidos[0].nome == "Corte"
+    assert len(completo.agendamentos) == 4
+
+
+def test_buscar_somente_ocupacao_permite_reservar_sem_materializar_agendamentos(db_session):
+    """A leitura compacta bloqueia os horários ocupados e o novo agendamento é gravado normalmente."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    corte = Servico(nome="Corte", duracao_minutos=60)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000005", servicos_oferecidos=[corte],
+        horario_trabalho={0: (time(8, 0), time(20, 0))},
+    )
+    for hora, status in ((9, AgendamentoStatus.CONFIRMADO), (11, AgendamentoStatus.CANCELADO)):
+        agendamento = Agendamento(servico=corte, data_hora_inicio=datetime(2025, 6, 9, hora, 0), cliente_contato="c")
+        agendamento.status = status
+        profissional.agendamentos.append(agendamento)
+    repositorio.salvar(profissional)
+
+    janela = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+    carregado = repositorio.buscar_por_id(profissional.id, janela=janela, somente_ocupacao=True)
+
+    assert carregado.agendamentos == []
+    assert carregado.ocupacao.intervalos(*janela) == [(datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 10, 0))]
+    assert carregado.esta_disponivel(datetime(2025, 6, 9, 9, 30), 60) is False
+    assert carregado.esta_disponivel(datetime(2025, 6, 9, 11, 0), 60) is True
+
+    carregado.adicionar_novo_agendamento(
+        Agendamento(servico=corte, data_hora_inicio=datetime(2025, 6, 9, 11, 0), cliente_contato="novo")
+    )
+    repositorio.salvar(carregado)
+    db_session.expire_all()
+    assert len(repositorio.buscar_por_id(profissional.id).agendamentos) == 3
+
+
+def _contar_comandos_sql(db_session, acao) -> int:
+    """Executa 'acao' e retorna quantos comandos SQL foram emitidos."""
+    comandos = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+    event.listen(db_session.bind, "before_cursor_execute", registrar)
+    try:
+        acao()
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", registrar)
+    return len(comandos)
+
+
+def _salvar_agendamento_em_profissional_com(db_session, total_servicos: int) -> int:
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    servicos = [Servico(nome=f"Servico {i:03d}", duracao_minutos=30) for i in range(total_servicos)]
+    profissional = Profissional(
+        nome="Salão", telefone_whatsapp=f"+55839{total_servicos:08d}", servicos_oferecidos=servicos,
+        horario_trabalho={0: (time(8, 0), time(20, 0))},
+    )
+    repositorio.salvar(profissional)
+
+    janela = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+    carregado = repositorio.buscar_por_id(profissional.id, janela=janela)
+    carregado.adicionar_novo_agendamento(
+        Agendamento(servico=servicos[0], data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="c")
+    )
+    return _contar_comandos_sql(db_session, lambda: repositorio.salvar(carregado))
+
+
+def test_salvar_apos_agendamento_emite_numero_constante_de_comandos(db_session):
+    """O custo de salvar um novo agendamento não deve depender do número de serviços."""
+    com_poucos_servicos = _salvar_agendamento_em_profissional_com(db_session, 2)
+    com_muitos_servicos = _salvar_agendamento_em_profissional_com(db_session, 40)
+
+    assert com_poucos_servicos == com_muitos_servicos
+    assert com_muitos_servicos == 2  # O INSERT do novo agendamento e o UPDATE da versão
+
+
+def test_salvar_persiste_agendamentos_novos_e_modificados(db_session):
+    """Agendamentos novos devem ser inseridos e mudanças de status, atualizadas."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    corte = Servico(nome="Corte", duracao_minutos=30)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000005", servicos_oferecidos=[corte],
+        horario_trabalho={0: (time(9, 0), time(18, 0))},
+    )
+    agendamento = Agendamento(servico=corte, data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="c")
+    profissional.adicionar_novo_agendamento(agendamento)
+    repositorio.salvar(profissional)
+
+    outro_repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    carregado = outro_repositorio.buscar_por_id(profissional.id)
+    assert [ag.id for ag in carregado.agendamentos] == [agendamento.id]
+    assert carregado.agendamentos[0].data_hora_fim == datetime(2025, 6, 9, 10, 30)
+
+    carregado.cancelar_agendamento(agendamento.id)
+    outro_repositorio.salvar(carregado)
+
+    status_db = db_session.query(AgendamentoDB.status).filter_by(id=agendamento.id).scalar()
+    assert status_db == AgendamentoStatus.CANCELADO
+    assert db_session.query(AgendamentoDB).count() == 1
+
+
+def test_salvar_com_versao_desatualizada_levanta_conflito(db_session):
+    """Quem gravar a partir de uma leitura antiga não deve sobrescrever a gravação mais recente."""
+    corte = Servico(nome="Corte", duracao_minutos=30)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000007", servicos_oferecidos=[corte],
+        horario_trabalho={0: (time(9, 0), time(18, 0))},
+    )
+    SQLiteProfissionalRepositorio(session=db_session).salvar(profissional)
+    primeiro = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    segundo = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+
+    primeiro.adicionar_novo_agendamento(
+        Agendamento(servico=corte, data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="a")
+    )
+    SQLiteProfissionalRepositorio(session=db_session).salvar(primeiro)
+    segundo.adicionar_novo_agendamento(
+        Agendamento(servico=corte, data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="b")
+    )
+    with pytest.raises(ConflitoConcorrenciaError):
+        SQLiteProfissionalRepositorio(session=db_session).salvar(segundo)
+
+    assert db_session.query(AgendamentoDB.cliente_contato).all() == [("a",)]
+    assert SQLiteProfissionalRepositorio(session=db_session).obter_versao(profissional.id) == 2
+
+
+def test_salvar_atualiza_associacao_de_servicos(db_session):
+    """Serviços adicionados/removidos devem refletir na associação, reaproveitando serviços existentes."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    profissional = Profissional(
+        nome="Manicure", telefone_whatsapp="+5583900000006",
+        servicos_oferecidos=[Servico(nome="Manicure", duracao_minutos=40), Servico(nome="Pedicure", duracao_minutos=40)],
+    )
+    repositorio.salvar(profissional)
+
+    profissional.servicos_oferecidos = [Servico(nome="Pedicure", duracao_minutos=40), Servico(nome="Spa dos pés", duracao_minutos=60)]
+    repositorio.salvar(profissional)
+
+    recuperado = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    assert sorted(s.nome for s in recuperado.servicos_oferecidos) == ["Pedicure", "Spa dos pés"]
+    assert db_session.query(ServicoDB).count() == 3
+
+
+def test_listar_resumos_pagina_por_chave_em_uma_consulta(db_session):
+    """A listagem deve usar uma única consulta por página, sem carregar serviços ou agendamentos."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    for i in range(5):
+        repositorio.salvar(Profissional(
+            nome=f"Profissional {i}", telefone_whatsapp=f"+558390000010{i}",
+            servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+        ))
+
+    paginas = []
+    consultas = _contar_comandos_sql(db_session, lambda: paginas.append(repositorio.listar_resumos(limit=2)))
+    paginas.append(repositorio.listar_resumos(after_id=paginas[-1][-1].id, limit=2))
+    paginas.append(repositorio.listar_resumos(after_id=paginas[-1][-1].id, limit=2))
+
+    assert consultas == 1
+    assert [len(pagina) for pagina in paginas] == [2, 2, 1]
+    ids = [resumo.id for pagina in paginas for resumo in pagina]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    assert [r.id for r in repositorio.iterar_resumos(tamanho_lote=2)] == ids
+
+
+def test_iterar_agendamentos_percorre_a_janela_em_lotes_sem_carregar_o_agregado(db_session):
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    servico = Servico(nome="Corte", duracao_minutos=60)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000005", servicos_oferecidos=[servico],
+        horario_trabalho={dia: (time(0, 0), time(23, 59)) for dia in range(7)},
+    )
+    for dia in range(1, 11):
+        profissional.adicionar_novo_agendamento(
+            Agendamento(servico=servico, data_hora_inicio=datetime(2025, 6, dia, 10, 0), cliente_contato=f"c{dia}")
+        )
+    profissional.agendamentos[3].cancelar()
+    repositorio.salvar(profissional)
+    db_session.expunge_all()
+
+    janela = (datetime(2025, 6, 3), datetime(2025, 6, 8))
+    agendamentos = []
+    comandos = _contar_comandos_sql(
+        db_session, lambda: agendamentos.extend(repositorio.iterar_agendamentos(profissional.id, janela, tamanho_lote=2))
+    )
+
+    assert comandos == 1
+    assert [ag.data_hora_inicio.day for ag in agendamentos] == [3, 4, 5, 6, 7]
+    assert agendamentos[1].status == AgendamentoStatus.CANCELADO
+    assert agendamentos[0].data_hora_fim == datetime(2025, 6, 3, 11, 0)
+    assert len(db_session.identity_map) == 0
+
+
+def test_listar_agendamentos_filtra_periodo_e_status_em_uma_consulta(db_session):
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    servico = Servico(nome="Corte", duracao_minutos=60)
+    profissional = Profissional(
+        nome="Barbeiro", telefone_whatsapp="+5583900000007", servicos_oferecidos=[servico],
+        horario_trabalho={dia: (time(0, 0), time(23, 59)) for dia in range(7)},
+    )
+    for dia in (12, 10, 11, 20):
+        profissional.adicionar_novo_agendamento(
+            Agendamento(servico=servico, data_hora_inicio=datetime(2025, 6, dia, 10, 0), cliente_contato=f"c{dia}")
+        )
+    profissional.agendamentos[2].cancelar()  # dia 11
+    repositorio.salvar(profissional)
+
+    semana = (datetime(2025, 6, 9), datetime(2025, 6, 16))
+    resultados = []
+    comandos = _contar_comandos_sql(db_session, lambda: resultados.append(
+        repositorio.listar_agendamentos(profissional.id, semana, status=[AgendamentoStatus.CONFIRMADO])
+    ))
+
+    assert comandos == 1
+    assert [ag.data_hora_inicio.day for ag in resultados[0]] == [10, 12]
+    todos = repositorio.listar_agendamentos(profissional.id, semana)
+    assert [(ag.data_hora_inicio.day, ag.status) for ag in todos] == [
+        (10, AgendamentoStatus.CONFIRMADO), (11, AgendamentoStatus.CANCELADO), (12, AgendamentoStatus.CONFIRMADO),
+    ]
+    assert repositorio.listar_agendamentos(profissional.id, (datetime(2025, 7, 1), datetime(2025, 7, 8))) == []
+    assert repositorio.listar_agendamentos(uuid4(), semana) is None
+
+
+def test_obter_atualizacao_acompanha_cada_gravacao(db_session):
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    profissional = Profissional(nome="Barbeiro", telefone_whatsapp="+5583900000006")
+    assert repositorio.obter_atualizacao(profissional.id) is None
+
+    repositorio.salvar(profissional)
+    versao, atualizado_em = repositorio.obter_atualizacao(profissional.id)
+    profissional.nome = "Barbeiro Chefe"
+    repositorio.salvar(profissional)
+
+    nova_versao, novo_atualizado_em = repositorio.obter_atualizacao(profissional.id)
+    assert (versao, nova_versao) == (1, 2)
+    assert novo_atualizado_em >= atualizado_em
+
+
+def test_listar_todos_nao_dispara_consultas_por_profissional(db_session):
+    """listar_todos deve carregar as coleções em lote, independente do número de profissionais."""
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    for i in range(10):
+        repositorio.salvar(Profissional(
+            nome=f"Profissional {i}", telefone_whatsapp=f"+558390000020{i}",
+            servicos_oferecidos=[Servico(nome="Corte", duracao_minutos=30)],
+        ))
+
+    consultas = _contar_comandos_sql(db_session, repositorio.listar_todos)
+
+    assert consultas == 3
+
+
+def _cadastrar_profissionais_com_agenda(db_session, quantidade: int, prefixo: str) -> list[Profissional]:
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    manicure = Servico(nome="Manicure", duracao_minutos=60)
+    profissionais = []
+    for i in range(quantidade):
+        servicos = [manicure] if i % 3 else [Servico(nome="Corte", duracao_minutos=30)]
+        profissional = Profissional(
+            nome=f"{prefixo} {i:02d}", telefone_whatsapp=f"+55839{prefixo}{i:04d}",
+            servicos_oferecidos=servicos, horario_trabalho={0: (time(9, 0), time(18, 0))},
+        )
+        profissional.adicionar_novo_agendamento(Agendamento(
+            servico=servicos[0], data_hora_inicio=datetime(2025, 6, 9, 15, 0), cliente_contato="c"
+        ))
+        cancelado = Agendamento(servico=servicos[0], data_hora_inicio=datetime(2025, 6, 9, 10, 0), cliente_contato="d")
+        profissional.adicionar_novo_agendamento(cancelado)
+        profissional.cancelar_agendamento(cancelado.id)
+        repositorio.salvar(profissional)
+        profissionais.append(profissional)
+    return profissionais
+
+
+def test_listar_por_servico_usa_numero_fixo_de_consultas(db_session):
+    """A busca entre profissionais deve custar as mesmas consultas independente do tamanho do cadastro."""
+    janela = (datetime(2025, 6, 9, 8, 0), datetime(2025, 6, 10))
+    _cadastrar_profissionais_com_agenda(db_session, 3, "111")
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    consultas_poucos = _contar_comandos_sql(db_session, lambda: repositorio.listar_por_servico("Manicure", janela))
+
+    _cadastrar_profissionais_com_agenda(db_session, 15, "222")
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    resultado = []
+    consultas_muitos = _contar_comandos_sql(
+        db_session, lambda: resultado.extend(repositorio.listar_por_servico("Manicure", janela))
+    )
+
+    assert consultas_poucos == consultas_muitos == 2
+    assert len(resultado) == 2 + 10  # Apenas quem oferece "Manicure"
+    for profissional in resultado:
+        assert [s.nome for s in profissional.servicos_oferecidos] == ["Manicure"]
+        # O agendamento cancelado não entra; o confirmado bloqueia o horário.
+        assert [ag.data_hora_inicio for ag in profissional.agendamentos] == [datetime(2025, 6, 9, 15, 0)]
+        assert profissional.esta_disponivel(datetime(2025, 6, 9, 15, 0), 60) is False
+        assert profissional.esta_disponivel(datetime(2025, 6, 9, 10, 0), 60) is True
+
+
+def test_listar_por_servico_somente_ocupacao_usa_o_mesmo_numero_de_consultas(db_session):
+    janela = (datetime(2025, 6, 9, 8, 0), datetime(2025, 6, 10))
+    _cadastrar_profissionais_com_agenda(db_session, 15, "333")
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    resultado = []
+    consultas = _contar_comandos_sql(
+        db_session,
+        lambda: resultado.extend(repositorio.listar_por_servico("Manicure", janela, somente_ocupacao=True)),
+    )
+
+    assert consultas == 2
+    assert len(resultado) == 10
+    for profissional in resultado:
+        assert profissional.agendamentos == []
+        assert len(profissional.ocupacao) == 1
+        assert profissional.esta_disponivel(datetime(2025, 6, 9, 15, 0), 60) is False
+        assert profissional.esta_disponivel(datetime(2025, 6, 9, 10, 0), 60) is True
+
+
+def test_calendario_e_persistido_e_compilado_uma_vez_por_versao(db_session):
+    repositorio = SQLiteProfissionalRepositorio(session=db_session)
+    calendario = CalendarioTrabalho(
+        pausas={0: [(time(12, 0), time(13, 0))]},
+        feriados={date(2025, 6, 16), date(2025, 6, 2)},
+        excecoes={date(2025, 6, 23): [(time(8, 0), time(10, 0))]},
+    )
+    profissional = Profissional(
+        nome="Dra. Agenda", telefone_whatsapp="+5583900000020",
+        horario_trabalho={0: (time(8, 0), time(18, 0))}, calendario=calendario,
+    )
+    repositorio.salvar(profissional)
+
+    # Outro repositório (como em outra requisição): o JSON é convertido e compilado só na primeira leitura.
+    primeira = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    segunda = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    assert primeira.calendario == calendario
+    assert segunda.calendario_compilado() is primeira.calendario_compilado()
+    assert not segunda.esta_disponivel(datetime(2025, 6, 16, 9, 0), 30)
+
+    segunda.calendario = calendario.model_copy(update={"feriados": frozenset()})
+    repositorio.salvar(segunda)
+    terceira = SQLiteProfissionalRepositorio(session=db_session).buscar_por_id(profissional.id)
+    assert terceira.calendario_compilado() is not primeira.calendario_compilado()
+    assert terceira.esta_disponivel(datetime(2025, 6, 16, 9, 0), 30)
@@ -0,0 +1,83 @@
+from datetime import datetime, time
+
+import pytest
+
+from agendia.application.use_cases import (RealizarAgendamentoAsyncUseCase, ConsultarDisponibilidadeAsyncUseCase,
+                                           AgendamentoInput, ConsultaDisponibilidadeInput)
+from agendia.core.domain import Agendamento, Profissional, Servico
+from agendia.infrastructure.models import NotificacaoDB
+from agendia.infrastructure.notificacoes import SQLiteFilaNotificacoes
+from agendia.infrastructure.repositories import AsyncProfissionalRepositorio
+
+pytestmark = pytest.mark.anyio
+
+CORTE = Servico(nome="Corte", duracao_minutos=60)
+
+
+def _profissional(i: int = 0) -> Profissional:
+    return Profissional(
+        nome=f"Barbeiro {i}", telefone_whatsapp=f"+55839{i:08d}", servicos_oferecidos=[CORTE],
+        horario_trabalho={0: (time(9, 0), time(12, 0))},
+    )
+
+
+async def test_salvar_e_buscar_de_forma_assincrona(async_session):
+    repositorio = AsyncProfissionalRepositorio(async_session)
+    profissional = _profissional()
+    await repositorio.salvar(profissional)
+
+    por_telefone = await AsyncProfissionalRepositorio(async_session).buscar_por_telefone(profissional.telefone_whatsapp)
+    assert por_telefone.id == profissional.id
+    assert por_telefone.servicos_oferecidos == [CORTE]
+    assert await repositorio.obter_versao(profissional.id) == 1
+
+
+async def test_iterar_resumos_percorre_todas_as_paginas(async_session):
+    repositorio = AsyncProfissionalRepositorio(async_session)
+    for i in range(5):
+        await repositorio.salvar(_profissional(i))
+
+    resumos = [resumo async for resumo in repositorio.iterar_resumos(tamanho_lote=2)]
+
+    assert len(resumos) == 5
+    assert [r.id for r in resumos] == sorted(r.id for r in resumos)
+
+
+async def test_iterar_agendamentos_assincrono_usa_cursor_em_lotes(async_session):
+    repositorio = AsyncProfissionalRepositorio(async_session)
+    profissional = _profissional()
+    for hora in (9, 10, 11):
+        profissional.adicionar_novo_agendamento(
+            Agendamento(servico=CORTE, data_hora_inicio=datetime(2025, 6, 9, hora, 0), cliente_contato="c")
+        )
+    await repositorio.salvar(profissional)
+
+    janela = (datetime(2025, 6, 9), datetime(2025, 6, 10))
+    inicios = [ag.data_hora_inicio async for ag in repositorio.iterar_agendamentos(profissional.id, janela, tamanho_lote=2)]
+
+    assert [inicio.hour for inicio in inicios] == [9, 10, 11]
+    assert (await repositorio.obter_atualizacao(profissional.id))[0] == 1
+
+
+async def test_agendamento_assincrono_grava_agendamento_e_confirmacao(async_session):
+    profissional = _profissional()
+    await AsyncProfissionalRepositorio(async_session).salvar(profissional)
+
+    use_case = RealizarAgendamentoAsyncUseCase(
+        repositorio=AsyncProfissionalRepositorio(async_session),
+        fila_notificacoes=SQLiteFilaNotificacoes(session=async_session.sync_session),
+    )
+    await use_case.executar(AgendamentoInput(
+        profissional_id=profissional.id, cliente_contato="+5583911112222",
+        nome_servico="Corte", data_hora_inicio=datetime(2025, 6, 9, 10, 0),
+    ))
+
+    horarios = await ConsultarDisponibilidadeAsyncUseCase(AsyncProfissionalRepositorio(async_session)).executar(
+        ConsultaDisponibilidadeInput(
+            profissional_id=profissional.id, nome_servico="Corte",
+            data_inicio=datetime(2025, 6, 9).date(), data_fim=datetime(2025, 6, 9).date(), granularidade_minutos=60,
+        )
+    )
+    assert horarios == [datetime(2025, 6, 9, 9, 0), datetime(2025, 6, 9, 11, 0)]
+    notificacoes = await async_session.run_sync(lambda s: s.query(NotificacaoDB.numero_destino).all())
+    assert notificacoes == [("+5583911112222",)]
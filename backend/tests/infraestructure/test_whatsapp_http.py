@@ -0,0 +1,68 @@
+import pytest
+
+from agendia.application.ports import EnvioMensagemError
+from agendia.infrastructure.whatsapp import WhatsAppSobDemanda
+from agendia.infrastructure.whatsapp_http import HttpWhatsAppAdapter
+
+
+def test_enviar_texto_entrega_ao_servico(stub_whatsapp):
+    adapter = HttpWhatsAppAdapter(url_base=stub_whatsapp.url)
+
+    adapter.enviar_texto(numero_destino="+5583999998888", texto="Olá!")
+
+    assert stub_whatsapp.mensagens == [("+5583999998888", "Olá!")]
+
+
+def test_enviar_texto_reaproveita_conexoes_do_pool(stub_whatsapp):
+    adapter = HttpWhatsAppAdapter(url_base=stub_whatsapp.url)
+
+    for i in range(20):
+        adapter.enviar_texto(numero_destino="+5583999998888", texto=f"mensagem {i}")
+
+    assert len(stub_whatsapp.mensagens) == 20
+    assert stub_whatsapp.conexoes == 1
+
+
+def test_enviar_texto_levanta_erro_quando_servico_recusa(stub_whatsapp):
+    stub_whatsapp.falhar_para.add("+000")
+    adapter = HttpWhatsAppAdapter(url_base=stub_whatsapp.url)
+
+    with pytest.raises(EnvioMensagemError, match="502"):
+        adapter.enviar_texto(numero_destino="+000", texto="Olá!")
+
+
+def test_enviar_texto_levanta_erro_quando_servico_esta_fora_do_ar():
+    adapter = HttpWhatsAppAdapter(url_base="http://127.0.0.1:9", timeout_conexao_segundos=0.5)
+
+    with pytest.raises(EnvioMensagemError, match="Falha de comunicação"):
+        adapter.enviar_texto(numero_destino="+5583999998888", texto="Olá!")
+
+
+def test_enviar_lote_retorna_resultado_por_mensagem(stub_whatsapp):
+    stub_whatsapp.falhar_para.add("+000")
+    adapter = HttpWhatsAppAdapter(url_base=stub_whatsapp.url)
+
+    resultados = adapter.enviar_lote([("+551", "a"), ("+000", "b"), ("+552", "c")])
+
+    assert resultados[0] is None and resultados[2] is None
+    assert isinstance(resultados[1], EnvioMensagemError)
+    assert stub_whatsapp.mensagens == [("+551", "a"), ("+552", "c")]
+
+
+def test_adaptador_sob_demanda_so_e_criado_no_primeiro_envio(stub_whatsapp):
+    criados = []
+
+    def fabrica():
+        criados.append(HttpWhatsAppAdapter(url_base=stub_whatsapp.url))
+        return criados[-1]
+
+    adaptador = WhatsAppSobDemanda(fabrica)
+    adaptador.fechar()  # Nunca usado: não cria o adaptador só para fechá-lo
+    assert criados == []
+
+    adaptador.enviar_texto(numero_destino="+5583999990000", texto="um")
+    adaptador.enviar_lote([("+5583999990000", "dois")])
+
+    assert len(criados) == 1
+    assert stub_whatsapp.mensagens == [("+5583999990000", "um"), ("+5583999990000", "dois")]
+    adaptador.fechar()
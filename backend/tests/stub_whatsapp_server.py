@@ -0,0 +1,87 @@
+"""
+Servidor HTTP local que imita o endpoint de envio do 'whatsapp-adapter' (Node).
+
+Aceita POST /send {"numero", "texto"} e POST /send-batch {"mensagens": [...]},
+registrando as mensagens recebidas em memória. Números em 'falhar_para' recebem
+erro, como o serviço real faria com um número inválido.
+
+Também pode ser executado diretamente para testes manuais:
+    python -m tests.stub_whatsapp_server 3000
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubWhatsAppServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, porta: int = 0, falhar_para: set[str] | None = None):
+        super().__init__(("127.0.0.1", porta), _Handler)
+        self.mensagens: list[tuple[str, str]] = []
+        self.falhar_para = falhar_para or set()
+        self.conexoes = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def registrar(self, numero: str, texto: str) -> dict:
+        if numero in self.falhar_para:
+            return {"ok": False, "erro": f"Número inválido: '{numero}'"}
+        with self._lock:
+            self.mensagens.append((numero, texto))
+        return {"ok": True}
+
+    def iniciar(self) -> "StubWhatsAppServer":
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Mantém a conexão aberta (keep-alive)
+    disable_nagle_algorithm = True
+    server: StubWhatsAppServer
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.conexoes += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _responder(self, status: int, corpo: dict):
+        dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(tamanho) or b"{}")
+        if self.path == "/send":
+            resultado = self.server.registrar(payload.get("numero"), payload.get("texto"))
+            self._responder(200 if resultado["ok"] else 502, resultado)
+        elif self.path == "/send-batch":
+            resultados = [self.server.registrar(m.get("numero"), m.get("texto")) for m in payload.get("mensagens", [])]
+            self._responder(200, {"resultados": resultados})
+        else:
+            self._responder(404, {"erro": "Rota não encontrada."})
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    servidor = StubWhatsAppServer(porta)
+    print(f"Stub do whatsapp-adapter ouvindo em {servidor.url}")
+    servidor.serve_forever()
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Orçamentos generosos (máquinas de CI lentas): pegam regressões grosseiras, como
+# voltar a importar um adaptador pesado ou a tocar no banco na importação.
+ORCAMENTO_IMPORTACAO_SEGUNDOS = 3.0
+ORCAMENTO_PRIMEIRA_REQUISICAO_SEGUNDOS = 2.0
+
+# Roda em um interpretador novo: nesta sessão de testes os módulos já estariam importados.
+SCRIPT = """
+import json, os, sys, time
+comeco = time.perf_counter()
+import main
+importacao = time.perf_counter() - comeco
+banco_apos_importacao = os.path.exists("agendia.db")
+modulos = sorted(m for m in ("pywhatkit", "requests", "uvicorn") if m in sys.modules)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+from agendia.infrastructure.database import engine
+comeco = time.perf_counter()
+with TestClient(main.app) as cliente:
+    status = cliente.get("/").status_code
+    primeira_requisicao = time.perf_counter() - comeco
+    tabelas = inspect(engine).get_table_names()
+print(json.dumps({
+    "importacao": importacao, "primeira_requisicao": primeira_requisicao, "status": status,
+    "banco_apos_importacao": banco_apos_importacao, "modulos": modulos, "tabelas": tabelas,
+}))
+"""
+
+
+def test_importar_a_api_e_rapido_e_sem_efeitos_colaterais(tmp_path):
+    ambiente = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND),
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'agendia.db'}",
+        "NOTIFICACOES_INTERVALO_SEGUNDOS": "3600",
+        "LEMBRETES_INTERVALO_SEGUNDOS": "3600",
+    }
+    processo = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=tmp_path, env=ambiente, capture_output=True, text=True, timeout=60
+    )
+    assert processo.returncode == 0, processo.stderr
+    medicao = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    # Importar não cria o banco nem carrega adaptadores e servidores que só são usados depois.
+    assert not medicao["banco_apos_importacao"]
+    assert medicao["modulos"] == []
+    # O esquema é migrado no lifespan, antes da primeira requisição.
+    assert medicao["status"] == 200
+    assert {"profissionais", "agendamentos", "notificacoes_outbox"} <= set(medicao["tabelas"])
+
+    assert medicao["importacao"] < ORCAMENTO_IMPORTACAO_SEGUNDOS
+    assert medicao["primeira_requisicao"] < ORCAMENTO_PRIMEIRA_REQUISICAO_SEGUNDOS
@@ -3,9 +3,12 @@ console.log("Iniciando o Adaptador do WhatsApp...");
 const { Client, LocalAuth } = require('whatsapp-web.js');
 const qrcode = require('qrcode-terminal');
 const axios = require('axios');
+const http = require('http');
 
 const PYTHON_WEBHOOK_URL = 'http://localhost:8000/webhook/whatsapp';
+const SEND_PORT = Number(process.env.PORT || 3000);
 const client = new Client({ authStrategy: new LocalAuth() });
+let clientReady = false;
 
 client.on('qr', qr => {
     console.log("QR Code recebido! Escaneie com seu celular.");
@@ -13,9 +16,15 @@ client.on('qr', qr => {
 });
 
 client.on('ready', () => {
+    clientReady = true;
     console.log('Cliente do WhatsApp está pronto e conectado!');
 });
 
+client.on('disconnected', reason => {
+    clientReady = false;
+    console.error(`Cliente do WhatsApp desconectado: ${reason}`);
+});
+
 client.on('message', async message => {
     if (message.fromMe) {
         return;
@@ -54,4 +63,82 @@ client.on('message', async message => {
     }
 });
 
-client.initialize();
\ No newline at end of file
+client.initialize();
+
+// --- Endpoint de envio usado pelo backend Python (HttpWhatsAppAdapter) ---
+
+// Converte '+55 83 99999-8888' no id de chat do whatsapp-web.js ('5583999998888@c.us').
+function toChatId(numero) {
+    const digits = String(numero || '').replace(/\D/g, '');
+    if (!digits) {
+        throw new Error(`Número inválido: '${numero}'`);
+    }
+    return `${digits}@c.us`;
+}
+
+async function sendOne({ numero, texto }) {
+    try {
+        await client.sendMessage(toChatId(numero), texto);
+        return { ok: true };
+    } catch (error) {
+        return { ok: false, erro: error.message };
+    }
+}
+
+function readJson(req) {
+    return new Promise((resolve, reject) => {
+        let body = '';
+        req.on('data', chunk => { body += chunk; });
+        req.on('end', () => {
+            try {
+                resolve(body ? JSON.parse(body) : {});
+            } catch (error) {
+                reject(error);
+            }
+        });
+        req.on('error', reject);
+    });
+}
+
+function respond(res, status, payload) {
+    res.writeHead(status, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify(payload));
+}
+
+const server = http.createServer(async (req, res) => {
+    if (req.method !== 'POST' || !['/send', '/send-batch'].includes(req.url)) {
+        return respond(res, 404, { erro: 'Rota não encontrada.' });
+    }
+    if (!clientReady) {
+        return respond(res, 503, { erro: 'Cliente do WhatsApp ainda não está pronto.' });
+    }
+    let payload;
+    try {
+        payload = await readJson(req);
+    } catch (error) {
+        return respond(res, 400, { erro: 'JSON inválido.' });
+    }
+
+    if (req.url === '/send') {
+        const resultado = await sendOne(payload);
+        return respond(res, resultado.ok ? 200 : 502, resultado);
+    }
+    // Mensagens do mesmo número saem em ordem; números diferentes, em paralelo.
+    const mensagens = Array.isArray(payload.mensagens) ? payload.mensagens : [];
+    const resultados = new Array(mensagens.length);
+    const filas = new Map();
+    mensagens.forEach((mensagem, indice) => {
+        const anterior = filas.get(mensagem.numero) || Promise.resolve();
+        filas.set(mensagem.numero, anterior.then(async () => {
+            resultados[indice] = await sendOne(mensagem);
+        }));
+    });
+    await Promise.all(filas.values());
+    return respond(res, 200, { resultados });
+});
+
+// Conexões keep-alive reaproveitadas pelo pool do backend.
+server.keepAliveTimeout = 65000;
+server.listen(SEND_PORT, () => {
+    console.log(`Endpoint de envio ouvindo em http://localhost:${SEND_PORT} (POST /send, POST /send-batch)`);
+});